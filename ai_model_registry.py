@@ -1,9 +1,23 @@
 import logging
-from typing import Dict, List, Optional
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Set
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("MODEL_REGISTRY")
 
+# SQLite file the shared registry persists to; unset keeps it in memory only
+MODEL_REGISTRY_DB = os.getenv("MODEL_REGISTRY_DB", "")
+
+# Fields with a secondary index (value -> set of model IDs)
+INDEXED_FIELDS = ("task", "status", "license")
+
+# Events delivered to subscribers as callback(event, model)
+MODEL_EVENTS = ("added", "removed", "updated", "unavailable")
+
+ModelListener = Callable[[str, "AIModel"], None]
+
 class AIModel:
     def __init__(
         self,
@@ -37,78 +51,269 @@ class AIModel:
             "status": self.status
         }
 
+_COLUMNS = ("model_id", "name", "description", "task", "source", "size_mb", "license", "status")
+
 class ModelRegistry:
-    def __init__(self):
+    """
+    Model catalogue with secondary indexes on task, status and license.
+    With a db_path, every change is written through to SQLite and the
+    registry is reloaded from it on construction. Subscribers are notified
+    synchronously after each change, outside the registry lock.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
         self._models: Dict[str, AIModel] = {}
+        self._indexes: Dict[str, Dict[str, Set[str]]] = {field: {} for field in INDEXED_FIELDS}
+        self._listeners: Dict[int, ModelListener] = {}
+        self._next_token = 0
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._open_db(db_path)
 
-    def register_model(self, model: AIModel):
-        if model.model_id in self._models:
-            logger.warning(f"Model already registered: {model.model_id}")
+    # --- Persistence ---
+
+    def _open_db(self, db_path: str):
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS models ("
+            "model_id TEXT PRIMARY KEY, name TEXT, description TEXT, task TEXT, "
+            "source TEXT, size_mb INTEGER, license TEXT, status TEXT)"
+        )
+        self._db.commit()
+        rows = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM models").fetchall()
+        for row in rows:
+            model = AIModel(*row)
+            self._models[model.model_id] = model
+            self._index(model)
+        logger.info(f"Loaded {len(rows)} models from {db_path}")
+
+    def _persist(self, model: AIModel):
+        if self._db is None:
             return
-        self._models[model.model_id] = model
+        self._db.execute(
+            f"INSERT OR REPLACE INTO models ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            tuple(getattr(model, column) for column in _COLUMNS)
+        )
+        self._db.commit()
+
+    def _unpersist(self, model_id: str):
+        if self._db is None:
+            return
+        self._db.execute("DELETE FROM models WHERE model_id = ?", (model_id,))
+        self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # --- Indexes ---
+
+    def _index(self, model: AIModel):
+        for field in INDEXED_FIELDS:
+            self._indexes[field].setdefault(getattr(model, field), set()).add(model.model_id)
+
+    def _unindex(self, model: AIModel):
+        for field in INDEXED_FIELDS:
+            ids = self._indexes[field].get(getattr(model, field))
+            if ids is not None:
+                ids.discard(model.model_id)
+                if not ids:
+                    del self._indexes[field][getattr(model, field)]
+
+    # --- Subscriptions ---
+
+    def subscribe(self, listener: ModelListener) -> int:
+        """Registers listener(event, model) for MODEL_EVENTS; returns a token for unsubscribe."""
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._listeners[token] = listener
+            return token
+
+    def unsubscribe(self, token: int):
+        with self._lock:
+            self._listeners.pop(token, None)
+
+    def _notify(self, event: str, model: AIModel):
+        with self._lock:
+            listeners = list(self._listeners.values())
+        for listener in listeners:
+            try:
+                listener(event, model)
+            except Exception as e:
+                logger.error(f"Model registry listener failed on {event} {model.model_id}: {e}")
+
+    # --- Registry operations ---
+
+    def register_model(self, model: AIModel):
+        with self._lock:
+            if model.model_id in self._models:
+                logger.warning(f"Model already registered: {model.model_id}")
+                return
+            self._models[model.model_id] = model
+            self._index(model)
+            self._persist(model)
         logger.info(f"Registered model: {model.name} ({model.model_id})")
+        self._notify("added", model)
 
     def remove_model(self, model_id: str):
-        if model_id in self._models:
-            del self._models[model_id]
-            logger.info(f"Removed model: {model_id}")
-        else:
+        with self._lock:
+            model = self._models.pop(model_id, None)
+            if model is not None:
+                self._unindex(model)
+                self._unpersist(model_id)
+        if model is None:
             logger.warning(f"Tried to remove unknown model: {model_id}")
+            return
+        logger.info(f"Removed model: {model_id}")
+        self._notify("removed", model)
 
     def get_model(self, model_id: str) -> Optional[AIModel]:
         return self._models.get(model_id)
 
-    def list_models(self) -> List[Dict]:
-        return [m.to_dict() for m in self._models.values()]
+    def __contains__(self, model_id: str) -> bool:
+        return model_id in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def find_model_ids(
+        self,
+        task: Optional[str] = None,
+        status: Optional[str] = None,
+        license: Optional[str] = None
+    ) -> Set[str]:
+        """IDs matching every given filter, answered from the secondary indexes."""
+        filters = {"task": task, "status": status, "license": license}
+        with self._lock:
+            result: Optional[Set[str]] = None
+            for field, value in filters.items():
+                if value is None:
+                    continue
+                ids = self._indexes[field].get(value, set())
+                result = set(ids) if result is None else result & ids
+                if not result:
+                    return set()
+            return set(self._models) if result is None else result
+
+    def iter_models(
+        self,
+        task: Optional[str] = None,
+        status: Optional[str] = None,
+        license: Optional[str] = None
+    ) -> Iterator[AIModel]:
+        """Matching models without building dicts; registration order unfiltered, ID order otherwise."""
+        if task is None and status is None and license is None:
+            with self._lock:
+                models = list(self._models.values())
+            yield from models
+            return
+        for model_id in sorted(self.find_model_ids(task, status, license)):
+            model = self._models.get(model_id)
+            if model is not None:
+                yield model
+
+    def list_models(
+        self,
+        task: Optional[str] = None,
+        status: Optional[str] = None,
+        license: Optional[str] = None
+    ) -> List[Dict]:
+        return [m.to_dict() for m in self.iter_models(task, status, license)]
 
     def mark_unavailable(self, model_id: str):
-        if model_id in self._models:
-            self._models[model_id].status = "unavailable"
-            logger.info(f"Marked model as unavailable: {model_id}")
+        self.update_model(model_id, status="unavailable")
 
     def update_model(self, model_id: str, **kwargs):
-        model = self._models.get(model_id)
-        if not model:
-            logger.warning(f"Model not found: {model_id}")
-            return
+        with self._lock:
+            model = self._models.get(model_id)
+            if not model:
+                logger.warning(f"Model not found: {model_id}")
+                return
 
-        for key, value in kwargs.items():
-            if hasattr(model, key):
-                setattr(model, key, value)
-                logger.info(f"Updated {key} of model {model_id} to {value}")
+            previous_status = model.status
+            self._unindex(model)
+            for key, value in kwargs.items():
+                if hasattr(model, key) and key != "model_id":
+                    setattr(model, key, value)
+                    logger.info(f"Updated {key} of model {model_id} to {value}")
+            self._index(model)
+            self._persist(model)
 
-if __name__ == "__main__":
-    registry = ModelRegistry()
+        if model.status == "unavailable" and previous_status != "unavailable":
+            logger.info(f"Marked model as unavailable: {model_id}")
+            self._notify("unavailable", model)
+        else:
+            self._notify("updated", model)
+
+def build_model_map(registry: ModelRegistry) -> Dict[str, str]:
+    """model_id -> model source (Hugging Face repo) for every available model."""
+    return {m.model_id: m.source for m in registry.iter_models(status="available")}
 
-    registry.register_model(AIModel(
+# Models every node ships with; source is the Hugging Face repo the executor loads
+DEFAULT_MODELS = [
+    AIModel(
         model_id="parallax-llm-v1",
         name="Parallax LLM",
         description="Sentiment classification and crypto intent recognition",
         task="text-classification",
-        source="huggingface.co/distilbert-base-uncased",
+        source="distilbert-base-uncased-finetuned-sst-2-english",
         size_mb=420,
         license="Apache-2.0"
-    ))
-
-    registry.register_model(AIModel(
+    ),
+    AIModel(
         model_id="quant-forecast-lite",
         name="Quant Forecast",
         description="Trend prediction based on financial news",
         task="text-forecasting",
-        source="hf/quant-bert",
+        source="mrm8488/bert-tiny-finetuned-financial-news-sentiment",
         size_mb=275,
         license="MIT"
-    ))
-
-    registry.register_model(AIModel(
+    ),
+    AIModel(
         model_id="vision-encoder-v2",
         name="Vision Encoder",
         description="Image-to-text model for captioning crypto charts or logos",
         task="image-captioning",
-        source="nlpconnect/vit-gpt2",
+        source="nlpconnect/vit-gpt2-image-captioning",
         size_mb=680,
         license="CC-BY-SA-4.0"
-    ))
+    ),
+]
+
+# Fields DEFAULT_MODELS owns; status stays whatever an operator last set
+_SHIPPED_FIELDS = ("name", "description", "task", "source", "size_mb", "license")
 
+def load_default_models(registry: ModelRegistry):
+    """
+    Registers any default model the registry does not know yet, and brings
+    stored copies of default models up to date with the shipped definitions
+    (a persisted row may predate a new source or size).
+    """
+    for model in DEFAULT_MODELS:
+        stored = registry.get_model(model.model_id)
+        if stored is None:
+            registry.register_model(AIModel(**model.to_dict()))
+            continue
+        changes = {
+            field: getattr(model, field)
+            for field in _SHIPPED_FIELDS
+            if getattr(stored, field) != getattr(model, field)
+        }
+        if changes:
+            logger.info(f"Reconciling stored model {model.model_id} with defaults: {sorted(changes)}")
+            registry.update_model(model.model_id, **changes)
+
+# Shared registry for the executor, router and API layers
+registry = ModelRegistry(MODEL_REGISTRY_DB or None)
+load_default_models(registry)
+
+if __name__ == "__main__":
     for entry in registry.list_models():
         print(entry)
+
+    print("Text classifiers:", registry.find_model_ids(task="text-classification"))
+    print("MIT licensed:", registry.find_model_ids(license="MIT"))
+    print("Model map:", build_model_map(registry))
@@ -1,12 +1,21 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable, Tuple
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+from collections import deque
+import asyncio
+import json
+import os
 import uvicorn
 import logging
 import uuid
 import time
-from sentiment_model import analyze_sentiment
+from sentiment_model import analyze_sentiment, warmup, is_ready
+from inference_batcher import InferenceBatcher, QueueFullError
+from session_history import SessionHistory
 
 app = FastAPI()
 
@@ -21,8 +30,59 @@ app.add_middleware(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("CHATBOT_API")
 
-# In-memory cache (replace with Redis or DB later)
-HISTORY: Dict[str, List[Dict[str, Any]]] = {}
+# Per-session ring buffers under a global cap; idle sessions spill to disk when HISTORY_SPILL_DIR is set
+HISTORY = SessionHistory(
+    max_entries_per_session=int(os.getenv("HISTORY_MAX_ENTRIES_PER_SESSION", 100)),
+    max_total_entries=int(os.getenv("HISTORY_MAX_TOTAL_ENTRIES", 100_000)),
+    spill_dir=os.getenv("HISTORY_SPILL_DIR") or None
+)
+
+# Largest page /history will return
+HISTORY_MAX_PAGE_SIZE = 200
+
+START_TIME = time.time()
+
+# Blocking inference runs on a bounded pool, with concurrent queries coalesced into batches
+sentiment_batcher = InferenceBatcher(
+    analyze_sentiment,
+    max_batch_size=int(os.getenv("INFERENCE_MAX_BATCH_SIZE", 32)),
+    max_wait_ms=float(os.getenv("INFERENCE_BATCH_WAIT_MS", 5)),
+    max_queue_depth=int(os.getenv("INFERENCE_MAX_QUEUE_DEPTH", 256)),
+    workers=int(os.getenv("INFERENCE_WORKERS", 2))
+)
+
+# /query/batch is answered by one admission, so it can never exceed the queue depth
+QUERY_BATCH_MAX_ITEMS = min(int(os.getenv("QUERY_BATCH_MAX_ITEMS", 256)), sentiment_batcher.max_queue_depth)
+
+# /query/stream scores its input in micro-batches, with a few in flight for overlap;
+# at most STREAM_MICRO_BATCH * STREAM_MAX_IN_FLIGHT inputs are held at once
+STREAM_MICRO_BATCH = min(int(os.getenv("STREAM_MICRO_BATCH", 64)), sentiment_batcher.max_queue_depth)
+STREAM_MAX_IN_FLIGHT = int(os.getenv("STREAM_MAX_IN_FLIGHT", 2))
+STREAM_MAX_LINE_BYTES = 64 * 1024
+# How long a stream waits out a full inference queue before giving up
+STREAM_QUEUE_WAIT_SECONDS = 30.0
+
+# Set if the background model warmup failed; readiness reports it
+_warmup_error: Optional[str] = None
+
+async def _warmup_model():
+    global _warmup_error
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, warmup)
+        logger.info("Sentiment model warm, API ready")
+    except Exception as e:
+        _warmup_error = str(e)
+        logger.error(f"Model warmup failed: {e}")
+
+@app.on_event("startup")
+async def startup_event():
+    # Load the model in the background so /health answers immediately
+    asyncio.get_running_loop().create_task(_warmup_model())
+    sentiment_batcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await sentiment_batcher.stop()
 
 # Request schema
 class QueryRequest(BaseModel):
@@ -38,6 +98,24 @@ class QueryResponse(BaseModel):
     result: Dict[str, Any]
     dacert: Dict[str, Any] = {}
 
+class BatchQueryRequest(BaseModel):
+    session_id: str
+    queries: List[str]
+    model_id: str = "parallax-llm-v1"
+
+class BatchQueryResponse(BaseModel):
+    session_id: str
+    results: List[Dict[str, Any]]
+
+def _build_result(query: str, model_output: Dict[str, Any], model_id: str, timestamp: int) -> Dict[str, Any]:
+    return {
+        "input": query,
+        "output": model_output["sentiment"],
+        "confidence": model_output["confidence"],
+        "timestamp": timestamp,
+        "model_id": model_id
+    }
+
 @app.post("/query", response_model=QueryResponse)
 async def run_query(request: QueryRequest):
     if not request.query:
@@ -49,14 +127,11 @@ async def run_query(request: QueryRequest):
     logger.info(f"Received query from session {request.session_id}: {request.query}")
 
     # Simulate model response
-    model_output = analyze_sentiment([request.query])[0]
-    result = {
-        "input": request.query,
-        "output": model_output["sentiment"],
-        "confidence": model_output["confidence"],
-        "timestamp": timestamp,
-        "model_id": request.model_id
-    }
+    try:
+        model_output = await sentiment_batcher.submit(request.query)
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="Inference queue full, retry later")
+    result = _build_result(request.query, model_output, request.model_id, timestamp)
 
     dacert = {}
     if request.return_dacert:
@@ -69,10 +144,7 @@ async def run_query(request: QueryRequest):
         }
 
     # Store in memory for session tracking
-    if request.session_id not in HISTORY:
-        HISTORY[request.session_id] = []
-
-    HISTORY[request.session_id].append({
+    HISTORY.append(request.session_id, {
         "task_id": task_id,
         "query": request.query,
         "response": result,
@@ -86,15 +158,234 @@ async def run_query(request: QueryRequest):
         dacert=dacert
     )
 
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def run_query_batch(request: BatchQueryRequest):
+    """Scores a list of queries as one admission to the batcher; results keep input order."""
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="At least one query required")
+    if len(request.queries) > QUERY_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {QUERY_BATCH_MAX_ITEMS} queries per batch; use /query/stream")
+    empty = [i for i, query in enumerate(request.queries) if not query]
+    if empty:
+        raise HTTPException(status_code=400, detail=f"Query text required (empty at index {empty[0]})")
+
+    logger.info(f"Received batch of {len(request.queries)} queries from session {request.session_id}")
+
+    try:
+        model_outputs = await sentiment_batcher.submit_many(request.queries)
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="Inference queue full, retry later")
+
+    timestamp = int(time.time())
+    results = []
+    for query, model_output in zip(request.queries, model_outputs):
+        task_id = str(uuid.uuid4())
+        result = _build_result(query, model_output, request.model_id, timestamp)
+        HISTORY.append(request.session_id, {
+            "task_id": task_id,
+            "query": query,
+            "response": result,
+            "dacert": {}
+        })
+        results.append({"task_id": task_id, "result": result})
+
+    return BatchQueryResponse(session_id=request.session_id, results=results)
+
+# --- Streaming ---
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    Streams content produced from the request body while it is still arriving.
+
+    Starlette's StreamingResponse watches `receive` for disconnects while it
+    streams (ASGI spec < 2.4), and that watcher swallows the body messages.
+    Here the content reads the body itself through `receive`, and disconnects
+    are only watched for once the body is complete.
+    """
+
+    def __init__(self, content_factory: Callable[[Receive], AsyncIterator[str]], media_type: str):
+        super().__init__(iter(()), media_type=media_type)
+        self.content_factory = content_factory
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body_complete = asyncio.Event()
+
+        async def receive_body():
+            message = await receive()
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                body_complete.set()
+            return message
+
+        async def watch_disconnect():
+            await body_complete.wait()
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        self.body_iterator = self.content_factory(receive_body)
+        stream = asyncio.ensure_future(self.stream_response(send))
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await asyncio.wait({stream, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stream.cancel()
+            watcher.cancel()
+            await asyncio.gather(stream, watcher, return_exceptions=True)
+        if not stream.cancelled() and stream.exception() is not None:
+            raise stream.exception()
+
+async def _iter_body_lines(receive: Receive) -> AsyncIterator[Tuple[int, bytes]]:
+    """Yields (line_no, line) from the request body without buffering more than one line."""
+    buffer = b""
+    line_no = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnect()
+        more_body = message.get("more_body", False)
+        buffer += message.get("body", b"")
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        if len(buffer) > STREAM_MAX_LINE_BYTES:
+            raise ValueError(f"Line {line_no + len(lines) + 1} exceeds {STREAM_MAX_LINE_BYTES} bytes")
+        for line in lines:
+            line_no += 1
+            yield line_no, line
+    if buffer:
+        yield line_no + 1, buffer
+
+def _parse_stream_line(line: bytes) -> Tuple[Optional[Any], Optional[str], Optional[str]]:
+    """(id, query, error) for one NDJSON line: {"query": ..., "id": ...} or a bare JSON string."""
+    try:
+        item = json.loads(line)
+    except ValueError as e:
+        return None, None, f"Malformed JSON: {e}"
+    if isinstance(item, str):
+        item = {"query": item}
+    if not isinstance(item, dict):
+        return None, None, "Expected an object or a string"
+    query = item.get("query")
+    if not isinstance(query, str) or not query:
+        return item.get("id"), None, "Query text required"
+    return item.get("id"), query, None
+
+async def _iter_micro_batches(receive: Receive) -> AsyncIterator[List[Tuple[int, Any, Optional[str], Optional[str]]]]:
+    batch = []
+    async for line_no, line in _iter_body_lines(receive):
+        if not line.strip():
+            continue
+        batch.append((line_no, *_parse_stream_line(line)))
+        if len(batch) >= STREAM_MICRO_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def _submit_with_backpressure(queries: List[str]) -> List[Dict[str, Any]]:
+    """A stream is long-lived, so a full queue is waited out rather than failed at once."""
+    deadline = time.monotonic() + STREAM_QUEUE_WAIT_SECONDS
+    while True:
+        try:
+            return await sentiment_batcher.submit_many(queries)
+        except QueueFullError:
+            if time.monotonic() >= deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+async def _score_micro_batch(batch: List[Tuple[int, Any, Optional[str], Optional[str]]], model_id: str) -> List[Dict[str, Any]]:
+    queries = [query for _, _, query, error in batch if error is None]
+    model_outputs = iter(await _submit_with_backpressure(queries)) if queries else iter(())
+    timestamp = int(time.time())
+    records = []
+    for line_no, item_id, query, error in batch:
+        record: Dict[str, Any] = {"line": line_no}
+        if item_id is not None:
+            record["id"] = item_id
+        if error is not None:
+            record["error"] = error
+        else:
+            record["task_id"] = str(uuid.uuid4())
+            record["result"] = _build_result(query, next(model_outputs), model_id, timestamp)
+        records.append(record)
+    return records
+
+def _format_record(record: Dict[str, Any], sse: bool, event: Optional[str] = None) -> str:
+    data = json.dumps(record, separators=(",", ":"))
+    if not sse:
+        return data + "\n"
+    return (f"event: {event}\n" if event else "") + f"data: {data}\n\n"
+
+async def _stream_results(receive: Receive, model_id: str, sse: bool) -> AsyncIterator[str]:
+    in_flight: deque = deque()
+    processed = errors = 0
+    try:
+        async for batch in _iter_micro_batches(receive):
+            in_flight.append(asyncio.ensure_future(_score_micro_batch(batch, model_id)))
+            # Stop reading input until the oldest micro-batch is written out
+            while len(in_flight) >= STREAM_MAX_IN_FLIGHT:
+                for record in await in_flight.popleft():
+                    processed += 1
+                    errors += "error" in record
+                    yield _format_record(record, sse)
+        while in_flight:
+            for record in await in_flight.popleft():
+                processed += 1
+                errors += "error" in record
+                yield _format_record(record, sse)
+        yield _format_record({"done": True, "processed": processed, "errors": errors}, sse, event="done")
+    except ClientDisconnect:
+        logger.info(f"Query stream client went away after {processed} results")
+    except Exception as e:
+        logger.warning(f"Aborting query stream after {processed} results: {e}")
+        yield _format_record({"done": False, "processed": processed, "error": str(e)}, sse, event="error")
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+@app.post("/query/stream")
+async def run_query_stream(request: Request, model_id: str = "parallax-llm-v1", format: Optional[str] = None):
+    """
+    Scores an NDJSON body (one {"query": ..., "id": ...} or bare string per line)
+    and streams a record per line as each micro-batch finishes, followed by a
+    done record. format=sse (or Accept: text/event-stream) switches from NDJSON
+    to server-sent events.
+    """
+    if format is None:
+        format = "sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson"
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or sse")
+    sse = format == "sse"
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return BodyStreamingResponse(lambda receive: _stream_results(receive, model_id, sse), media_type=media_type)
+
 @app.get("/history/{session_id}")
-async def get_history(session_id: str):
-    if session_id not in HISTORY:
-        return {"session_id": session_id, "history": []}
-    return {"session_id": session_id, "history": HISTORY[session_id]}
+async def get_history(session_id: str, cursor: Optional[int] = None, limit: int = 50):
+    """Oldest-first page of a session's history; pass next_cursor back as cursor for the next page."""
+    limit = min(max(limit, 1), HISTORY_MAX_PAGE_SIZE)
+    entries, next_cursor = HISTORY.page(session_id, cursor=cursor, limit=limit)
+    return {"session_id": session_id, "history": entries, "next_cursor": next_cursor}
+
+@app.get("/metrics/history")
+async def history_metrics():
+    return HISTORY.stats()
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "uptime": f"{int(time.time())} seconds"}
+    """Liveness: the process is up and serving, whether or not the model is loaded."""
+    return {"status": "ok", "uptime": f"{int(time.time() - START_TIME)} seconds"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: the sentiment model is loaded and queries will not stall on it."""
+    if is_ready():
+        return {"status": "ready"}
+    if _warmup_error:
+        return JSONResponse(status_code=503, content={"status": "failed", "error": _warmup_error})
+    return JSONResponse(status_code=503, content={"status": "loading"})
+
+@app.get("/metrics/inference")
+async def inference_metrics():
+    return sentiment_batcher.stats()
 
 @app.get("/models")
 async def get_supported_models():
@@ -1,17 +1,26 @@
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
+import asyncio
 import logging
+import threading
 import time
-import uuid
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from cache_manager import CacheManager
-from task_scheduler import submit_task
+from task_scheduler import submit_task, add_completion_listener
+from stage_metrics import get_stage_histograms
 
 logger = logging.getLogger("API_BACKEND")
 router = APIRouter()
 cache = CacheManager()
 
+# Newest-first ring of recently submitted tasks
+RECENT_TASKS_CAPACITY = 25
+# How long finished task results stay retrievable
+RESULT_TTL_SECONDS = 600
+# Upper bound on a single long-poll for a result
+MAX_RESULT_WAIT_SECONDS = 30.0
+
 class InferenceRequest(BaseModel):
     model_id: str
     input_data: str
@@ -23,28 +32,73 @@ class InferenceResponse(BaseModel):
 
 class TaskQuery(BaseModel):
     task_id: str
+    # Seconds to wait for the result to land before answering 404 (0 = do not wait)
+    wait_seconds: float = 0.0
+
+# task_id -> (loop, event) pairs of requests long-polling for that result
+_result_waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+_waiters_lock = threading.Lock()
+
+def _result_key(task_id: str) -> str:
+    return f"task_result:{task_id}"
+
+def publish_result(task_id: str, status: str, payload: Dict[str, Any]):
+    """
+    Stores a finished task's result and wakes any request waiting for it.
+    Safe to call from any thread; registered as a task_scheduler completion listener.
+    """
+    cache.set(_result_key(task_id), {"task_id": task_id, "status": status, **payload}, ttl=RESULT_TTL_SECONDS)
+    with _waiters_lock:
+        waiters = _result_waiters.pop(task_id, [])
+    for loop, event in waiters:
+        loop.call_soon_threadsafe(event.set)
+
+add_completion_listener(publish_result)
+
+async def wait_for_result(task_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+    result = cache.get(_result_key(task_id))
+    if result is not None or timeout <= 0:
+        return result
+
+    waiter = (asyncio.get_running_loop(), asyncio.Event())
+    with _waiters_lock:
+        _result_waiters.setdefault(task_id, []).append(waiter)
+    try:
+        # The result may have landed between the first lookup and registering
+        result = cache.get(_result_key(task_id))
+        if result is None:
+            try:
+                await asyncio.wait_for(waiter[1].wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            result = cache.get(_result_key(task_id))
+        return result
+    finally:
+        with _waiters_lock:
+            waiters = _result_waiters.get(task_id)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del _result_waiters[task_id]
 
 @router.post("/inference/request", response_model=InferenceResponse)
 async def request_inference(req: InferenceRequest):
-    task_id = str(uuid.uuid4())
+    task_id = submit_task(req.model_id, req.input_data)
     logger.info(f"New inference request: {task_id} from {req.user_id}")
-    
-    submit_task(req.model_id, req.input_data)
-    
-    recent_tasks: List[Dict] = cache.get("recent_tasks") or []
-    recent_tasks.insert(0, {
+
+    cache.push_capped("recent_tasks", {
         "task_id": task_id,
         "model_id": req.model_id,
         "timestamp": int(time.time()),
         "latency": 0
-    })
-    cache.set("recent_tasks", recent_tasks[:25])
+    }, RECENT_TASKS_CAPACITY)
 
     return InferenceResponse(task_id=task_id, status="submitted")
 
 @router.post("/inference/result")
 async def get_result(q: TaskQuery):
-    result = cache.get(f"task_result:{q.task_id}")
+    """Finished task result; with wait_seconds, long-polls until it lands or the wait runs out."""
+    result = await wait_for_result(q.task_id, min(max(q.wait_seconds, 0.0), MAX_RESULT_WAIT_SECONDS))
     if not result:
         raise HTTPException(status_code=404, detail="Result not available")
     return result
@@ -52,20 +106,23 @@ async def get_result(q: TaskQuery):
 @router.post("/agent/report")
 async def agent_report(data: Dict):
     logger.info(f"Agent report received: {data}")
-    node_health: Dict = cache.get("node_health") or {}
     node_id = data.get("node_id", "unknown")
-    node_health[node_id] = {
+    cache.hset("node_health", node_id, {
         "latency": data.get("latency"),
         "status": data.get("status"),
         "last_seen": int(time.time())
-    }
-    cache.set("node_health", node_health)
+    })
     return {"ok": True}
 
 @router.get("/agents")
 async def list_agents():
-    return cache.get("node_health") or {}
+    return cache.hgetall("node_health")
 
 @router.get("/inference/recent")
 async def recent():
-    return cache.get("recent_tasks") or []
+    return cache.lrange("recent_tasks", 0, RECENT_TASKS_CAPACITY - 1)
+
+@router.get("/metrics/stages")
+async def stage_latency(model_id: Optional[str] = None):
+    """Per-model latency histograms for each stage of the task lifecycle."""
+    return get_stage_histograms(model_id)
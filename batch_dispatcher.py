@@ -1,36 +1,77 @@
+import json
 import logging
-import uuid
 import time
-from typing import List, Dict, Tuple
-from task_scheduler import submit_task, InferenceTask
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from task_scheduler import submit_tasks_bulk
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("BATCH_DISPATCHER")
 
-MAX_TASKS_PER_BATCH = 100
+# Entries are validated and enqueued this many at a time
+DISPATCH_CHUNK_SIZE = 500
+
+# Minimum seconds between progress log lines on long streams
+PROGRESS_LOG_INTERVAL = 5.0
+
+# Task IDs and rejections kept in the final summary; on_progress sees every one, chunk by chunk
+REPORT_MAX_IDS = 10_000
 
 class BatchReport:
-    def __init__(self):
+    def __init__(self, max_ids: int = REPORT_MAX_IDS):
+        self.max_ids = max_ids
         self.accepted: List[str] = []
-        self.rejected: List[Tuple[str, str]] = []  # (task_id, reason)
+        self.rejected: List[Tuple[str, str]] = []  # (entry reference, reason)
+        self.accepted_count = 0
+        self.rejected_count = 0
         self.timestamp = int(time.time())
+        self.processed = 0
+        self.chunks = 0
+        self._started = time.monotonic()
 
     def add_success(self, task_id: str):
-        self.accepted.append(task_id)
+        self.add_successes([task_id])
+
+    def add_successes(self, task_ids: List[str]):
+        self.accepted_count += len(task_ids)
+        self.accepted.extend(task_ids[:self.max_ids - len(self.accepted)])
+
+    def add_failure(self, entry_ref: str, reason: str):
+        self.rejected_count += 1
+        if len(self.rejected) < self.max_ids:
+            self.rejected.append((entry_ref, reason))
+
+    @property
+    def truncated(self) -> bool:
+        return self.accepted_count > len(self.accepted) or self.rejected_count > len(self.rejected)
 
-    def add_failure(self, task_id: str, reason: str):
-        self.rejected.append((task_id, reason))
+    def elapsed(self) -> float:
+        return time.monotonic() - self._started
+
+    def progress(self) -> Dict:
+        elapsed = self.elapsed()
+        return {
+            "processed_count": self.processed,
+            "accepted_count": self.accepted_count,
+            "rejected_count": self.rejected_count,
+            "chunks": self.chunks,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_per_sec": round(self.processed / elapsed, 1) if elapsed > 0 else 0.0
+        }
 
     def summary(self) -> Dict:
         return {
             "timestamp": self.timestamp,
-            "accepted_count": len(self.accepted),
-            "rejected_count": len(self.rejected),
+            **self.progress(),
             "accepted_ids": self.accepted,
-            "rejected_reasons": self.rejected
+            "rejected_reasons": self.rejected,
+            "ids_truncated": self.truncated
         }
 
-def validate_task_payload(payload: Dict) -> Tuple[bool, str]:
+def validate_task_payload(payload: Any) -> Tuple[bool, str]:
+    if not isinstance(payload, dict):
+        return False, "Entry must be a JSON object"
+
     if "model_id" not in payload or "input" not in payload:
         return False, "Missing required fields"
 
@@ -42,37 +83,91 @@ def validate_task_payload(payload: Dict) -> Tuple[bool, str]:
 
     return True, ""
 
-def dispatch_batch(batch: List[Dict[str, str]]) -> Dict:
-    report = BatchReport()
-
-    if len(batch) > MAX_TASKS_PER_BATCH:
-        logger.warning("Batch size exceeds maximum. Truncating.")
-        batch = batch[:MAX_TASKS_PER_BATCH]
-
-    logger.info(f"Dispatching batch of {len(batch)} tasks")
-
-    for entry in batch:
-        valid, error = validate_task_payload(entry)
-        task_id = str(uuid.uuid4())
-
-        if not valid:
-            report.add_failure(task_id, error)
-            logger.warning(f"Rejected task {task_id}: {error}")
+def iter_ndjson(lines: Iterable[Union[str, bytes]]) -> Iterator[Any]:
+    """
+    Lazily parse newline-delimited JSON. Blank lines are skipped and
+    malformed lines are yielded as None so they are rejected downstream.
+    """
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
             continue
-
-        model_id = entry["model_id"]
-        input_data = entry["input"]
-
         try:
-            submit_task(model_id, input_data)
-            report.add_success(task_id)
-        except Exception as e:
-            report.add_failure(task_id, str(e))
-            logger.error(f"Failed to dispatch task {task_id}: {e}")
+            yield json.loads(line)
+        except ValueError as e:
+            logger.warning(f"Malformed NDJSON on line {line_no}: {e}")
+            yield None
+
+def _chunked(entries: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(entries)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def dispatch_stream(
+    entries: Iterable[Any],
+    chunk_size: int = DISPATCH_CHUNK_SIZE,
+    on_progress: Optional[Callable[[Dict], None]] = None,
+    max_report_ids: int = REPORT_MAX_IDS
+) -> Dict:
+    """
+    Validate and enqueue an arbitrarily large stream of task payloads.
+    The input is consumed chunk by chunk and each chunk of valid entries is
+    handed to the scheduler in a single bulk enqueue. Rejected entries are
+    referenced by their position in the stream ("entry-<n>").
+
+    The summary keeps at most max_report_ids task IDs and rejections. A
+    caller that needs all of them gets each chunk's share through
+    on_progress, as "chunk_accepted_ids" and "chunk_rejected".
+    """
+    report = BatchReport(max_report_ids)
+    last_log = time.monotonic()
+
+    for chunk in _chunked(entries, chunk_size):
+        valid_refs: List[str] = []
+        valid_entries: List[Tuple[str, str]] = []
+        chunk_accepted: List[str] = []
+        chunk_rejected: List[Tuple[str, str]] = []
+
+        for entry in chunk:
+            entry_ref = f"entry-{report.processed}"
+            report.processed += 1
+            valid, error = validate_task_payload(entry)
+            if not valid:
+                chunk_rejected.append((entry_ref, error))
+                continue
+            valid_refs.append(entry_ref)
+            valid_entries.append((entry["model_id"], entry["input"]))
+
+        if valid_entries:
+            try:
+                chunk_accepted = submit_tasks_bulk(valid_entries)
+            except Exception as e:
+                logger.error(f"Failed to dispatch chunk {report.chunks}: {e}")
+                chunk_rejected.extend((entry_ref, str(e)) for entry_ref in valid_refs)
+
+        report.add_successes(chunk_accepted)
+        for entry_ref, reason in chunk_rejected:
+            report.add_failure(entry_ref, reason)
+        report.chunks += 1
+        progress = report.progress()
+        if on_progress:
+            on_progress({**progress, "chunk_accepted_ids": chunk_accepted, "chunk_rejected": chunk_rejected})
+        if time.monotonic() - last_log >= PROGRESS_LOG_INTERVAL:
+            logger.info(f"Dispatch progress: {progress}")
+            last_log = time.monotonic()
+
+    logger.info(f"Batch dispatch complete: {report.progress()}")
+    return report.summary()
+
+def dispatch_ndjson(lines: Iterable[Union[str, bytes]], **kwargs) -> Dict:
+    """Dispatch tasks from an NDJSON source such as an open file or a request body."""
+    return dispatch_stream(iter_ndjson(lines), **kwargs)
 
-    summary = report.summary()
-    logger.info(f"Batch dispatch complete: {summary}")
-    return summary
+def dispatch_batch(batch: List[Dict[str, str]]) -> Dict:
+    logger.info(f"Dispatching batch of {len(batch)} tasks")
+    return dispatch_stream(batch)
 
 if __name__ == "__main__":
     # Example batch
@@ -87,3 +182,9 @@ if __name__ == "__main__":
 
     result = dispatch_batch(sample_batch)
     print(result)
+
+    # Streaming dispatch from an NDJSON file: python batch_dispatcher.py tasks.ndjson
+    import sys
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as f:
+            print(dispatch_ndjson(f, on_progress=lambda p: print(p)))
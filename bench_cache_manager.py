@@ -0,0 +1,55 @@
+"""
+Microbenchmark of cache_manager get/set and list-append throughput, against
+the read-modify-write list pattern api_backend used for recent_tasks.
+
+    python bench_cache_manager.py --ops 200000
+"""
+import argparse
+import time
+
+from cache_manager import CacheManager, MemoryBackend, RedisBackend
+
+RECENT_CAPACITY = 25
+
+def bench(label: str, fn, ops: int):
+    start = time.perf_counter()
+    fn(ops)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {ops / elapsed / 1e3:9.1f}k ops/sec")
+    return elapsed
+
+def run_get_set(cache, ops: int):
+    keys = [f"key:{i % 1000}" for i in range(ops)]
+    for i, key in enumerate(keys):
+        cache.set(key, i)
+        cache.get(key)
+
+def run_legacy_append(cache, ops: int):
+    for i in range(ops):
+        recent = cache.get("recent") or []
+        recent.insert(0, {"task_id": i})
+        cache.set("recent", recent[:RECENT_CAPACITY])
+
+def run_push_capped(cache, ops: int):
+    for i in range(ops):
+        cache.push_capped("recent", {"task_id": i}, RECENT_CAPACITY)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=200_000)
+    args = parser.parse_args()
+
+    backends = [
+        ("memory", lambda: MemoryBackend()),
+        ("memory via CacheManager", lambda: CacheManager(MemoryBackend())),
+        ("redis protocol (memory:// stand-in)", lambda: RedisBackend("memory://")),
+    ]
+    for name, make in backends:
+        print(f"[{name}]")
+        bench("get+set", lambda n: run_get_set(make(), n), args.ops)
+        old = bench("recent list: read/insert/slice/write", lambda n: run_legacy_append(make(), n), args.ops)
+        new = bench("recent list: push_capped", lambda n: run_push_capped(make(), n), args.ops)
+        print(f"  speedup: {old / new:.2f}x")
+
+if __name__ == "__main__":
+    main()
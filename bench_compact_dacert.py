@@ -0,0 +1,54 @@
+"""
+Compact (roster bitmap + raw signature) committee DACerts against the JSON
+form: wire size and verification time for several committee sizes.
+
+    python bench_compact_dacert.py --iterations 200
+"""
+import argparse
+import json
+import logging
+import time
+
+import committee_signing
+from canonical_encoding import ENCODINGS, encode
+from committee_signing import CommitteeMember, CommitteeRoster
+
+def make_dacert(members, roster, encoding):
+    payload = {"task_id": "task-abcdef", "model_id": "parallax-llm-v1", "output_hash": "ab" * 32, "timestamp": 1_700_000_000}
+    message = encode(payload, encoding)
+    signers = members[:roster.quorum]
+    return {
+        "cert_payload": payload,
+        "signatures": [m.sign(message) for m in signers],
+        "signers": [m.get_public_key() for m in signers],
+        "quorum": roster.quorum,
+        "epoch": roster.epoch,
+        "encoding": encoding
+    }
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        assert fn()
+    return (time.perf_counter() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{'committee':>9} {'quorum':>6} {'encoding':>12} {'json B':>7} {'compact B':>10} {'ratio':>6} {'json verify us':>15} {'compact verify us':>18}")
+    for epoch, size in enumerate((5, 21, 100), start=1000):
+        members = [CommitteeMember() for _ in range(size)]
+        roster = committee_signing.register_roster(CommitteeRoster(epoch, [m.get_public_key() for m in members], quorum=size * 2 // 3 + 1))
+        for encoding in ENCODINGS:
+            dacert = make_dacert(members, roster, encoding)
+            json_form = json.dumps(dacert, separators=(",", ":")).encode()
+            wire = committee_signing.encode_compact_dacert(dacert)
+            json_us = timed(lambda: committee_signing.verify_committee_dacert(json.loads(json_form)), args.iterations) * 1e6
+            compact_us = timed(lambda: committee_signing.verify_compact_dacert(wire), args.iterations) * 1e6
+            print(f"{size:>9} {roster.quorum:>6} {encoding:>12} {len(json_form):>7} {len(wire):>10} {len(wire) / len(json_form):>6.2f} {json_us:>15.0f} {compact_us:>18.0f}")
+
+if __name__ == "__main__":
+    main()
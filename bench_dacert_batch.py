@@ -0,0 +1,52 @@
+"""
+DACert generation throughput, one generate_dacert call per result versus
+generate_dacerts_batch, for batch sizes 1 to 1024.
+
+    python bench_dacert_batch.py --certs 8192
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+def make_results(n: int):
+    return [
+        (f"task-{i}", {
+            "model_id": "parallax-llm-v1",
+            "input": f"Is SOL going up? #{i}",
+            "output": {"label": "POSITIVE", "score": 0.98},
+            "latency": 0.51
+        })
+        for i in range(n)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--certs", type=int, default=8192, help="certs generated per measurement")
+    parser.add_argument("--quiet", action="store_true", help="silence per-cert INFO logging on the single path")
+    args = parser.parse_args()
+
+    os.environ.setdefault("PARALLAX_NODE_KEY_PATH", os.path.join(tempfile.mkdtemp(), "node_signing_key.hex"))
+    import dacert_generator
+    if args.quiet:
+        logging.getLogger("DACERT").setLevel(logging.WARNING)
+
+    dacert_generator.get_node_key()
+    items = make_results(args.certs)
+
+    start = time.perf_counter()
+    for task_id, result in items:
+        dacert_generator.generate_dacert("node-bench", task_id, result)
+    single = args.certs / (time.perf_counter() - start)
+    print(f"{'single calls':<14} {single:10.0f} certs/sec")
+
+    for size in (1, 4, 16, 64, 256, 1024):
+        start = time.perf_counter()
+        for offset in range(0, args.certs, size):
+            dacert_generator.generate_dacerts_batch("node-bench", items[offset:offset + size])
+        rate = args.certs / (time.perf_counter() - start)
+        print(f"batch {size:<8} {rate:10.0f} certs/sec  ({rate / single:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Merkle-batched DACerts: tree construction, proof generation and proof
+verification for batches up to 100k leaves, against signing every result.
+
+    python bench_merkle_dacert.py --max-leaves 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import merkle_utils
+
+def make_items(n: int):
+    return [(f"task-{i}", {"model_id": "parallax-llm-v1", "output": {"label": "POSITIVE", "score": i / n}}) for i in range(n)]
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-leaves", type=int, default=100_000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("PARALLAX_NODE_KEY_PATH", os.path.join(tempfile.mkdtemp(), "node_signing_key.hex"))
+    import dacert_generator
+    dacert_generator.get_node_key()
+
+    print(f"{'leaves':>8} {'tree ms':>9} {'proofs ms':>10} {'verify us/proof':>16} {'proof B':>8} {'batch cert ms':>14} {'per-task sign ms':>17}")
+    sizes = [n for n in (1_000, 10_000, 100_000) if n <= args.max_leaves]
+    for n in sizes:
+        leaves = [merkle_utils.hash_leaf(f"leaf-{i}".encode()) for i in range(n)]
+        levels, build = timed(lambda: merkle_utils.build_levels(leaves))
+        proofs, prove = timed(lambda: [merkle_utils.build_proof(levels, i) for i in range(n)])
+        root = levels[-1][0]
+        ok, verify = timed(lambda: all(merkle_utils.verify_proof(leaves[i], s, b, root) for i, (s, b) in enumerate(proofs)))
+        assert ok
+        proof_bytes = sum(32 * len(s) for s, _ in proofs) / n
+
+        items = make_items(n)
+        _, batch_cert = timed(lambda: dacert_generator.generate_merkle_dacert("node-bench", items))
+        sample = items[:min(n, 2_000)]
+        _, per_task = timed(lambda: dacert_generator.generate_dacerts_batch("node-bench", sample))
+        per_task_ms = per_task / len(sample) * n * 1e3
+
+        print(f"{n:>8} {build * 1e3:>9.1f} {prove * 1e3:>10.1f} {verify / n * 1e6:>16.2f} {proof_bytes:>8.0f} {batch_cert * 1e3:>14.1f} {per_task_ms:>17.1f}")
+
+if __name__ == "__main__":
+    main()
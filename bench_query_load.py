@@ -0,0 +1,87 @@
+"""
+Concurrent-load benchmark of api.py /query, before and after moving
+inference off the event loop. "inline" is the previous handler, which
+called analyze_sentiment directly inside the async route; "batched" is
+the current /query. /health is probed during the load to show event-loop stalls.
+
+    python bench_query_load.py --requests 400 --concurrency 64 --fake-latency-ms 20
+Without --fake-latency-ms the real sentiment model is used.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+import api
+import sentiment_model
+
+def install_fake_pipeline(base_ms: float, per_item_ms: float):
+    def fake_pipeline(texts):
+        # Sleeping releases the GIL, as torch does during compute
+        time.sleep((base_ms + per_item_ms * len(texts)) / 1000)
+        return [{"label": "LABEL_2", "score": 0.9} for _ in texts]
+    sentiment_model._sentiment_pipeline = fake_pipeline
+
+@api.app.post("/query_inline")
+async def query_inline(request: api.QueryRequest):
+    # The pre-batching handler: blocks the event loop for the whole inference
+    model_output = sentiment_model.analyze_sentiment([request.query])[0]
+    return {"session_id": request.session_id, "result": model_output}
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)] * 1000
+
+async def run_load(client: httpx.AsyncClient, path: str, total: int, concurrency: int):
+    latencies, health = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            resp = await client.post(path, json={"session_id": f"s{i % 50}", "query": f"Solana is great {i}"})
+            resp.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            health.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+
+    print(f"{path:<14} {total / elapsed:8.1f} req/s  "
+          f"p50 {percentile(latencies, 0.5):7.1f} ms  p99 {percentile(latencies, 0.99):7.1f} ms  "
+          f"/health p99 {percentile(health, 0.99):7.1f} ms, {len(health)} probes answered in {elapsed:.1f}s")
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--fake-latency-ms", type=float, default=None)
+    parser.add_argument("--fake-per-item-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.fake_latency_ms is not None:
+        install_fake_pipeline(args.fake_latency_ms, args.fake_per_item_ms)
+    else:
+        sentiment_model.warmup()
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await run_load(client, "/query_inline", args.requests, args.concurrency)
+        await run_load(client, "/query", args.requests, args.concurrency)
+    print("batcher:", api.sentiment_batcher.stats())
+    await api.sentiment_batcher.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
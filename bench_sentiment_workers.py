@@ -0,0 +1,61 @@
+"""
+Tweets/sec of sentiment_model.batch_worker as shard processes are added.
+
+    python bench_sentiment_workers.py --tweets 2000 --workers 1 2 4 8
+"""
+import argparse
+import random
+import time
+
+import sentiment_model
+
+SAMPLE_TEXTS = [
+    "Solana is the future of finance! https://t.co/abc",
+    "The crypto market is collapsing again. Bad news. @trader",
+    "Not sure what's going on with zkML models lately.",
+    "Bitcoin ETF flows look strong this week",
+    "DeFi yields are dropping everywhere, not great",
+]
+
+def make_tweets(n: int):
+    return [
+        {"id": i, "text": random.choice(SAMPLE_TEXTS), "author_id": f"user{i}", "created_at": "2025-05-27", "lang": "en"}
+        for i in range(n)
+    ]
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tweets", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--intra-op-threads", type=int, default=sentiment_model.DEFAULT_INTRA_OP_THREADS)
+    args = parser.parse_args()
+
+    tweets = make_tweets(args.tweets)
+    batches = [tweets[i:i + 100] for i in range(0, len(tweets), 100)]
+
+    sentiment_model.warmup()
+    elapsed = timed(lambda: sentiment_model.batch_worker(batches, mode="thread"))
+    print(f"thread  x4: {args.tweets / elapsed:8.1f} tweets/sec")
+
+    baseline = None
+    for workers in args.workers:
+        # First call starts the pool; one shard per process so every replica is loaded before timing
+        warmup_tweets = make_tweets(workers * sentiment_model.SHARD_SIZE)
+        sentiment_model.batch_worker([warmup_tweets], mode="process", num_workers=workers,
+                                     intra_op_threads=args.intra_op_threads)
+        elapsed = timed(lambda: sentiment_model.batch_worker(
+            batches, mode="process", num_workers=workers, intra_op_threads=args.intra_op_threads
+        ))
+        rate = args.tweets / elapsed
+        baseline = baseline or rate
+        print(f"process x{workers}: {rate:8.1f} tweets/sec  (scaling {rate / baseline:.2f}x)")
+
+    sentiment_model.shutdown_shard_pool()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Signature verification throughput with and without the shared VerifyKey
+cache, on a realistic key mix: a handful of committee keys plus a larger
+node population whose traffic follows a Zipf-like skew.
+
+    python bench_verify_keys.py --verifications 20000
+"""
+import argparse
+import random
+import time
+
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey, VerifyKey
+
+import signature_utils
+
+def make_workload(n: int, nodes: int, committee: int, seed: int = 7):
+    rng = random.Random(seed)
+    keys = [SigningKey.generate() for _ in range(nodes + committee)]
+    node_weights = [1 / (rank + 1) for rank in range(nodes)]
+    workload = []
+    for i in range(n):
+        # Every other verification is a committee signature
+        if i % 2:
+            sk = keys[nodes + rng.randrange(committee)]
+        else:
+            sk = rng.choices(keys[:nodes], weights=node_weights)[0]
+        message = f"cert-{i}".encode()
+        workload.append((message, sk.sign(message).signature, sk.verify_key.encode(encoder=HexEncoder).decode()))
+    return workload
+
+def bench(label: str, verify, workload):
+    start = time.perf_counter()
+    for message, signature, public_key in workload:
+        verify(public_key).verify(message, signature)
+    rate = len(workload) / (time.perf_counter() - start)
+    print(f"{label:<28} {rate:10.0f} verifications/sec")
+    return rate
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verifications", type=int, default=20_000)
+    parser.add_argument("--nodes", type=int, default=200)
+    parser.add_argument("--committee", type=int, default=5)
+    args = parser.parse_args()
+
+    workload = make_workload(args.verifications, args.nodes, args.committee)
+    keys = [public_key for _, _, public_key in workload]
+
+    start = time.perf_counter()
+    for public_key in keys:
+        VerifyKey(public_key, encoder=HexEncoder)
+    decode = time.perf_counter() - start
+    signature_utils.get_verify_key.cache_clear()
+    start = time.perf_counter()
+    for public_key in keys:
+        signature_utils.get_verify_key(public_key)
+    lookup = time.perf_counter() - start
+    print(f"key decode only: {decode / len(keys) * 1e6:.2f}us per call, cached {lookup / len(keys) * 1e6:.2f}us")
+
+    uncached = bench("decode per call", lambda pk: VerifyKey(pk, encoder=HexEncoder), workload)
+    signature_utils.get_verify_key.cache_clear()
+    cached = bench("get_verify_key (cached)", signature_utils.get_verify_key, workload)
+    print(f"  speedup: {cached / uncached:.2f}x  cache: {signature_utils.verify_key_cache_stats()}")
+
+    start = time.perf_counter()
+    signature_utils.verify_batch(workload)
+    print(f"{'verify_batch (cached)':<28} {len(workload) / (time.perf_counter() - start):10.0f} verifications/sec")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,555 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("CACHE_MANAGER")
+
+# "memory" keeps the cache in-process; "redis" talks to REDIS_URI (memory:// selects the local stand-in)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+# Keys held by the in-process backend before least recently used ones are evicted
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10_000))
+
+class WrongTypeError(TypeError):
+    """A list or hash operation hit a key holding another kind of value."""
+
+def _redis_range(length: int, start: int, stop: int) -> range:
+    """Python range for Redis' inclusive, negative-aware start/stop indexes."""
+    if start < 0:
+        start = max(length + start, 0)
+    if stop < 0:
+        stop = length + stop
+    return range(start, min(stop, length - 1) + 1)
+
+class MemoryBackend:
+    """
+    In-process cache with per-key TTL and an LRU bound on the number of keys.
+
+    Lists are deques (O(1) push at either end) and hashes are dicts; every
+    operation runs under one lock, so list push/trim, hash increments and
+    compare-and-set are atomic with respect to each other. Expired keys are
+    dropped lazily when touched and eagerly when room is needed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        default_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._clock = clock
+        # key -> [value, expires_at or None], least recently used first
+        self._data: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # --- Internals (lock held) ---
+
+    def _entry(self, key: str) -> Optional[List[Any]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.default_ttl if ttl is None else ttl
+        return None if ttl is None else self._clock() + ttl
+
+    def _store(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._data[key] = [value, self._expires_at(ttl)]
+        self._data.move_to_end(key)
+        self._enforce_bound()
+
+    def _enforce_bound(self):
+        if len(self._data) <= self.max_entries:
+            return
+        now = self._clock()
+        for key in [k for k, (_, expires_at) in self._data.items() if expires_at is not None and expires_at <= now]:
+            del self._data[key]
+            self.expirations += 1
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def _container(self, key: str, kind: type, create: bool = True):
+        entry = self._entry(key)
+        if entry is None:
+            if not create:
+                return None
+            value = kind()
+            self._store(key, value)
+            return value
+        if not isinstance(entry[0], kind):
+            raise WrongTypeError(f"Key {key} does not hold a {kind.__name__}")
+        return entry[0]
+
+    # --- Strings ---
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            value = entry[0]
+            if isinstance(value, deque):
+                return list(value)
+            if isinstance(value, dict):
+                return dict(value)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def exists(self, key: str) -> bool:
+        with self._lock:
+            return self._entry(key) is not None
+
+    def expire(self, key: str, ttl: float) -> bool:
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                return False
+            entry[1] = self._clock() + ttl
+            return True
+
+    def ttl(self, key: str) -> Optional[float]:
+        """Seconds until key expires, or None if it is missing or has no TTL."""
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None or entry[1] is None:
+                return None
+            return max(entry[1] - self._clock(), 0.0)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            entry = self._entry(key)
+            value = (entry[0] if entry else 0) + amount
+            if entry:
+                entry[0] = value
+            else:
+                self._store(key, value)
+            return value
+
+    def compare_and_set(self, key: str, expected: Any, value: Any, ttl: Optional[float] = None) -> bool:
+        """Sets key to value only if it currently holds expected (None = missing)."""
+        with self._lock:
+            entry = self._entry(key)
+            current = entry[0] if entry else None
+            if current != expected:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    # --- Lists ---
+
+    def lpush(self, key: str, *values: Any) -> int:
+        with self._lock:
+            items = self._container(key, deque)
+            items.extendleft(values)
+            return len(items)
+
+    def rpush(self, key: str, *values: Any) -> int:
+        with self._lock:
+            items = self._container(key, deque)
+            items.extend(values)
+            return len(items)
+
+    def ltrim(self, key: str, start: int, stop: int):
+        with self._lock:
+            items = self._container(key, deque, create=False)
+            if items is None:
+                return
+            keep = _redis_range(len(items), start, stop)
+            if not keep:
+                self._data.pop(key, None)
+                return
+            for _ in range(len(items) - keep.stop):
+                items.pop()
+            for _ in range(keep.start):
+                items.popleft()
+
+    def lrange(self, key: str, start: int = 0, stop: int = -1) -> List[Any]:
+        with self._lock:
+            items = self._container(key, deque, create=False)
+            if items is None:
+                return []
+            span = _redis_range(len(items), start, stop)
+            return list(islice(items, span.start, span.stop)) if span else []
+
+    def llen(self, key: str) -> int:
+        with self._lock:
+            items = self._container(key, deque, create=False)
+            return len(items) if items is not None else 0
+
+    def push_capped(self, key: str, value: Any, capacity: int) -> int:
+        """Newest-first list of at most capacity items: LPUSH + LTRIM as one step."""
+        with self._lock:
+            items = self._container(key, deque)
+            items.appendleft(value)
+            while len(items) > capacity:
+                items.pop()
+            return len(items)
+
+    # --- Hashes ---
+
+    def hset(self, key: str, field: Optional[str] = None, value: Any = None, mapping: Optional[Dict[str, Any]] = None) -> int:
+        """Sets one field and/or a mapping of fields; returns how many fields were new."""
+        updates = dict(mapping or {})
+        if field is not None:
+            updates[field] = value
+        with self._lock:
+            fields = self._container(key, dict)
+            added = sum(1 for f in updates if f not in fields)
+            fields.update(updates)
+            return added
+
+    def hget(self, key: str, field: str, default: Any = None) -> Any:
+        with self._lock:
+            fields = self._container(key, dict, create=False)
+            return fields.get(field, default) if fields is not None else default
+
+    def hgetall(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            fields = self._container(key, dict, create=False)
+            return dict(fields) if fields is not None else {}
+
+    def hdel(self, key: str, *fields: str) -> int:
+        with self._lock:
+            existing = self._container(key, dict, create=False)
+            if existing is None:
+                return 0
+            removed = sum(1 for f in fields if existing.pop(f, None) is not None)
+            if not existing:
+                self._data.pop(key, None)
+            return removed
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        with self._lock:
+            fields = self._container(key, dict)
+            fields[field] = fields.get(field, 0) + amount
+            return fields[field]
+
+    # --- Housekeeping ---
+
+    def flush(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "keys": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+class LocalRedis:
+    """
+    In-process stand-in for the subset of the redis-py client RedisBackend
+    uses, backed by a MemoryBackend holding the encoded strings. Selected by
+    a memory:// REDIS_URI so the Redis code path runs without a server.
+    """
+
+    def __init__(self, store: Optional[MemoryBackend] = None):
+        self.store = store or MemoryBackend()
+        # Bumped on every write, so WATCH can detect concurrent changes
+        self._versions: Dict[str, int] = {}
+
+    def _touch(self, key: str):
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        with self.store._lock:
+            self.store.set(key, value, ttl=ex)
+            self._touch(key)
+        return True
+
+    def delete(self, *keys):
+        with self.store._lock:
+            for key in keys:
+                self._touch(key)
+            return sum(self.store.delete(key) for key in keys)
+
+    def exists(self, key):
+        return int(self.store.exists(key))
+
+    def expire(self, key, seconds):
+        return self.store.expire(key, seconds)
+
+    def incrby(self, key, amount=1):
+        with self.store._lock:
+            value = int(self.store.get(key) or 0) + amount
+            self.store.set(key, str(value).encode())
+            self._touch(key)
+            return value
+
+    def lpush(self, key, *values):
+        with self.store._lock:
+            self._touch(key)
+            return self.store.lpush(key, *values)
+
+    def ltrim(self, key, start, stop):
+        with self.store._lock:
+            self._touch(key)
+            self.store.ltrim(key, start, stop)
+        return True
+
+    def lrange(self, key, start, stop):
+        return self.store.lrange(key, start, stop)
+
+    def llen(self, key):
+        return self.store.llen(key)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        with self.store._lock:
+            self._touch(key)
+            return self.store.hset(key, field, value, mapping=mapping)
+
+    def hget(self, key, field):
+        return self.store.hget(key, field)
+
+    def hgetall(self, key):
+        return self.store.hgetall(key)
+
+    def hdel(self, key, *fields):
+        with self.store._lock:
+            self._touch(key)
+            return self.store.hdel(key, *fields)
+
+    def hincrby(self, key, field, amount=1):
+        with self.store._lock:
+            self._touch(key)
+            value = int(self.store.hget(key, field) or 0) + amount
+            self.store.hset(key, field, str(value).encode())
+            return value
+
+    def flushdb(self):
+        self.store.flush()
+        self._versions.clear()
+
+    def pipeline(self, transaction=True):
+        return _LocalPipeline(self)
+
+class WatchError(Exception):
+    """Raised by LocalRedis pipelines when a watched key changed; mirrors redis.WatchError."""
+
+class _LocalPipeline:
+    """MULTI/EXEC with optimistic WATCH, as redis-py's Pipeline."""
+
+    def __init__(self, client: LocalRedis):
+        self.client = client
+        self._watched: Dict[str, int] = {}
+        self._commands: List[Any] = []
+        self._buffering = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.reset()
+
+    def reset(self):
+        self._watched.clear()
+        self._commands.clear()
+        self._buffering = True
+
+    def watch(self, *keys):
+        self._buffering = False
+        for key in keys:
+            self._watched[key] = self.client._versions.get(key, 0)
+
+    def multi(self):
+        self._buffering = True
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+        if not self._buffering:
+            return command
+        def queue(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        with self.client.store._lock:
+            for key, version in self._watched.items():
+                if self.client._versions.get(key, 0) != version:
+                    self.reset()
+                    raise WatchError(f"Watched key {key} changed")
+            results = [command(*args, **kwargs) for command, args, kwargs in self._commands]
+        self.reset()
+        return results
+
+class RedisBackend:
+    """
+    The MemoryBackend interface over a Redis server (or LocalRedis for
+    memory:// URIs). Values are JSON-encoded; compare_and_set uses
+    WATCH/MULTI and push_capped runs LPUSH + LTRIM in one transaction.
+    The redis package is only imported when a real server is used.
+    """
+
+    def __init__(self, url: Optional[str] = None, client: Any = None):
+        if client is None:
+            if url is None:
+                from settings import REDIS_URI
+                url = REDIS_URI
+            client = self._connect(url)
+        self.client = client
+        self._watch_errors = self._watch_error_types()
+
+    @staticmethod
+    def _connect(url: str):
+        if url.startswith("memory://"):
+            return LocalRedis()
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package (pip install redis)") from e
+        logger.info(f"Connecting cache to {url}")
+        return redis.Redis.from_url(url)
+
+    @staticmethod
+    def _watch_error_types():
+        try:
+            from redis.exceptions import WatchError as RedisWatchError
+            return (WatchError, RedisWatchError)
+        except ImportError:
+            return (WatchError,)
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    @staticmethod
+    def _decode(raw: Optional[bytes], default: Any = None) -> Any:
+        return default if raw is None else json.loads(raw)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._decode(self.client.get(key), default)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.client.set(key, self._encode(value), ex=int(ttl) if ttl else None)
+
+    def delete(self, key: str) -> bool:
+        return bool(self.client.delete(key))
+
+    def exists(self, key: str) -> bool:
+        return bool(self.client.exists(key))
+
+    def expire(self, key: str, ttl: float) -> bool:
+        return bool(self.client.expire(key, int(ttl)))
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        return int(self.client.incrby(key, amount))
+
+    def compare_and_set(self, key: str, expected: Any, value: Any, ttl: Optional[float] = None) -> bool:
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if self._decode(pipe.get(key)) != expected:
+                    return False
+                pipe.multi()
+                pipe.set(key, self._encode(value), ex=int(ttl) if ttl else None)
+                pipe.execute()
+                return True
+            except self._watch_errors:
+                return False
+
+    def lpush(self, key: str, *values: Any) -> int:
+        return self.client.lpush(key, *(self._encode(v) for v in values))
+
+    def ltrim(self, key: str, start: int, stop: int):
+        self.client.ltrim(key, start, stop)
+
+    def lrange(self, key: str, start: int = 0, stop: int = -1) -> List[Any]:
+        return [self._decode(raw) for raw in self.client.lrange(key, start, stop)]
+
+    def llen(self, key: str) -> int:
+        return int(self.client.llen(key))
+
+    def push_capped(self, key: str, value: Any, capacity: int) -> int:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lpush(key, self._encode(value))
+        pipe.ltrim(key, 0, capacity - 1)
+        length, _ = pipe.execute()
+        return min(int(length), capacity)
+
+    def hset(self, key: str, field: Optional[str] = None, value: Any = None, mapping: Optional[Dict[str, Any]] = None) -> int:
+        encoded = {f: self._encode(v) for f, v in (mapping or {}).items()}
+        if field is not None:
+            encoded[field] = self._encode(value)
+        return int(self.client.hset(key, mapping=encoded))
+
+    def hget(self, key: str, field: str, default: Any = None) -> Any:
+        return self._decode(self.client.hget(key, field), default)
+
+    def hgetall(self, key: str) -> Dict[str, Any]:
+        return {
+            (f.decode() if isinstance(f, bytes) else f): self._decode(raw)
+            for f, raw in self.client.hgetall(key).items()
+        }
+
+    def hdel(self, key: str, *fields: str) -> int:
+        return int(self.client.hdel(key, *fields))
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        return int(self.client.hincrby(key, field, amount))
+
+    def flush(self):
+        self.client.flushdb()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+def get_default_backend():
+    """Process-wide backend chosen by CACHE_BACKEND, created on first use."""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = RedisBackend() if CACHE_BACKEND == "redis" else MemoryBackend()
+        return _default_backend
+
+class CacheManager:
+    """
+    Cache facade used by the API layers. Instances share the process-wide
+    backend unless one is passed in, so every CacheManager() sees the same data.
+    """
+
+    def __init__(self, backend: Any = None):
+        self.backend = backend if backend is not None else get_default_backend()
+
+    def __getattr__(self, name: str):
+        # Bind the backend method onto the instance so later lookups skip this hook
+        attr = getattr(self.backend, name)
+        setattr(self, name, attr)
+        return attr
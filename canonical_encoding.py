@@ -0,0 +1,221 @@
+import hashlib
+import json
+import math
+import os
+import struct
+from typing import Any, Optional, Tuple, Union
+
+# Compact, deterministic type-length-value encoding (see _encode_value)
+PCB1 = "pcb1"
+# json.dumps(sort_keys=True).encode(), the form every hash and signature used before pcb1
+JSON_LEGACY = "json-legacy"
+ENCODINGS = (PCB1, JSON_LEGACY)
+
+# Encoding for new hashes, signatures and DACerts; set to json-legacy to keep producing the old form
+DEFAULT_ENCODING = os.getenv("CANONICAL_ENCODING", PCB1)
+
+# Every pcb1 document starts with this, so it can never equal a JSON encoding
+PCB1_MAGIC = b"PCB1"
+
+_float_struct = struct.Struct(">d")
+_pack_float = _float_struct.pack
+_SMALL_VARINTS = [bytes((n,)) for n in range(0x80)]
+
+def _varint(n: int) -> bytes:
+    if n < 0x80:
+        return _SMALL_VARINTS[n]
+    out = bytearray()
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+def _encode_value(value: Any, out: bytearray):
+    """
+    One tag byte per value, then:
+      N/T/F   null, true, false
+      i       zigzag varint integer (arbitrary size)
+      f       IEEE-754 double, big-endian (NaN and infinities are rejected)
+      s / b   varint length + UTF-8 text / raw bytes
+      l       varint count + items (lists and tuples)
+      d       varint count + (key, value) pairs sorted by UTF-8 key bytes; keys must be str
+    """
+    if isinstance(value, str):
+        raw = value.encode("utf-8")
+        out += b"s"
+        out += _varint(len(raw))
+        out += raw
+    elif value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        out += b"i"
+        out += _varint(value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Cannot canonically encode {value}")
+        out += b"f"
+        out += _pack_float(value)
+    elif isinstance(value, (bytes, bytearray)):
+        out += b"b"
+        out += _varint(len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out += b"l"
+        out += _varint(len(value))
+        for item in value:
+            _encode_value(item, out)
+    elif isinstance(value, dict):
+        try:
+            items = sorted((key.encode("utf-8"), item) for key, item in value.items())
+        except AttributeError:
+            raise TypeError("Mapping keys must be str") from None
+        out += b"d"
+        out += _varint(len(items))
+        for key, item in items:
+            out += _varint(len(key))
+            out += key
+            _encode_value(item, out)
+    elif isinstance(value, CanonicalPayload):
+        _encode_value(value.data, out)
+    else:
+        raise TypeError(f"Cannot canonically encode {type(value).__name__}")
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated pcb1 varint")
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+def _read_bytes(data: bytes, pos: int) -> Tuple[bytes, int]:
+    length, pos = _read_varint(data, pos)
+    end = pos + length
+    if end > len(data):
+        raise ValueError("Truncated pcb1 string")
+    return data[pos:end], end
+
+def _decode_value(data: bytes, pos: int) -> Tuple[Any, int]:
+    if pos >= len(data):
+        raise ValueError("Truncated pcb1 document")
+    tag = data[pos:pos + 1]
+    pos += 1
+    if tag == b"s":
+        raw, pos = _read_bytes(data, pos)
+        return raw.decode("utf-8"), pos
+    if tag == b"N":
+        return None, pos
+    if tag == b"T":
+        return True, pos
+    if tag == b"F":
+        return False, pos
+    if tag == b"i":
+        n, pos = _read_varint(data, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == b"f":
+        if pos + 8 > len(data):
+            raise ValueError("Truncated pcb1 float")
+        return _float_struct.unpack_from(data, pos)[0], pos + 8
+    if tag == b"b":
+        return _read_bytes(data, pos)
+    if tag == b"l":
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _decode_value(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == b"d":
+        count, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = _read_bytes(data, pos)
+            result[key.decode("utf-8")], pos = _decode_value(data, pos)
+        return result, pos
+    raise ValueError(f"Unknown pcb1 tag {tag!r}")
+
+def decode_pcb1(data: bytes) -> Any:
+    """
+    Inverse of encode(..., PCB1). Lists and tuples both come back as lists;
+    anything signed over a decoded value must be re-encoded, not reused.
+    """
+    if not data.startswith(PCB1_MAGIC):
+        raise ValueError("Not a pcb1 document")
+    value, pos = _decode_value(data, len(PCB1_MAGIC))
+    if pos != len(data):
+        raise ValueError("Trailing bytes after pcb1 document")
+    return value
+
+class CanonicalPayload:
+    """
+    A payload plus its encoding, memoizing the encoded bytes and digest so a
+    value hashed, signed and verified along one path is serialized once.
+    The wrapped data must not be mutated after the first encode.
+    """
+
+    __slots__ = ("data", "encoding", "_encoded", "_digest")
+
+    def __init__(self, data: Any, encoding: Optional[str] = None):
+        self.data = data
+        self.encoding = encoding or DEFAULT_ENCODING
+        self._encoded: Optional[bytes] = None
+        self._digest: Optional[bytes] = None
+
+    @property
+    def encoded(self) -> bytes:
+        if self._encoded is None:
+            self._encoded = encode(self.data, self.encoding)
+        return self._encoded
+
+    def digest(self) -> bytes:
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.encoded).digest()
+        return self._digest
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+Payload = Union[CanonicalPayload, Any]
+
+def encode(data: Payload, encoding: Optional[str] = None) -> bytes:
+    """Canonical bytes of data in the given encoding (DEFAULT_ENCODING if None)."""
+    encoding = encoding or DEFAULT_ENCODING
+    if isinstance(data, CanonicalPayload):
+        if data.encoding == encoding:
+            return data.encoded
+        data = data.data
+    if encoding == PCB1:
+        out = bytearray(PCB1_MAGIC)
+        _encode_value(data, out)
+        return bytes(out)
+    if encoding == JSON_LEGACY:
+        return json.dumps(data, sort_keys=True).encode()
+    raise ValueError(f"Unknown canonical encoding: {encoding}")
+
+def digest(data: Payload, encoding: Optional[str] = None) -> bytes:
+    if isinstance(data, CanonicalPayload) and data.encoding == (encoding or DEFAULT_ENCODING):
+        return data.digest()
+    return hashlib.sha256(encode(data, encoding)).digest()
+
+def hexdigest(data: Payload, encoding: Optional[str] = None) -> str:
+    """SHA-256 fingerprint of the canonical encoding."""
+    return digest(data, encoding).hex()
+
+def encoding_of(document: dict) -> str:
+    """Encoding a signed document declares; untagged documents predate pcb1 and are legacy JSON."""
+    return document.get("encoding", JSON_LEGACY)
+
+if __name__ == "__main__":
+    sample = {"task_id": "task-123", "model_id": "parallax-llm-v1", "output": {"label": "POSITIVE", "score": 0.98}}
+    for name in ENCODINGS:
+        raw = encode(sample, name)
+        print(f"{name:<12} {len(raw):4d} bytes  {hexdigest(sample, name)}")
@@ -1,12 +1,16 @@
+import asyncio
 import time
 import json
 import logging
-import random
-import hashlib
-from typing import List, Dict, Any
-from nacl.signing import SigningKey, VerifyKey
+import threading
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+from nacl.signing import SigningKey
 from nacl.encoding import HexEncoder
-from nacl.exceptions import BadSignatureError
+
+from canonical_encoding import DEFAULT_ENCODING, PCB1, decode_pcb1, encode, encoding_of, hexdigest
+from dacert_generator import build_merkle_batch
+from signature_utils import get_verify_key, verify_batch
+from stage_metrics import LatencyHistogram
 
 logger = logging.getLogger("COMMITTEE")
 logging.basicConfig(level=logging.INFO)
@@ -15,6 +19,13 @@ logging.basicConfig(level=logging.INFO)
 COMMITTEE_SIZE = 5
 QUORUM_THRESHOLD = 3  # M of N signatures required
 
+# How long one member may take to answer a signature request
+MEMBER_TIMEOUT_SECONDS = 2.0
+
+# Compact DACerts carry raw Ed25519 signatures back to back
+SIGNATURE_BYTES = 64
+COMPACT_DACERT_VERSION = 1
+
 class CommitteeMember:
     def __init__(self):
         self.sk = SigningKey.generate()
@@ -29,52 +40,330 @@ class CommitteeMember:
 # Initialize a static committee
 COMMITTEE: List[CommitteeMember] = [CommitteeMember() for _ in range(COMMITTEE_SIZE)]
 
-def hash_result(result: Dict[str, Any]) -> str:
-    serialized = json.dumps(result, sort_keys=True).encode()
-    return hashlib.sha256(serialized).hexdigest()
+class CommitteeRoster:
+    """
+    One committee epoch: the member public keys in a fixed order plus the
+    quorum. Compact DACerts name their signers by index into this list.
+    """
 
-def sign_result(result: Dict[str, Any]) -> Dict[str, Any]:
-    """Committee signs an inference result and aggregates signatures if quorum is met."""
+    def __init__(self, epoch: int, members: Sequence[str], quorum: int = QUORUM_THRESHOLD):
+        self.epoch = epoch
+        self.members = tuple(members)
+        self.quorum = quorum
+        self._index = {public_key: i for i, public_key in enumerate(self.members)}
+        if len(self._index) != len(self.members):
+            raise ValueError(f"Roster epoch {epoch} lists a member twice")
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def index_of(self, public_key: str) -> int:
+        try:
+            return self._index[public_key]
+        except KeyError:
+            raise ValueError(f"{public_key[:8]} is not in roster epoch {self.epoch}") from None
+
+    def bitmap(self, public_keys: Sequence[str]) -> int:
+        """Signer bitmap: bit i is set when member i signed."""
+        bitmap = 0
+        for public_key in public_keys:
+            bitmap |= 1 << self.index_of(public_key)
+        return bitmap
+
+    def indices(self, bitmap: int) -> List[int]:
+        if bitmap < 0 or bitmap >> len(self.members):
+            raise ValueError(f"Signer bitmap names members outside roster epoch {self.epoch}")
+        return [i for i in range(len(self.members)) if bitmap >> i & 1]
+
+    def fingerprint(self) -> str:
+        return hexdigest({"epoch": self.epoch, "members": list(self.members), "quorum": self.quorum}, PCB1)
+
+_rosters: Dict[int, CommitteeRoster] = {}
+
+def register_roster(roster: CommitteeRoster) -> CommitteeRoster:
+    """Publishes a roster epoch. An epoch is immutable once registered."""
+    existing = _rosters.get(roster.epoch)
+    if existing is not None and existing.fingerprint() != roster.fingerprint():
+        raise ValueError(f"Roster epoch {roster.epoch} is already registered with different members")
+    _rosters[roster.epoch] = roster
+    return roster
+
+def get_roster(epoch: int) -> CommitteeRoster:
+    try:
+        return _rosters[epoch]
+    except KeyError:
+        raise ValueError(f"Unknown roster epoch {epoch}") from None
+
+CURRENT_ROSTER = register_roster(CommitteeRoster(0, [member.get_public_key() for member in COMMITTEE]))
+
+class QuorumError(RuntimeError):
+    def __init__(self, collected: int, quorum: int):
+        super().__init__(f"Quorum not reached: {collected}/{quorum} signatures")
+        self.collected = collected
+        self.quorum = quorum
+
+class LocalSignerService:
+    """
+    In-process stand-in for a remote committee member. delay (seconds, or a
+    callable returning seconds) simulates network and signing latency, and
+    fail makes every request raise.
+    """
+
+    def __init__(self, member: CommitteeMember, delay: Any = 0.0, fail: bool = False):
+        self.member = member
+        self.public_key = member.get_public_key()
+        self.delay = delay
+        self.fail = fail
+
+    async def request_signature(self, message: bytes) -> str:
+        delay = self.delay() if callable(self.delay) else self.delay
+        if delay:
+            await asyncio.sleep(delay)
+        if self.fail:
+            raise RuntimeError(f"Signer {self.public_key[:8]} unavailable")
+        return self.member.sign(message)
+
+class HttpSignerService:
+    """
+    Remote committee member answering POST {url}/sign with {"message": hex}
+    -> {"signature": hex}. The public key comes from the committee roster,
+    never from the response.
+    """
+
+    def __init__(self, url: str, public_key: str, session: Any):
+        self.url = url.rstrip("/")
+        self.public_key = public_key
+        self.session = session
+
+    async def request_signature(self, message: bytes) -> str:
+        async with self.session.post(f"{self.url}/sign", json={"message": message.hex()}) as response:
+            response.raise_for_status()
+            return (await response.json())["signature"]
+
+# Signer services sign_result uses by default: local stand-ins for COMMITTEE
+LOCAL_SIGNERS: List[LocalSignerService] = [LocalSignerService(member) for member in COMMITTEE]
+
+_quorum_lock = threading.Lock()
+_quorum_latency = LatencyHistogram()
+_quorum_failures = 0
+_member_failures = 0
+
+def quorum_latency_stats() -> Dict[str, Any]:
+    """Time to reach quorum (p50/p90/p99 and buckets) plus failure counts."""
+    with _quorum_lock:
+        stats = _quorum_latency.to_dict()
+        stats["quorum_failures"] = _quorum_failures
+        stats["member_failures"] = _member_failures
+        return stats
+
+def reset_quorum_stats():
+    global _quorum_latency, _quorum_failures, _member_failures
+    with _quorum_lock:
+        _quorum_latency = LatencyHistogram()
+        _quorum_failures = 0
+        _member_failures = 0
+
+async def collect_quorum(
+    message: bytes,
+    signers: Sequence[Any],
+    quorum: int = QUORUM_THRESHOLD,
+    member_timeout: float = MEMBER_TIMEOUT_SECONDS
+) -> List[Tuple[str, str]]:
+    """
+    Asks every signer concurrently and returns (public_key, signature) pairs
+    as soon as quorum valid signatures are in; outstanding requests are
+    cancelled. Each member gets member_timeout seconds, and signatures that
+    do not verify against the member's key are discarded. Raises QuorumError
+    once too few members remain to reach quorum.
+    """
+    global _quorum_failures, _member_failures
+    start = time.monotonic()
+
+    async def ask(signer):
+        try:
+            signature = await asyncio.wait_for(signer.request_signature(message), member_timeout)
+            get_verify_key(signer.public_key).verify(message, bytes.fromhex(signature))
+            return signer, signature
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Signer {signer.public_key[:8]} failed: {e!r}")
+            return signer, None
+
+    pending = {asyncio.ensure_future(ask(signer)) for signer in signers}
+    collected: List[Tuple[str, str]] = []
+    failed = 0
+    try:
+        while pending and len(collected) < quorum:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                signer, signature = future.result()
+                if signature is None:
+                    failed += 1
+                elif len(collected) < quorum:
+                    collected.append((signer.public_key, signature))
+            if len(collected) + len(pending) < quorum:
+                break
+    finally:
+        for future in pending:
+            future.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    with _quorum_lock:
+        _member_failures += failed
+        if len(collected) < quorum:
+            _quorum_failures += 1
+        else:
+            _quorum_latency.observe(time.monotonic() - start)
+    if len(collected) < quorum:
+        raise QuorumError(len(collected), quorum)
+    return collected
+
+def hash_result(result: Dict[str, Any], encoding: Optional[str] = None) -> str:
+    return hexdigest(result, encoding)
+
+async def sign_result_async(result: Dict[str, Any], signers: Optional[Sequence[Any]] = None) -> Dict[str, Any]:
+    """Committee signs an inference result; returns once quorum signatures are collected."""
+    encoding = DEFAULT_ENCODING
     payload = {
         "task_id": result["task_id"],
         "model_id": result["model_id"],
-        "output_hash": hash_result(result["output"]),
+        "output_hash": hash_result(result["output"], encoding),
         "timestamp": int(time.time())
     }
+    return await _committee_sign(payload, encoding, signers)
 
-    message = json.dumps(payload, sort_keys=True).encode()
+def sign_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Blocking form of sign_result_async for callers outside an event loop."""
+    return asyncio.run(sign_result_async(result))
 
-    selected_members = random.sample(COMMITTEE, QUORUM_THRESHOLD)
-    signatures = [member.sign(message) for member in selected_members]
-    public_keys = [member.get_public_key() for member in selected_members]
+async def sign_merkle_batch_async(
+    items: List[Tuple[str, Dict[str, Any]]],
+    signers: Optional[Sequence[Any]] = None
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Committee signs one Merkle root over a batch of (task_id, result) pairs.
+    Returns the committee DACert and a per-task inclusion proof
+    (checked with dacert_generator.verify_inclusion).
+    """
+    encoding = DEFAULT_ENCODING
+    root, proofs = build_merkle_batch(items, encoding)
+    payload = {
+        "batch_root": root,
+        "leaf_count": len(items),
+        "timestamp": int(time.time())
+    }
+    return await _committee_sign(payload, encoding, signers), proofs
+
+def sign_merkle_batch(items: List[Tuple[str, Dict[str, Any]]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    return asyncio.run(sign_merkle_batch_async(items))
 
-    logger.info(f" Collected {len(signatures)}/{COMMITTEE_SIZE} signatures")
+async def _committee_sign(payload: Dict[str, Any], encoding: str, signers: Optional[Sequence[Any]]) -> Dict[str, Any]:
+    signers = LOCAL_SIGNERS if signers is None else signers
+    collected = await collect_quorum(encode(payload, encoding), signers)
+
+    logger.info(f" Collected {len(collected)}/{len(signers)} signatures")
 
     dacert = {
         "cert_payload": payload,
-        "signatures": signatures,
-        "signers": public_keys,
-        "quorum": QUORUM_THRESHOLD
+        "signatures": [signature for _, signature in collected],
+        "signers": [public_key for public_key, _ in collected],
+        "quorum": QUORUM_THRESHOLD,
+        "epoch": CURRENT_ROSTER.epoch,
+        "encoding": encoding
     }
 
     return dacert
 
 def verify_committee_dacert(dacert: Dict[str, Any]) -> bool:
-    """Verifies each signature in the DACert payload"""
+    """Verifies every signature in the DACert as one batch over a single serialization."""
     try:
-        message = json.dumps(dacert["cert_payload"], sort_keys=True).encode()
-        for sig, pubkey in zip(dacert["signatures"], dacert["signers"]):
-            verify_key = VerifyKey(pubkey, encoder=HexEncoder)
-            verify_key.verify(message, bytes.fromhex(sig))
+        message = encode(dacert["cert_payload"], encoding_of(dacert))
+        items = [
+            (message, bytes.fromhex(sig), pubkey)
+            for sig, pubkey in zip(dacert["signatures"], dacert["signers"])
+        ]
+        results = verify_batch(items)
+        if not all(results):
+            bad = [dacert["signers"][i] for i, ok in enumerate(results) if not ok]
+            logger.error(f" Invalid signatures from {len(bad)} signer(s): {bad}")
+            return False
         logger.info(" Committee DACert verified successfully")
         return True
-    except BadSignatureError:
-        logger.error(" One or more signatures are invalid")
-        return False
     except Exception as e:
         logger.error(f"Verification failed: {e}")
         return False
 
+def compact_dacert(dacert: Dict[str, Any], roster: Optional[CommitteeRoster] = None) -> Dict[str, Any]:
+    """
+    Compact form of a committee DACert: signers as a bitmap over the roster
+    and signatures as raw bytes concatenated in roster-index order.
+    """
+    roster = roster or get_roster(dacert.get("epoch", CURRENT_ROSTER.epoch))
+    by_index = sorted(zip((roster.index_of(pk) for pk in dacert["signers"]), dacert["signatures"]))
+    if len({i for i, _ in by_index}) != len(by_index):
+        raise ValueError("DACert lists a signer twice")
+    return {
+        "v": COMPACT_DACERT_VERSION,
+        "epoch": roster.epoch,
+        "signers": roster.bitmap(dacert["signers"]),
+        "signatures": b"".join(bytes.fromhex(sig) for _, sig in by_index),
+        "cert_payload": dacert["cert_payload"],
+        "encoding": encoding_of(dacert)
+    }
+
+def encode_compact_dacert(dacert: Dict[str, Any], roster: Optional[CommitteeRoster] = None) -> bytes:
+    """Wire bytes of the compact form (pcb1)."""
+    return encode(compact_dacert(dacert, roster), PCB1)
+
+def decode_compact_dacert(raw: bytes) -> Dict[str, Any]:
+    compact = decode_pcb1(raw)
+    if not isinstance(compact, dict) or compact.get("v") != COMPACT_DACERT_VERSION:
+        raise ValueError("Unsupported compact DACert version")
+    return compact
+
+def _compact_signers(compact: Dict[str, Any]) -> Tuple[CommitteeRoster, List[str], List[bytes]]:
+    roster = get_roster(compact["epoch"])
+    public_keys = [roster.members[i] for i in roster.indices(compact["signers"])]
+    raw = compact["signatures"]
+    if len(raw) != SIGNATURE_BYTES * len(public_keys):
+        raise ValueError(f"Expected {len(public_keys)} signatures, got {len(raw)} bytes")
+    signatures = [raw[i:i + SIGNATURE_BYTES] for i in range(0, len(raw), SIGNATURE_BYTES)]
+    return roster, public_keys, signatures
+
+def expand_compact_dacert(compact: Union[bytes, Dict[str, Any]]) -> Dict[str, Any]:
+    """JSON form of a compact DACert, as produced by sign_result."""
+    if isinstance(compact, bytes):
+        compact = decode_compact_dacert(compact)
+    roster, public_keys, signatures = _compact_signers(compact)
+    return {
+        "cert_payload": compact["cert_payload"],
+        "signatures": [sig.hex() for sig in signatures],
+        "signers": public_keys,
+        "quorum": roster.quorum,
+        "epoch": roster.epoch,
+        "encoding": compact["encoding"]
+    }
+
+def verify_compact_dacert(compact: Union[bytes, Dict[str, Any]]) -> bool:
+    """
+    Resolves signer keys through the roster the cert names and batch-verifies
+    them. Unlike the JSON form, the quorum comes from the roster, not the cert.
+    """
+    try:
+        if isinstance(compact, bytes):
+            compact = decode_compact_dacert(compact)
+        roster, public_keys, signatures = _compact_signers(compact)
+        if len(public_keys) < roster.quorum:
+            logger.error(f" Only {len(public_keys)}/{roster.quorum} roster signatures")
+            return False
+        message = encode(compact["cert_payload"], compact["encoding"])
+        return all(verify_batch([(message, sig, pk) for sig, pk in zip(signatures, public_keys)]))
+    except Exception as e:
+        logger.error(f"Compact verification failed: {e}")
+        return False
+
 if __name__ == "__main__":
     # Simulated result from a node
     inference_result = {
@@ -91,3 +380,6 @@ if __name__ == "__main__":
     dacert = sign_result(inference_result)
     print(json.dumps(dacert, indent=2))
     print(f"Verification passed: {verify_committee_dacert(dacert)}")
+
+    wire = encode_compact_dacert(dacert)
+    print(f"Compact form: {len(wire)} bytes vs {len(json.dumps(dacert))} bytes JSON, verified: {verify_compact_dacert(wire)}")
@@ -1,58 +1,172 @@
 import json
 import logging
+import os
+import threading
 import time
-import hashlib
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
-from nacl.signing import SigningKey, VerifyKey
+from nacl.signing import SigningKey
 from nacl.encoding import HexEncoder
 from nacl.exceptions import BadSignatureError
 
+from canonical_encoding import DEFAULT_ENCODING, CanonicalPayload, encode, encoding_of, hexdigest
+from merkle_utils import build_levels, build_proof, hash_leaf, verify_proof
+from signature_utils import DEFAULT_PRIVATE_KEY_PATH, generate_key_pair, get_verify_key, load_private_key, save_private_key
+
 logger = logging.getLogger("DACERT")
 logging.basicConfig(level=logging.INFO)
 
-# Generate or load private key for this node (for mock signing)
-PRIVATE_KEY = SigningKey.generate()
-PUBLIC_KEY = PRIVATE_KEY.verify_key.encode(encoder=HexEncoder).decode()
+# Where this node's signing key lives; created on first use if missing
+NODE_KEY_PATH = os.getenv("PARALLAX_NODE_KEY_PATH", DEFAULT_PRIVATE_KEY_PATH)
+
+_node_key: Optional[Tuple[SigningKey, str]] = None
+_node_key_lock = threading.Lock()
 
-def hash_payload(data: dict) -> str:
+def get_node_key() -> Tuple[SigningKey, str]:
+    """
+    (signing key, hex public key) of this node, loaded from NODE_KEY_PATH on
+    first use so the identity survives restarts. A key is generated and
+    saved there if none exists yet.
+    """
+    global _node_key
+    with _node_key_lock:
+        if _node_key is None:
+            try:
+                signing_key = load_private_key(NODE_KEY_PATH)
+            except FileNotFoundError:
+                sk_hex, _ = generate_key_pair()
+                save_private_key(sk_hex, NODE_KEY_PATH)
+                signing_key = load_private_key(NODE_KEY_PATH)
+                logger.info(f"Generated new node signing key at {NODE_KEY_PATH}")
+            _node_key = (signing_key, signing_key.verify_key.encode(encoder=HexEncoder).decode())
+        return _node_key
+
+def hash_payload(data: dict, encoding: Optional[str] = None) -> str:
     """Hash a dictionary to generate a fingerprint for the DACert."""
-    serialized = json.dumps(data, sort_keys=True).encode()
-    return hashlib.sha256(serialized).hexdigest()
+    return hexdigest(data, encoding)
 
 def generate_dacert(node_id: str, task_id: str, result: dict) -> dict:
     """
     Generate a DACert for an inference result.
     This certificate will include the result hash, node metadata, and a signature.
     """
+    dacert = generate_dacerts_batch(node_id, [(task_id, result)])[0]
+    logger.info(f" DACert generated for task {task_id}")
+    return dacert
+
+def generate_dacerts_batch(node_id: str, items: Sequence[Tuple[str, dict]]) -> List[dict]:
+    """
+    DACerts for many (task_id, result) pairs in one pass: the node key is
+    resolved once, all certs share one timestamp, and canonicalize, hash
+    and sign run back to back per result with no per-cert logging.
+    Results may be CanonicalPayloads whose encoding is already memoized.
+    Certs are tagged with the canonical encoding their hash and signature use.
+    """
+    signing_key, public_key = get_node_key()
     timestamp = int(time.time())
+    encoding = DEFAULT_ENCODING
+    sign = signing_key.sign
+
+    dacerts = []
+    for task_id, result in items:
+        data = result.data if isinstance(result, CanonicalPayload) else result
+        cert_payload = {
+            "node_id": node_id,
+            "task_id": task_id,
+            "model_id": data["model_id"],
+            "output_hash": hexdigest(result, encoding),
+            "timestamp": timestamp,
+        }
+        signature = sign(encode(cert_payload, encoding)).signature.hex()
+        dacerts.append({
+            "cert_payload": cert_payload,
+            "signature": signature,
+            "public_key": public_key,
+            "encoding": encoding
+        })
+
+    if len(items) > 1:
+        logger.info(f" {len(dacerts)} DACerts generated for node {node_id}")
+    return dacerts
+
+def merkle_leaf(task_id: str, output_hash: str, encoding: str) -> bytes:
+    return hash_leaf(encode({"task_id": task_id, "output_hash": output_hash}, encoding))
+
+def build_merkle_batch(items: Sequence[Tuple[str, dict]], encoding: Optional[str] = None) -> Tuple[str, List[dict]]:
+    """
+    Merkle root (hex) over (task_id, output_hash) leaves for a batch of
+    results, plus one inclusion proof per task in input order.
+    """
+    encoding = encoding or DEFAULT_ENCODING
+    output_hashes = [hexdigest(result, encoding) for _, result in items]
+    levels = build_levels([merkle_leaf(task_id, h, encoding) for (task_id, _), h in zip(items, output_hashes)])
+    root = levels[-1][0].hex()
 
+    proofs = []
+    for index, ((task_id, _), output_hash) in enumerate(zip(items, output_hashes)):
+        siblings, path_bits = build_proof(levels, index)
+        proofs.append({
+            "task_id": task_id,
+            "output_hash": output_hash,
+            "leaf_index": index,
+            "siblings": [sibling.hex() for sibling in siblings],
+            "path_bits": path_bits,
+            "batch_root": root
+        })
+    return root, proofs
+
+def generate_merkle_dacert(node_id: str, items: Sequence[Tuple[str, dict]]) -> Tuple[dict, List[dict]]:
+    """
+    One DACert signing the Merkle root of a whole batch, plus a compact
+    inclusion proof per task, so a single signature covers N results.
+    """
+    signing_key, public_key = get_node_key()
+    encoding = DEFAULT_ENCODING
+    root, proofs = build_merkle_batch(items, encoding)
     cert_payload = {
         "node_id": node_id,
-        "task_id": task_id,
-        "model_id": result["model_id"],
-        "output_hash": hash_payload(result),
-        "timestamp": timestamp,
+        "batch_root": root,
+        "leaf_count": len(items),
+        "timestamp": int(time.time()),
     }
-
-    message = json.dumps(cert_payload, sort_keys=True).encode()
-    signature = PRIVATE_KEY.sign(message).signature.hex()
-
     dacert = {
         "cert_payload": cert_payload,
-        "signature": signature,
-        "public_key": PUBLIC_KEY
+        "signature": signing_key.sign(encode(cert_payload, encoding)).signature.hex(),
+        "public_key": public_key,
+        "encoding": encoding
     }
+    logger.info(f" Merkle DACert generated for {len(items)} tasks (root {root[:16]})")
+    return dacert, proofs
 
-    logger.info(f" DACert generated for task {task_id}")
-    return dacert
+def verify_inclusion(batch_cert: dict, proof: dict, result: Optional[dict] = None) -> bool:
+    """
+    Checks a task's inclusion proof against a batch DACert's root (the
+    cert signature is checked separately, once per batch). With result,
+    also checks that the proof's output_hash is that result's hash.
+    """
+    try:
+        encoding = encoding_of(batch_cert)
+        if result is not None and hexdigest(result, encoding) != proof["output_hash"]:
+            return False
+        root = bytes.fromhex(batch_cert["cert_payload"]["batch_root"])
+        siblings = [bytes.fromhex(sibling) for sibling in proof["siblings"]]
+        leaf = merkle_leaf(proof["task_id"], proof["output_hash"], encoding)
+        return verify_proof(leaf, siblings, proof["path_bits"], root)
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Malformed inclusion proof: {e}")
+        return False
+
+def verify_merkle_batch(batch_cert: dict, proofs: Sequence[dict]) -> List[bool]:
+    """Verifies the root signature once, then each proof; all False if the signature is bad."""
+    if not verify_dacert(batch_cert):
+        return [False] * len(proofs)
+    return [verify_inclusion(batch_cert, proof) for proof in proofs]
 
 def verify_dacert(dacert: dict) -> bool:
-    """Verify the DACert signature using the included public key."""
+    """Verify the DACert signature using the included public key (legacy JSON if the cert has no encoding tag)."""
     try:
-        verify_key = VerifyKey(dacert["public_key"], encoder=HexEncoder)
-        message = json.dumps(dacert["cert_payload"], sort_keys=True).encode()
-        verify_key.verify(message, bytes.fromhex(dacert["signature"]))
+        message = encode(dacert["cert_payload"], encoding_of(dacert))
+        get_verify_key(dacert["public_key"]).verify(message, bytes.fromhex(dacert["signature"]))
         logger.info(" DACert verified successfully")
         return True
     except BadSignatureError:
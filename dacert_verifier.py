@@ -0,0 +1,142 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from canonical_encoding import encode, encoding_of, hexdigest
+from inference_batcher import InferenceBatcher
+from signature_utils import verify_batch
+from stage_metrics import LatencyHistogram
+
+logger = logging.getLogger("DACERT_VERIFIER")
+
+# Submissions verified together in one worker call
+VERIFY_BATCH_SIZE = int(os.getenv("DACERT_VERIFY_BATCH_SIZE", 64))
+# How long the first submission of a batch waits for company
+VERIFY_MAX_WAIT_MS = float(os.getenv("DACERT_VERIFY_MAX_WAIT_MS", 2.0))
+# Submissions admitted (queued or verifying) before new ones are refused
+VERIFY_MAX_QUEUE_DEPTH = int(os.getenv("DACERT_VERIFY_MAX_QUEUE_DEPTH", 1024))
+VERIFY_WORKERS = int(os.getenv("DACERT_VERIFY_WORKERS", 2))
+# Hashes of certs that already verified, so resubmissions skip the signature check
+VERIFIED_CACHE_SIZE = 10_000
+
+# (dacert, result, expected public key or None)
+Submission = Tuple[Dict[str, Any], Any, Optional[str]]
+
+def _check_binding(dacert: Dict[str, Any], result: Any, public_key: Optional[str]) -> Optional[str]:
+    """Checks everything except the signature; returns a rejection reason or None."""
+    if public_key is not None and dacert["public_key"] != public_key:
+        return "public key does not match the assigned node"
+    if hexdigest(result, encoding_of(dacert)) != dacert["cert_payload"]["output_hash"]:
+        return "output hash does not match the result"
+    return None
+
+def verify_submissions(submissions: List[Submission]) -> List[Optional[str]]:
+    """
+    Worker-side check of many node DACerts: result binding per cert, then
+    one batched signature verification. Returns a rejection reason per
+    submission, None for the ones that verify.
+    """
+    reasons: List[Optional[str]] = [None] * len(submissions)
+    triples, positions = [], []
+    for i, (dacert, result, public_key) in enumerate(submissions):
+        try:
+            reasons[i] = _check_binding(dacert, result, public_key)
+            if reasons[i] is None:
+                message = encode(dacert["cert_payload"], encoding_of(dacert))
+                triples.append((message, bytes.fromhex(dacert["signature"]), dacert["public_key"]))
+                positions.append(i)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            reasons[i] = f"malformed DACert: {e}"
+    for i, ok in zip(positions, verify_batch(triples)):
+        if not ok:
+            reasons[i] = "invalid signature"
+    return reasons
+
+class DACertVerifier:
+    """
+    Asynchronous verification stage for submitted DACerts. Submissions are
+    batched onto a worker pool (an InferenceBatcher over verify_submissions),
+    so signature checks never run on the event loop. Certs that verified
+    are remembered by hash and only re-checked for their result binding.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = VERIFY_BATCH_SIZE,
+        max_wait_ms: float = VERIFY_MAX_WAIT_MS,
+        max_queue_depth: int = VERIFY_MAX_QUEUE_DEPTH,
+        workers: int = VERIFY_WORKERS,
+        cache_size: int = VERIFIED_CACHE_SIZE
+    ):
+        self._batcher = InferenceBatcher(
+            verify_submissions,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            max_queue_depth=max_queue_depth,
+            workers=workers,
+            name="dacert-verify"
+        )
+        self.cache_size = cache_size
+        self._verified: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._latency = LatencyHistogram()
+        self._accepted = 0
+        self._rejected = 0
+        self._cache_hits = 0
+
+    async def verify(self, dacert: Dict[str, Any], result: Any, public_key: Optional[str] = None) -> Optional[str]:
+        """
+        Verifies a node DACert for result, optionally pinned to public_key.
+        Returns None when it verifies, otherwise the rejection reason.
+        Raises QueueFullError when the stage is saturated.
+        """
+        start = time.perf_counter()
+        try:
+            cert_hash = hexdigest(dacert, encoding_of(dacert))
+        except (TypeError, ValueError, AttributeError) as e:
+            return self._finish(f"malformed DACert: {e}", start)
+        if cert_hash in self._verified:
+            self._verified.move_to_end(cert_hash)
+            self._cache_hits += 1
+            try:
+                reason = _check_binding(dacert, result, public_key)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                reason = f"malformed DACert: {e}"
+            return self._finish(reason, start)
+
+        reason = await self._batcher.submit((dacert, result, public_key))
+        if reason is None:
+            self._verified[cert_hash] = None
+            if len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return self._finish(reason, start)
+
+    def _finish(self, reason: Optional[str], start: float) -> Optional[str]:
+        with self._lock:
+            self._latency.observe(time.perf_counter() - start)
+            if reason is None:
+                self._accepted += 1
+            else:
+                self._rejected += 1
+        return reason
+
+    def stats(self) -> Dict[str, Any]:
+        batcher = self._batcher.stats()
+        with self._lock:
+            return {
+                "queue_depth": batcher["queue_depth"],
+                "max_queue_depth": batcher["max_queue_depth"],
+                "batches": batcher["batches"],
+                "avg_batch_size": batcher["avg_batch_size"],
+                "accepted": self._accepted,
+                "rejected": self._rejected,
+                "cache_hits": self._cache_hits,
+                "cached_certs": len(self._verified),
+                "latency_seconds": self._latency.to_dict()
+            }
+
+    async def stop(self):
+        await self._batcher.stop()
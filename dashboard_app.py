@@ -59,13 +59,13 @@ async def model_analytics():
 @app.get("/analytics/nodes")
 async def node_health():
     return {
-        "nodes": cache.get("node_health") or {}
+        "nodes": cache.hgetall("node_health")
     }
 
 @app.get("/analytics/recent")
 async def recent_tasks():
     return {
-        "recent_tasks": cache.get("recent_tasks") or []
+        "recent_tasks": cache.lrange("recent_tasks")
     }
 
 @app.websocket("/ws")
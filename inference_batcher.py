@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("INFERENCE_BATCHER")
+
+# Largest number of inputs coalesced into one pipeline call
+DEFAULT_MAX_BATCH_SIZE = 32
+# How long the first request of a batch waits for company
+DEFAULT_MAX_WAIT_MS = 5.0
+# Inputs admitted (queued or running) before new work is refused
+DEFAULT_MAX_QUEUE_DEPTH = 256
+# Batches run concurrently on this many executor threads
+DEFAULT_WORKERS = 2
+
+class QueueFullError(RuntimeError):
+    pass
+
+class InferenceBatcher:
+    """
+    Coalesces concurrent single-input requests into batched calls of
+    batch_fn (List[input] -> List[output]) that run on a bounded thread
+    pool, keeping blocking inference off the event loop. Admission is
+    capped at max_queue_depth inputs; beyond that submit raises QueueFullError.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        max_queue_depth: int = DEFAULT_MAX_QUEUE_DEPTH,
+        workers: int = DEFAULT_WORKERS,
+        name: str = "inference"
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_depth = max_queue_depth
+        self.workers = workers
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._collectors: List[asyncio.Task] = []
+        self._pending = 0
+        self._batches = 0
+        self._batched_inputs = 0
+
+    @property
+    def depth(self) -> int:
+        """Inputs admitted and not yet answered."""
+        return self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._pending,
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self._batches,
+            "avg_batch_size": round(self._batched_inputs / self._batches, 2) if self._batches else 0.0
+        }
+
+    def start(self):
+        """Starts the collectors on the running loop; called lazily by submit if needed."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+        self._collectors = [asyncio.get_running_loop().create_task(self._collect()) for _ in range(self.workers)]
+        logger.info(f"{self.name} batcher started ({self.workers} workers, batch <= {self.max_batch_size})")
+
+    async def stop(self):
+        """Stops the collectors and cancels every request still waiting for a result."""
+        for task in self._collectors:
+            task.cancel()
+        await asyncio.gather(*self._collectors, return_exceptions=True)
+        self._collectors = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+            self._queue = None
+        if self._executor is not None:
+            # A batch already running in a thread finishes, but nothing queued behind it starts
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _admit(self, count: int):
+        if self._pending + count > self.max_queue_depth:
+            raise QueueFullError(f"{self.name} queue full ({self._pending}/{self.max_queue_depth})")
+        self._pending += count
+
+    async def submit(self, item: Any) -> Any:
+        return (await self.submit_many([item]))[0]
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        """Queues all items (admitted together or not at all) and waits for every result."""
+        self.start()
+        self._admit(len(items))
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in items]
+        for item, future in zip(items, futures):
+            self._queue.put_nowait((item, future))
+        try:
+            return list(await asyncio.gather(*futures))
+        finally:
+            self._pending -= len(items)
+
+    async def _next_batch(self) -> List[Tuple[Any, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [(item, future) for item, future in await self._next_batch() if not future.done()]
+            if not batch:
+                continue
+            self._batches += 1
+            self._batched_inputs += len(batch)
+            try:
+                results = await loop.run_in_executor(self._executor, self.batch_fn, [item for item, _ in batch])
+                if len(results) != len(batch):
+                    # Outputs can no longer be matched to inputs by position, so none are trusted
+                    raise RuntimeError(f"{self.name} batch function returned {len(results)} results for {len(batch)} inputs")
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Batched {self.name} failed for {len(batch)} inputs: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
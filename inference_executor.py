@@ -1,10 +1,12 @@
 import time
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from transformers import pipeline, Pipeline
 from pathlib import Path
 
+from ai_model_registry import AIModel, registry as model_registry, build_model_map
+
 logger = logging.getLogger("INFERENCE_EXECUTOR")
 
 # Available models and their preloaded pipelines
@@ -14,12 +16,25 @@ LOADED_MODELS: Dict[str, Pipeline] = {}
 MODEL_CACHE = Path("./model_cache")
 MODEL_CACHE.mkdir(exist_ok=True)
 
-# Map of known model identifiers to HuggingFace models
-MODEL_MAP = {
-    "parallax-llm-v1": "distilbert-base-uncased-finetuned-sst-2-english",
-    "vision-encoder-v2": "nlpconnect/vit-gpt2-image-captioning",
-    "quant-forecast-lite": "mrm8488/bert-tiny-finetuned-financial-news-sentiment"
-}
+# Map of known model identifiers to HuggingFace models, derived from the model registry
+MODEL_MAP: Dict[str, str] = build_model_map(model_registry)
+
+
+def _on_registry_change(event: str, model: AIModel):
+    """Keeps MODEL_MAP and loaded pipelines in step with the registry."""
+    if event in ("removed", "unavailable") or model.status != "available":
+        MODEL_MAP.pop(model.model_id, None)
+        if LOADED_MODELS.pop(model.model_id, None) is not None:
+            logger.info(f" Unloaded model {model.model_id} ({event})")
+        return
+
+    if MODEL_MAP.get(model.model_id) != model.source:
+        # New model, or its source changed: drop any stale pipeline
+        LOADED_MODELS.pop(model.model_id, None)
+        MODEL_MAP[model.model_id] = model.source
+
+
+model_registry.subscribe(_on_registry_change)
 
 
 def load_model(model_id: str) -> Pipeline:
@@ -55,12 +70,17 @@ def load_model(model_id: str) -> Pipeline:
     return LOADED_MODELS[model_id]
 
 
-def run_inference(model_id: str, user_input: str) -> Dict[str, Any]:
-    """Executes inference for a given model ID and input text or image."""
+def run_inference(model_id: str, user_input: str, timeline: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Executes inference for a given model ID and input text or image.
+    If a timeline dict is given, monotonic "model_loaded" and "inferred" marks are recorded in it.
+    """
     start_time = time.time()
 
     try:
         model_pipeline = load_model(model_id)
+        if timeline is not None:
+            timeline["model_loaded"] = time.monotonic()
         logger.info(f" Running inference using model '{model_id}'...")
 
         if callable(model_pipeline) and not isinstance(model_pipeline, Pipeline):
@@ -71,6 +91,8 @@ def run_inference(model_id: str, user_input: str) -> Dict[str, Any]:
             output = model_pipeline(user_input)
             result = output[0] if isinstance(output, list) else output
 
+        if timeline is not None:
+            timeline["inferred"] = time.monotonic()
         elapsed = round(time.time() - start_time, 3)
         logger.info(f" Inference complete in {elapsed}s")
         return {
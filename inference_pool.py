@@ -0,0 +1,61 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# Threads for inference calls that may be abandoned at their deadline
+INFERENCE_POOL_SIZE = int(os.getenv("INFERENCE_POOL_SIZE", 4))
+
+class InferencePoolFull(RuntimeError):
+    pass
+
+class BoundedInferencePool:
+    """
+    Dedicated executor for deadline-bound inference. A call abandoned at its
+    deadline cannot be interrupted, so it keeps its slot until it actually
+    returns; once every slot is taken, submit refuses new work instead of
+    queueing it behind runaway calls.
+    """
+
+    def __init__(self, size: int = INFERENCE_POOL_SIZE):
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="deadline-inference")
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    @property
+    def available(self) -> int:
+        return self.size - self._in_flight
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Runs fn on a free slot; raises InferencePoolFull when there is none."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise InferencePoolFull(f"All {self.size} inference slots are busy")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": self.size, "in_flight": self._in_flight, "rejected": self._rejected}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Shared by the scheduler workers (or the node loop) of one process
+INFERENCE_POOL = BoundedInferencePool()
@@ -0,0 +1,56 @@
+import hashlib
+from typing import List, Sequence, Tuple
+
+# Domain separation: a leaf hash can never be mistaken for an interior node
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+def hash_leaf(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+def hash_node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+def build_levels(leaf_hashes: Sequence[bytes]) -> List[List[bytes]]:
+    """
+    All tree levels, leaves first and the root last. An odd node at the
+    end of a level is promoted to the next level unchanged, so it has no
+    sibling at that level.
+    """
+    if not leaf_hashes:
+        raise ValueError("Cannot build a Merkle tree with no leaves")
+    sha256, prefix = hashlib.sha256, NODE_PREFIX
+    levels = [list(leaf_hashes)]
+    level = levels[0]
+    while len(level) > 1:
+        parents = [sha256(prefix + level[i] + level[i + 1]).digest() for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+        level = parents
+    return levels
+
+def merkle_root(leaf_hashes: Sequence[bytes]) -> bytes:
+    return build_levels(leaf_hashes)[-1][0]
+
+def build_proof(levels: List[List[bytes]], index: int) -> Tuple[List[bytes], int]:
+    """
+    Inclusion proof for leaf index: the sibling hashes from the leaf up, and
+    a bitmask whose bit i is set when sibling i sits on the left.
+    """
+    siblings: List[bytes] = []
+    path_bits = 0
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            if sibling < index:
+                path_bits |= 1 << len(siblings)
+            siblings.append(level[sibling])
+        index //= 2
+    return siblings, path_bits
+
+def verify_proof(leaf_hash: bytes, siblings: Sequence[bytes], path_bits: int, root: bytes) -> bool:
+    node = leaf_hash
+    for i, sibling in enumerate(siblings):
+        node = hash_node(sibling, node) if path_bits >> i & 1 else hash_node(node, sibling)
+    return node == root
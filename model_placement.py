@@ -0,0 +1,194 @@
+import logging
+import math
+import threading
+from typing import Dict, List, Optional, Set
+
+from ai_model_registry import ModelRegistry
+
+logger = logging.getLogger("MODEL_PLACEMENT")
+
+# Every known model keeps at least this many replicas so it stays routable
+MIN_REPLICAS = 1
+
+# Replicas scale with demand share: a model with 40% of demand on 10 nodes wants 4 * factor
+REPLICATION_FACTOR = 1.0
+
+class PlacementPlanner:
+    """
+    Assigns model replicas to nodes within each node's memory budget.
+
+    Replica counts follow each model's share of demand, and replicas are
+    bin-packed best-fit (tightest node that still fits), largest models
+    first, never two replicas of a model on one node. rebalance() only
+    adds or drops the replicas whose target changed, so existing
+    assignments stay put as demand shifts.
+    """
+
+    def __init__(
+        self,
+        model_sizes: Optional[Dict[str, int]] = None,
+        min_replicas: int = MIN_REPLICAS,
+        replication_factor: float = REPLICATION_FACTOR
+    ):
+        self.model_sizes: Dict[str, int] = dict(model_sizes or {})
+        self.min_replicas = min_replicas
+        self.replication_factor = replication_factor
+        self.node_memory: Dict[str, int] = {}
+        self.demand: Dict[str, float] = {}
+        self.placement: Dict[str, Set[str]] = {}
+        self.unplaced: Dict[str, int] = {}
+        self.version = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_registry(cls, registry: ModelRegistry, **kwargs) -> "PlacementPlanner":
+        sizes = {m.model_id: m.size_mb for m in registry.iter_models(status="available")}
+        return cls(sizes, **kwargs)
+
+    # --- Inputs ---
+
+    def set_model(self, model_id: str, size_mb: int):
+        with self._lock:
+            if self.model_sizes.get(model_id) != size_mb:
+                self._drop_model_replicas(model_id)
+            self.model_sizes[model_id] = size_mb
+
+    def remove_model(self, model_id: str):
+        with self._lock:
+            self.model_sizes.pop(model_id, None)
+            self.demand.pop(model_id, None)
+            self._drop_model_replicas(model_id)
+
+    def add_node(self, node_id: str, memory_mb: int):
+        with self._lock:
+            if node_id in self.node_memory:
+                self.remove_node(node_id)
+            self.node_memory[node_id] = memory_mb
+
+    def remove_node(self, node_id: str):
+        with self._lock:
+            self.node_memory.pop(node_id, None)
+            for nodes in self.placement.values():
+                nodes.discard(node_id)
+
+    def set_demand(self, model_id: str, demand: float):
+        with self._lock:
+            self.demand[model_id] = max(demand, 0.0)
+
+    def record_demand(self, model_id: str, amount: float = 1.0):
+        with self._lock:
+            self.demand[model_id] = self.demand.get(model_id, 0.0) + amount
+
+    def decay_demand(self, factor: float):
+        """Ages demand (e.g. factor 0.5 per interval) so placement follows recent load."""
+        with self._lock:
+            for model_id in self.demand:
+                self.demand[model_id] *= factor
+
+    # --- Planning ---
+
+    def desired_replicas(self, model_id: str) -> int:
+        nodes = len(self.node_memory)
+        if not nodes:
+            return 0
+        total = sum(self.demand.get(m, 0.0) for m in self.model_sizes)
+        share = self.demand.get(model_id, 0.0) / total if total else 0.0
+        wanted = math.ceil(share * nodes * self.replication_factor)
+        return min(max(wanted, self.min_replicas), nodes)
+
+    def used_mb(self, node_id: str) -> int:
+        return sum(self.model_sizes[m] for m, nodes in self.placement.items() if node_id in nodes)
+
+    def free_mb(self, node_id: str) -> int:
+        return self.node_memory[node_id] - self.used_mb(node_id)
+
+    def _drop_model_replicas(self, model_id: str):
+        self.placement.pop(model_id, None)
+        self.unplaced.pop(model_id, None)
+
+    def _place_replica(self, model_id: str, free: Dict[str, int]) -> bool:
+        size = self.model_sizes[model_id]
+        hosts = self.placement.setdefault(model_id, set())
+        candidates = [n for n, mb in free.items() if mb >= size and n not in hosts]
+        if not candidates:
+            return False
+        node_id = min(candidates, key=lambda n: (free[n] - size, n))
+        hosts.add(node_id)
+        free[node_id] -= size
+        return True
+
+    def rebalance(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Brings replica counts in line with demand, moving as little as possible.
+        Returns the per-node changes as {node_id: {"load": [...], "unload": [...]}}.
+        """
+        with self._lock:
+            before = {m: set(nodes) for m, nodes in self.placement.items()}
+            targets = {m: self.desired_replicas(m) for m in self.model_sizes}
+
+            # Shrink first so freed memory is available to models that grow
+            for model_id, target in targets.items():
+                hosts = self.placement.get(model_id, set())
+                while len(hosts) > target:
+                    hosts.discard(max(hosts, key=lambda n: (self.used_mb(n) / self.node_memory[n], n)))
+
+            free = {n: self.free_mb(n) for n in self.node_memory}
+            self.unplaced = {}
+            for model_id in sorted(targets, key=lambda m: (-self.model_sizes[m], m)):
+                missing = targets[model_id] - len(self.placement.get(model_id, set()))
+                for _ in range(missing):
+                    if not self._place_replica(model_id, free):
+                        self.unplaced[model_id] = self.unplaced.get(model_id, 0) + 1
+                if model_id in self.unplaced:
+                    logger.warning(f"Could not place {self.unplaced[model_id]} replica(s) of {model_id}: out of memory")
+
+            self.placement = {m: nodes for m, nodes in self.placement.items() if nodes}
+            changes = self._diff(before, self.placement)
+            if changes:
+                self.version += 1
+                logger.info(f"Placement v{self.version}: {changes}")
+            return changes
+
+    def compute(self) -> Dict[str, List[str]]:
+        """Full re-plan from scratch; rebalance() is preferred once a plan exists."""
+        with self._lock:
+            self.placement = {}
+            self.rebalance()
+            return self.plan()
+
+    @staticmethod
+    def _diff(before: Dict[str, Set[str]], after: Dict[str, Set[str]]) -> Dict[str, Dict[str, List[str]]]:
+        changes: Dict[str, Dict[str, List[str]]] = {}
+        for model_id in set(before) | set(after):
+            old, new = before.get(model_id, set()), after.get(model_id, set())
+            for node_id in new - old:
+                changes.setdefault(node_id, {"load": [], "unload": []})["load"].append(model_id)
+            for node_id in old - new:
+                changes.setdefault(node_id, {"load": [], "unload": []})["unload"].append(model_id)
+        for change in changes.values():
+            change["load"].sort()
+            change["unload"].sort()
+        return changes
+
+    # --- Outputs ---
+
+    def assignments_for(self, node_id: str) -> List[str]:
+        with self._lock:
+            return sorted(m for m, nodes in self.placement.items() if node_id in nodes)
+
+    def plan(self) -> Dict[str, List[str]]:
+        with self._lock:
+            return {node_id: self.assignments_for(node_id) for node_id in self.node_memory}
+
+if __name__ == "__main__":
+    planner = PlacementPlanner({"parallax-llm-v1": 420, "quant-forecast-lite": 275, "vision-encoder-v2": 680})
+    planner.add_node("node-A", 1024)
+    planner.add_node("node-B", 2048)
+    planner.add_node("node-C", 768)
+    planner.add_node("node-D", 1536)
+    print("Initial:", planner.compute())
+
+    planner.set_demand("parallax-llm-v1", 90)
+    planner.set_demand("quant-forecast-lite", 10)
+    print("Changes:", planner.rebalance())
+    print("Hot LLM:", planner.plan())
@@ -1,19 +1,22 @@
 import asyncio
 import logging
+import os
 import uuid
 import json
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Set
 
-from inference_executor import run_inference
-from dacert_generator import generate_dacert
-from registration_client import register_node
-from retryable_tx import submit_result_retryable
+from inference_executor import run_inference, load_model, LOADED_MODELS
+from dacert_generator import generate_dacert, get_node_key
+from inference_pool import INFERENCE_POOL, InferencePoolFull
+from registration_client import register_node, fetch_placement
+from retryable_tx import submit_result_retryable, report_task_expired
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("PARALLAX_NODE")
 
-# Unique identifier for the node
-NODE_ID = str(uuid.uuid4())
+# Unique identifier for the node; set PARALLAX_NODE_ID to share it with node_status_reporter
+NODE_ID = os.getenv("PARALLAX_NODE_ID") or str(uuid.uuid4())
 
 # Mock Sequencer URL
 SEQUENCER_URL = "http://localhost:5050"
@@ -21,8 +24,42 @@ SEQUENCER_URL = "http://localhost:5050"
 # Polling interval in seconds
 POLL_INTERVAL = 5
 
-# Sample local cache of registered capabilities
-REGISTERED_MODELS = ["parallax-llm-v1", "vision-encoder-v2", "quant-forecast-lite"]
+# Memory this node offers for models; the sequencer's placement plan decides what to load
+NODE_MEMORY_MB = int(os.getenv("NODE_MEMORY_MB", 2048))
+
+# Seconds between placement plan refreshes
+PLACEMENT_REFRESH_INTERVAL = 30
+
+# Models currently assigned to (and loaded on) this node
+REGISTERED_MODELS: List[str] = []
+
+# Expiry reports in flight; the task loop does not wait for them
+_background_reports: Set[asyncio.Task] = set()
+
+def report_expired_in_background(session, task_id: str, reason: str):
+    report = asyncio.get_running_loop().create_task(report_task_expired(session, task_id, reason))
+    _background_reports.add(report)
+    report.add_done_callback(_background_reports.discard)
+
+
+async def sync_placement():
+    """Loads newly assigned models and unloads ones the plan moved elsewhere."""
+    assigned = await fetch_placement(SEQUENCER_URL, NODE_ID)
+    if assigned is None or assigned == REGISTERED_MODELS:
+        return
+
+    loop = asyncio.get_running_loop()
+    for model_id in set(REGISTERED_MODELS) - set(assigned):
+        LOADED_MODELS.pop(model_id, None)
+        logger.info(f" Unloaded {model_id} (no longer assigned)")
+    for model_id in set(assigned) - set(REGISTERED_MODELS):
+        try:
+            await loop.run_in_executor(None, load_model, model_id)
+            logger.info(f" Loaded assigned model {model_id}")
+        except Exception as e:
+            logger.error(f" Failed to load assigned model {model_id}: {e}")
+
+    REGISTERED_MODELS[:] = assigned
 
 
 async def fetch_task(session) -> Dict[str, Any] | None:
@@ -46,19 +83,33 @@ async def main():
     registration_payload = {
         "node_id": NODE_ID,
         "capabilities": REGISTERED_MODELS,
-        "public_key": "dummy_pubkey_123"
+        # The sequencer only accepts DACerts signed with this key
+        "public_key": get_node_key()[1],
+        "memory_mb": NODE_MEMORY_MB
     }
 
     logger.info(" Registering node with sequencer...")
-    async with register_node(SEQUENCER_URL, registration_payload) as success:
-        if not success:
-            logger.error(" Registration failed. Exiting.")
-            return
+    success = await register_node(SEQUENCER_URL, registration_payload)
+    if not success:
+        logger.error(" Registration failed. Exiting.")
+        return
 
-    logger.info(" Registration successful. Entering task loop...")
+    await sync_placement()
+    last_sync = time.monotonic()
+    logger.info(f" Registration successful with models {REGISTERED_MODELS}. Entering task loop...")
 
     async with aiohttp.ClientSession() as session:
         while True:
+            if time.monotonic() - last_sync >= PLACEMENT_REFRESH_INTERVAL:
+                await sync_placement()
+                last_sync = time.monotonic()
+
+            # Abandoned inferences hold their slots until they finish; take no work until one frees up
+            if not INFERENCE_POOL.available:
+                logger.warning(" All inference slots busy with abandoned work, not fetching tasks")
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+
             task = await fetch_task(session)
 
             if not task:
@@ -67,12 +118,34 @@ async def main():
                 continue
 
             try:
+                deadline = task.get("deadline")
+                if deadline is not None and time.time() >= deadline:
+                    logger.warning(f" Task {task['task_id']} already past its deadline, dropping")
+                    report_expired_in_background(session, task["task_id"], "expired_before_inference")
+                    continue
+
                 logger.info(f" Executing task {task['task_id']}...")
-                result = run_inference(task["model"], task["input"])
+                try:
+                    inference = INFERENCE_POOL.submit(run_inference, task["model"], task["input"])
+                except InferencePoolFull:
+                    # Only if a slot was lost since the check above; give the task back rather than hold it
+                    logger.warning(f" Inference pool full, dropping task {task['task_id']}")
+                    report_expired_in_background(session, task["task_id"], "inference_pool_full")
+                    continue
+                # Wall-clock deadline from the sequencer, as a local monotonic one
+                local_deadline = time.monotonic() + (deadline - time.time()) if deadline is not None else None
+                try:
+                    timeout = local_deadline - time.monotonic() if local_deadline is not None else None
+                    result = await asyncio.wait_for(asyncio.wrap_future(inference), timeout=timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f" Task {task['task_id']} hit its deadline during inference, abandoning")
+                    report_expired_in_background(session, task["task_id"], "deadline_during_inference")
+                    continue
+
                 dacert = generate_dacert(NODE_ID, task["task_id"], result)
 
                 logger.info(f" Submitting result with DACert...")
-                success = await submit_result_retryable(session, task["task_id"], result, dacert)
+                success = await submit_result_retryable(session, task["task_id"], result, dacert, deadline=local_deadline)
 
                 if success:
                     logger.info(f" Successfully submitted result for task {task['task_id']}")
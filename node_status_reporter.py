@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import os
 import socket
 import uuid
 import time
@@ -8,13 +9,17 @@ import platform
 import aiohttp
 from typing import Dict
 
+from registration_client import fetch_placement
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("NODE_REPORTER")
 
 SEQUENCER_URL = "http://localhost:5050"
-NODE_ID = f"node-{uuid.uuid4().hex[:8]}"
+# The node_runtime this reporter runs beside, if any (same PARALLAX_NODE_ID)
+RUNTIME_NODE_ID = os.getenv("PARALLAX_NODE_ID")
+NODE_ID = RUNTIME_NODE_ID or f"node-{uuid.uuid4().hex[:8]}"
 
-# Sample metadata
+# Sample metadata; SUPPORTED_MODELS follows the sequencer's placement plan once one exists
 SUPPORTED_MODELS = ["parallax-llm-v1", "quant-forecast-lite"]
 REGION = "us-central"
 START_TIME = int(time.time())
@@ -32,8 +37,17 @@ class NodeState:
         self.cpu_load = round(random.uniform(2.0, 40.0), 2)
         self.memory_used_mb = round(random.uniform(200.0, 1600.0), 2)
         self.inference_count += random.randint(0, 3)
-        model = random.choice(SUPPORTED_MODELS)
-        self.model_usage[model] += 1
+        if SUPPORTED_MODELS:
+            model = random.choice(SUPPORTED_MODELS)
+            self.model_usage[model] = self.model_usage.get(model, 0) + 1
+
+async def refresh_supported_models():
+    # Only a registered node has a placement; a standalone reporter keeps its sample models
+    if RUNTIME_NODE_ID is None:
+        return
+    assigned = await fetch_placement(SEQUENCER_URL, NODE_ID)
+    if assigned is not None:
+        SUPPORTED_MODELS[:] = assigned
 
 state = NodeState()
 
@@ -69,6 +83,7 @@ async def send_status(session: aiohttp.ClientSession):
 async def reporter_loop(interval: int = 15):
     async with aiohttp.ClientSession() as session:
         while True:
+            await refresh_supported_models()
             await send_status(session)
             await asyncio.sleep(interval)
 
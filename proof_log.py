@@ -0,0 +1,225 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("PROOF_LOG")
+
+# Segments rotate once they reach this size
+SEGMENT_BYTES = 64 * 1024 * 1024
+# Appends arriving within this window share one write and one fsync
+GROUP_COMMIT_MS = 5.0
+# Largest number of records in one group commit
+GROUP_COMMIT_MAX_RECORDS = 4096
+
+_SEGMENT_PREFIX = "proofs-"
+_SEGMENT_SUFFIX = ".log"
+_CLOSE = object()
+
+class ProofLog:
+    """
+    Append-only proof store: one JSON record per line in rotating segment
+    files under directory, with an in-memory task_id -> (segment, offset,
+    length) index rebuilt from the segments on open.
+
+    Appends are handed to a background writer that commits everything queued
+    within group_commit_ms as one write followed by one fsync; the Future
+    returned by append resolves once the record is durable. Records are
+    readable through get() as soon as they are appended.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = SEGMENT_BYTES,
+        group_commit_ms: float = GROUP_COMMIT_MS,
+        max_batch: int = GROUP_COMMIT_MAX_RECORDS,
+        fsync: bool = True
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.group_commit = group_commit_ms / 1000
+        self.max_batch = max_batch
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[int, int, int]] = {}
+        # task_id -> (append seq, record) until the record is committed
+        self._pending: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._append_seq = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._commits = 0
+        self._records = 0
+
+        self._segment_id = self._recover()
+        self._file = open(self._segment_path(self._segment_id), "ab")
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="proof-log-writer", daemon=True)
+        self._writer.start()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index) + sum(1 for task_id in self._pending if task_id not in self._index)
+
+    def __contains__(self, task_id: str) -> bool:
+        with self._lock:
+            return task_id in self._index or task_id in self._pending
+
+    # --- Public API ---
+
+    def append(self, task_id: str, record: Dict[str, Any]) -> Future:
+        return self.append_many([(task_id, record)])[0]
+
+    def append_many(self, items: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Future]:
+        """Queues (task_id, record) pairs; each Future resolves once its record is fsynced."""
+        if self._closed:
+            raise RuntimeError("Proof log is closed")
+        lines = [json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n" for _, record in items]
+        futures = []
+        with self._lock:
+            for (task_id, record), line in zip(items, lines):
+                future: Future = Future()
+                self._append_seq += 1
+                self._pending[task_id] = (self._append_seq, record)
+                self._queue.put((task_id, line, future, self._append_seq))
+                futures.append(future)
+        return futures
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """The latest record for task_id, or None."""
+        with self._lock:
+            pending = self._pending.get(task_id)
+            if pending is not None:
+                return pending[1]
+            location = self._index.get(task_id)
+        if location is None:
+            return None
+        segment_id, offset, length = location
+        with open(self._segment_path(segment_id), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def flush(self, timeout: Optional[float] = None):
+        """Blocks until everything appended so far is durable."""
+        marker: Future = Future()
+        self._queue.put((None, b"", marker, 0))
+        marker.result(timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_CLOSE)
+        self._writer.join()
+        self._file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "records": len(self._index),
+                "pending": len(self._pending),
+                "segment": self._segment_id,
+                "group_commits": self._commits,
+                "avg_group_size": round(self._records / self._commits, 2) if self._commits else 0.0
+            }
+
+    # --- Segments ---
+
+    def _segment_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"{_SEGMENT_PREFIX}{segment_id:06d}{_SEGMENT_SUFFIX}")
+
+    def _segment_ids(self) -> List[int]:
+        ids = []
+        for name in os.listdir(self.directory):
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+                ids.append(int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]))
+        return sorted(ids)
+
+    def _recover(self) -> int:
+        """Rebuilds the index from existing segments, dropping a torn final record."""
+        segment_ids = self._segment_ids()
+        for segment_id in segment_ids:
+            path = self._segment_path(segment_id)
+            offset = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        logger.warning(f"Truncating torn record at {path}:{offset}")
+                        f.close()
+                        os.truncate(path, offset)
+                        break
+                    try:
+                        task_id = json.loads(line)["task_id"]
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning(f"Skipping unreadable record at {path}:{offset}")
+                    else:
+                        self._index[task_id] = (segment_id, offset, len(line))
+                    offset += len(line)
+        if self._index:
+            logger.info(f"Recovered {len(self._index)} proofs from {len(segment_ids)} segments")
+        return segment_ids[-1] if segment_ids else 1
+
+    # --- Writer thread ---
+
+    def _next_group(self) -> List[Any]:
+        group = [self._queue.get()]
+        deadline = time.monotonic() + self.group_commit
+        while len(group) < self.max_batch and group[-1] is not _CLOSE:
+            remaining = deadline - time.monotonic()
+            try:
+                group.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return group
+
+    def _run(self):
+        while True:
+            group = self._next_group()
+            closing = group[-1] is _CLOSE
+            entries = [entry for entry in group if entry is not _CLOSE]
+            try:
+                self._commit(entries)
+            except Exception as e:
+                logger.error(f"Proof log commit of {len(entries)} records failed: {e}")
+                with self._lock:
+                    for task_id, _, future, seq in entries:
+                        self._forget_pending(task_id, seq)
+                        future.set_exception(e)
+            if closing:
+                return
+
+    def _forget_pending(self, task_id: Optional[str], seq: int):
+        # A newer append for the same task may still be queued
+        pending = self._pending.get(task_id)
+        if pending is not None and pending[0] == seq:
+            del self._pending[task_id]
+
+    def _commit(self, entries: List[Tuple[Optional[str], bytes, Future, int]]):
+        records = [entry for entry in entries if entry[0] is not None]
+        if records:
+            if self._file.tell() >= self.segment_bytes:
+                self._file.close()
+                self._segment_id += 1
+                self._file = open(self._segment_path(self._segment_id), "ab")
+            offset = self._file.tell()
+            locations = []
+            for _, line, _, _ in records:
+                locations.append((self._segment_id, offset, len(line)))
+                offset += len(line)
+            self._file.write(b"".join(line for _, line, _, _ in records))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            with self._lock:
+                for (task_id, _, _, seq), location in zip(records, locations):
+                    self._index[task_id] = location
+                    self._forget_pending(task_id, seq)
+                self._commits += 1
+                self._records += len(records)
+        for _, _, future, _ in entries:
+            future.set_result(None)
@@ -1,6 +1,6 @@
 import aiohttp
 import logging
-from typing import Dict
+from typing import Dict, List, Optional
 
 logger = logging.getLogger("REGISTRATION")
 
@@ -11,6 +11,7 @@ async def register_node(sequencer_url: str, payload: Dict) -> bool:
       - node_id
       - capabilities (list of supported models)
       - public_key (for verifying DACerts)
+      - memory_mb (optional; the sequencer then assigns models to the node)
     """
     endpoint = f"{sequencer_url}/register_node"
     try:
@@ -46,6 +47,22 @@ async def check_node_status(sequencer_url: str, node_id: str) -> Dict:
         logger.error(f"Error checking status: {e}")
         return {}
 
+async def fetch_placement(sequencer_url: str, node_id: str) -> Optional[List[str]]:
+    """Models the sequencer's placement plan assigns to this node, or None if unavailable."""
+    endpoint = f"{sequencer_url}/placement/{node_id}"
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(endpoint) as resp:
+                if resp.status == 200:
+                    response = await resp.json()
+                    return response["models"]
+                error = await resp.text()
+                logger.warning(f"Could not fetch placement: {resp.status} - {error}")
+                return None
+    except Exception as e:
+        logger.error(f"Error fetching placement: {e}")
+        return None
+
 if __name__ == "__main__":
     import asyncio
 
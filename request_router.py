@@ -1,6 +1,8 @@
 import time
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
+
+from ai_model_registry import AIModel, registry as model_registry
 
 logger = logging.getLogger("ROUTER")
 
@@ -12,9 +14,26 @@ ROUTING_STRATEGY = "round_robin"
 
 _last_assigned_node_index = 0  # For round-robin fallback
 
+# Models that can currently be routed, kept current through registry notifications
+AVAILABLE_MODELS: Set[str] = model_registry.find_model_ids(status="available")
+
+
+def _on_registry_change(event: str, model: AIModel):
+    if event in ("removed", "unavailable") or model.status != "available":
+        AVAILABLE_MODELS.discard(model.model_id)
+    else:
+        AVAILABLE_MODELS.add(model.model_id)
+
+
+model_registry.subscribe(_on_registry_change)
+
 
 def find_compatible_node(task: Dict) -> Optional[str]:
     """Select a compatible node for a given task."""
+    if task["model"] not in AVAILABLE_MODELS:
+        logger.warning("Model not available in registry: " + task["model"])
+        return None
+
     compatible_nodes = [
         node_id for node_id, info in REGISTERED_NODES.items()
         if task["model"] in info["capabilities"]
@@ -2,7 +2,8 @@ import aiohttp
 import asyncio
 import logging
 import json
-from typing import Dict
+import time
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger("RETRYABLE_TX")
 logging.basicConfig(level=logging.INFO)
@@ -10,10 +11,21 @@ logging.basicConfig(level=logging.INFO)
 MAX_RETRIES = 5
 INITIAL_DELAY = 2  # seconds
 RETRY_ENDPOINT = "/submit_result"
+EXPIRE_ENDPOINT = "/expire_task"
 
-async def submit_result_retryable(session: aiohttp.ClientSession, task_id: str, result: Dict, dacert: Dict) -> bool:
+async def submit_result_retryable(
+    session: aiohttp.ClientSession,
+    task_id: str,
+    result: Dict,
+    dacert: Dict,
+    attempt_log: Optional[List[Tuple[float, float]]] = None,
+    deadline: Optional[float] = None
+) -> bool:
     """
     Submits an inference result and DACert to the sequencer with retry logic.
+    When attempt_log is given, the monotonic (start, end) of every HTTP attempt is appended to it.
+    With a monotonic deadline, each attempt is bounded by the time left and
+    no retry is scheduled that would start after it.
     """
     attempt = 0
     delay = INITIAL_DELAY
@@ -26,9 +38,18 @@ async def submit_result_retryable(session: aiohttp.ClientSession, task_id: str,
     }
 
     while attempt < MAX_RETRIES:
+        started = time.monotonic()
+        timeout = None
+        if deadline is not None:
+            if deadline <= started:
+                logger.warning(f" Deadline passed, giving up on task {task_id} after {attempt} attempts")
+                return False
+            timeout = aiohttp.ClientTimeout(total=deadline - started)
         try:
-            async with session.post(endpoint, json=payload) as resp:
+            async with session.post(endpoint, json=payload, timeout=timeout) as resp:
                 if resp.status == 200:
+                    if attempt_log is not None:
+                        attempt_log.append((started, time.monotonic()))
                     logger.info(f" Result successfully submitted on attempt {attempt + 1}")
                     return True
                 else:
@@ -38,7 +59,13 @@ async def submit_result_retryable(session: aiohttp.ClientSession, task_id: str,
         except Exception as e:
             logger.warning(f"Attempt {attempt + 1} raised exception: {e}")
 
+        if attempt_log is not None:
+            attempt_log.append((started, time.monotonic()))
+
         attempt += 1
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            logger.warning(f" No time left to retry task {task_id} before its deadline")
+            return False
         logger.info(f" Retrying in {delay}s...")
         await asyncio.sleep(delay)
         delay *= 2  # Exponential backoff
@@ -47,6 +74,23 @@ async def submit_result_retryable(session: aiohttp.ClientSession, task_id: str,
     return False
 
 
+async def report_task_expired(session: aiohttp.ClientSession, task_id: str, reason: str) -> bool:
+    """
+    Tells the sequencer a task passed its deadline and was dropped by this node.
+    Best effort: a single attempt, since the task is already dead.
+    """
+    endpoint = f"http://localhost:5050{EXPIRE_ENDPOINT}"
+    try:
+        async with session.post(endpoint, json={"task_id": task_id, "reason": reason}) as resp:
+            if resp.status == 200:
+                logger.info(f" Reported expiry of task {task_id} ({reason})")
+                return True
+            logger.warning(f"Expiry report for {task_id} rejected: {resp.status}")
+    except Exception as e:
+        logger.warning(f"Failed to report expiry of task {task_id}: {e}")
+    return False
+
+
 async def simulate_submission():
     """Test function for standalone execution"""
     test_task_id = "task-567"
@@ -0,0 +1,155 @@
+import logging
+import math
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("SENTIMENT_AGGREGATOR")
+
+SENTIMENT_LABELS = ("Negative", "Neutral", "Positive")
+_LABEL_INDEX = {label: i for i, label in enumerate(SENTIMENT_LABELS)}
+
+# Default ring: one-minute buckets covering the last hour
+DEFAULT_BUCKET_SECONDS = 60
+DEFAULT_NUM_BUCKETS = 60
+
+class _KeywordRing:
+    """Fixed-size ring of time buckets holding per-label counts and confidence sums."""
+
+    def __init__(self, num_buckets: int):
+        self.bucket_ids = [-1] * num_buckets
+        self.counts = [[0] * len(SENTIMENT_LABELS) for _ in range(num_buckets)]
+        self.confidence = [[0.0] * len(SENTIMENT_LABELS) for _ in range(num_buckets)]
+
+    def add(self, bucket_id: int, label_index: int, confidence: float) -> bool:
+        slot = bucket_id % len(self.bucket_ids)
+        current = self.bucket_ids[slot]
+        if current > bucket_id:
+            return False  # older than the ring span, already overwritten
+        if current != bucket_id:
+            self.bucket_ids[slot] = bucket_id
+            self.counts[slot] = [0] * len(SENTIMENT_LABELS)
+            self.confidence[slot] = [0.0] * len(SENTIMENT_LABELS)
+        self.counts[slot][label_index] += 1
+        self.confidence[slot][label_index] += confidence
+        return True
+
+class SentimentAggregator:
+    """
+    Incremental per-keyword sentiment counts over a rolling window.
+    Each keyword owns a ring of num_buckets buckets of bucket_seconds each, so
+    memory is fixed and a window query touches at most num_buckets buckets
+    regardless of how many tweets were seen.
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[str],
+        bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+        num_buckets: int = DEFAULT_NUM_BUCKETS
+    ):
+        self.keywords = list(keywords)
+        if not self.keywords:
+            raise ValueError("At least one keyword is required")
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = num_buckets
+        self._canonical = {k.lower(): k for k in self.keywords}
+        self._pattern = re.compile(
+            r"\b(" + "|".join(re.escape(k) for k in self.keywords) + r")\b",
+            re.IGNORECASE
+        )
+        self._rings = {k: _KeywordRing(num_buckets) for k in self.keywords}
+        self._lock = threading.Lock()
+
+    @property
+    def span_seconds(self) -> int:
+        return self.bucket_seconds * self.num_buckets
+
+    def match_keywords(self, text: str) -> List[str]:
+        return list({self._canonical[m.lower()] for m in self._pattern.findall(text)})
+
+    def add(self, text: str, sentiment: str, confidence: float, timestamp: Optional[float] = None) -> List[str]:
+        """Counts one classified text under every keyword it mentions; returns those keywords."""
+        label_index = _LABEL_INDEX.get(sentiment)
+        if label_index is None:
+            logger.debug(f"Ignoring unknown sentiment label: {sentiment}")
+            return []
+
+        keywords = self.match_keywords(text)
+        if not keywords:
+            return []
+
+        bucket_id = int((timestamp if timestamp is not None else time.time()) // self.bucket_seconds)
+        with self._lock:
+            for keyword in keywords:
+                self._rings[keyword].add(bucket_id, label_index, confidence)
+        return keywords
+
+    def add_result(self, result: Dict[str, Any]) -> List[str]:
+        """Counts an entry produced by sentiment_model.analyze_sentiment."""
+        return self.add(result["text"], result["sentiment"], result["confidence"], result.get("timestamp"))
+
+    def window(self, keyword: str, window_seconds: int, now: Optional[float] = None) -> Dict[str, Any]:
+        """Sentiment for one keyword over the last window_seconds (capped at the ring span)."""
+        if keyword not in self._rings:
+            keyword = self._canonical.get(keyword.lower(), keyword)
+        ring = self._rings.get(keyword)
+        if ring is None:
+            raise KeyError(f"Untracked keyword: {keyword}")
+
+        newest = int((now if now is not None else time.time()) // self.bucket_seconds)
+        span = min(max(math.ceil(window_seconds / self.bucket_seconds), 1), self.num_buckets)
+        oldest = newest - span + 1
+
+        counts = [0] * len(SENTIMENT_LABELS)
+        confidence = [0.0] * len(SENTIMENT_LABELS)
+        with self._lock:
+            for slot, bucket_id in enumerate(ring.bucket_ids):
+                if oldest <= bucket_id <= newest:
+                    for i in range(len(SENTIMENT_LABELS)):
+                        counts[i] += ring.counts[slot][i]
+                        confidence[i] += ring.confidence[slot][i]
+
+        total = sum(counts)
+        positive = counts[_LABEL_INDEX["Positive"]]
+        negative = counts[_LABEL_INDEX["Negative"]]
+        return {
+            "keyword": keyword,
+            "window_seconds": span * self.bucket_seconds,
+            "count": total,
+            "counts": dict(zip(SENTIMENT_LABELS, counts)),
+            "avg_confidence": {
+                label: round(confidence[i] / counts[i], 4) if counts[i] else 0.0
+                for i, label in enumerate(SENTIMENT_LABELS)
+            },
+            # Net sentiment in [-1, 1]: share of positive minus share of negative
+            "score": round((positive - negative) / total, 4) if total else 0.0
+        }
+
+    def snapshot(self, window_seconds: int, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        return {k: self.window(k, window_seconds, now) for k in self.keywords}
+
+    def chart_data(self, window_seconds: int, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Net score per keyword in the shape frontend_renderer.render_sentiment_chart expects."""
+        return [
+            {"label": keyword, "value": stats["score"]}
+            for keyword, stats in self.snapshot(window_seconds, now).items()
+        ]
+
+if __name__ == "__main__":
+    import random
+
+    aggregator = SentimentAggregator(["Solana", "Bitcoin", "zkML"])
+    start = time.time() - 3600
+    for i in range(100_000):
+        text = random.choice(["Solana to the moon", "Bitcoin dumps again", "zkML and solana", "gm"])
+        aggregator.add(text, random.choice(SENTIMENT_LABELS), random.random(), start + i * 0.036)
+
+    t = time.perf_counter()
+    five_min = aggregator.window("Solana", 300)
+    one_hour = aggregator.window("Solana", 3600)
+    print(f"Queries answered in {(time.perf_counter() - t) * 1000:.3f} ms")
+    print("5m:", five_min)
+    print("1h:", one_hour)
+    print("Chart:", aggregator.chart_data(300))
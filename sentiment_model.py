@@ -1,16 +1,25 @@
 import logging
-import re
+import multiprocessing
+import os
+import threading
 import time
-from typing import List, Dict, Any
-from transformers import pipeline, Pipeline
-from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import text_normalizer
+
+if TYPE_CHECKING:
+    from transformers import Pipeline
+    from sentiment_aggregator import SentimentAggregator
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SENTIMENT_MODEL")
 
-# Load the model once
+# The model is loaded once, on first use or through warmup(), never at import time
 MODEL_ID = "cardiffnlp/twitter-roberta-base-sentiment"
-sentiment_pipeline: Pipeline = pipeline("sentiment-analysis", model=MODEL_ID)
+_sentiment_pipeline: Optional["Pipeline"] = None
+_pipeline_lock = threading.Lock()
 
 # Optionally define class mapping if model uses numeric labels
 LABEL_MAPPING = {
@@ -19,25 +28,52 @@ LABEL_MAPPING = {
     "LABEL_2": "Positive"
 }
 
+# --- Process-sharded batch_worker settings ---
+# Tweets per task sent to a shard process
+SHARD_SIZE = 64
+# torch intra-op threads per shard process; one per process avoids oversubscribing cores
+DEFAULT_INTRA_OP_THREADS = int(os.getenv("SENTIMENT_INTRA_OP_THREADS", 1))
+# "spawn" keeps torch state out of forked children
+SHARD_START_METHOD = os.getenv("SENTIMENT_SHARD_START_METHOD", "spawn")
+# Marks a slot whose shard failed
+_FAILED_LABEL = 255
+
+def get_sentiment_pipeline() -> "Pipeline":
+    """Returns the shared sentiment pipeline, building it on first call."""
+    global _sentiment_pipeline
+    if _sentiment_pipeline is None:
+        with _pipeline_lock:
+            if _sentiment_pipeline is None:
+                from transformers import pipeline
+                logger.info(f"Loading sentiment model {MODEL_ID}...")
+                start = time.monotonic()
+                _sentiment_pipeline = pipeline("sentiment-analysis", model=MODEL_ID)
+                logger.info(f"Sentiment model loaded in {time.monotonic() - start:.2f}s")
+    return _sentiment_pipeline
+
+def warmup():
+    """Loads the model and runs one dummy inference so the first real request is not slow."""
+    get_sentiment_pipeline()(["warmup"])
+
+def is_ready() -> bool:
+    return _sentiment_pipeline is not None
+
 def clean_text(text: str) -> str:
     """Clean tweet text by removing mentions, URLs, and extra spaces."""
-    text = re.sub(r"http\S+", "", text)
-    text = re.sub(r"@\w+", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    return text_normalizer.clean_text(text)
 
 def analyze_sentiment(texts: List[str]) -> List[Dict[str, Any]]:
     """Runs sentiment analysis on a list of texts."""
-    cleaned = [clean_text(t) for t in texts]
-    results = sentiment_pipeline(cleaned)
+    cleaned = text_normalizer.clean_texts(texts)
+    results = get_sentiment_pipeline()(cleaned)
 
     output = []
     timestamp = int(time.time())
-    for original, result in zip(texts, results):
+    for original, cleaned_text, result in zip(texts, cleaned, results):
         label = LABEL_MAPPING.get(result["label"], result["label"])
         entry = {
             "text": original,
-            "cleaned_text": clean_text(original),
+            "cleaned_text": cleaned_text,
             "sentiment": label,
             "confidence": round(result["score"], 4),
             "timestamp": timestamp
@@ -63,9 +99,14 @@ def process_tweet_batch(tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 
     return enriched
 
-def process_streamed_tweet(tweet: Dict[str, Any]) -> Dict[str, Any]:
-    """Processes a single tweet dictionary for real-time use cases."""
+def process_streamed_tweet(tweet: Dict[str, Any], aggregator: Optional["SentimentAggregator"] = None) -> Dict[str, Any]:
+    """
+    Processes a single tweet dictionary for real-time use cases.
+    If an aggregator is given, the result is also counted into its rolling windows.
+    """
     result = analyze_sentiment([tweet["text"]])[0]
+    if aggregator is not None:
+        aggregator.add_result(result)
     return {
         "id": tweet.get("id"),
         "author_id": tweet.get("author_id"),
@@ -74,10 +115,151 @@ def process_streamed_tweet(tweet: Dict[str, Any]) -> Dict[str, Any]:
         **result
     }
 
-def batch_worker(tweet_batches: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
-    """Runs batches of tweet groups in parallel."""
+def _label_table(pipe: "Pipeline") -> Dict[int, str]:
+    """The model's own index -> label table (config.id2label), whatever its label names."""
+    return {int(i): label for i, label in pipe.model.config.id2label.items()}
+
+def _init_shard_process(intra_op_threads: int):
+    """Runs once in each shard process: pins torch threads and loads this process's model replica."""
+    try:
+        import torch
+        torch.set_num_threads(intra_op_threads)
+    except ImportError:
+        pass
+    get_sentiment_pipeline()
+
+def _classify_shard(shm_name: str, total: int, offset: int, cleaned: List[str]) -> Dict[int, str]:
+    """
+    Classifies one shard of cleaned texts in a worker process and writes
+    (score, label index) into the shared block at [offset, offset + len(cleaned)).
+    Layout for N tweets: N float32 scores followed by N uint8 label indexes.
+    Returns the index -> label table the indexes refer to.
+    """
+    pipe = get_sentiment_pipeline()
+    id2label = _label_table(pipe)
+    label2id = {label: i for i, label in id2label.items()}
+    results = pipe(cleaned)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    scores = shm.buf[:4 * total].cast("f")
+    labels = shm.buf[4 * total:5 * total]
+    try:
+        for i, result in enumerate(results):
+            scores[offset + i] = result["score"]
+            labels[offset + i] = label2id[result["label"]]
+    finally:
+        scores.release()
+        labels.release()
+        shm.close()
+    return id2label
+
+_shard_pool: Optional[ProcessPoolExecutor] = None
+_shard_pool_config: Optional[Tuple[int, int]] = None
+_shard_pool_lock = threading.Lock()
+
+def _get_shard_pool(num_workers: int, intra_op_threads: int) -> ProcessPoolExecutor:
+    """Shard processes are kept between calls so each model replica is loaded once."""
+    global _shard_pool, _shard_pool_config
+    with _shard_pool_lock:
+        if _shard_pool is not None and _shard_pool_config != (num_workers, intra_op_threads):
+            _shard_pool.shutdown(wait=True)
+            _shard_pool = None
+        if _shard_pool is None:
+            logger.info(f"Starting {num_workers} sentiment shard processes ({intra_op_threads} intra-op threads each)")
+            _shard_pool = ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context(SHARD_START_METHOD),
+                initializer=_init_shard_process,
+                initargs=(intra_op_threads,)
+            )
+            _shard_pool_config = (num_workers, intra_op_threads)
+        return _shard_pool
+
+def shutdown_shard_pool():
+    global _shard_pool, _shard_pool_config
+    with _shard_pool_lock:
+        if _shard_pool is not None:
+            _shard_pool.shutdown(wait=True)
+        _shard_pool = None
+        _shard_pool_config = None
+
+def _process_batches_sharded(
+    tweet_batches: List[List[Dict[str, Any]]],
+    num_workers: int,
+    intra_op_threads: int
+) -> List[Dict[str, Any]]:
+    tweets = [tweet for batch in tweet_batches for tweet in batch]
+    total = len(tweets)
+    if not total:
+        return []
+
+    pool = _get_shard_pool(num_workers, intra_op_threads)
+    shm = shared_memory.SharedMemory(create=True, size=5 * total)
+    try:
+        labels = shm.buf[4 * total:5 * total]
+        labels[:] = bytes([_FAILED_LABEL]) * total
+        labels.release()
+
+        cleaned = text_normalizer.clean_texts([t["text"] for t in tweets])
+        futures = [
+            pool.submit(_classify_shard, shm.name, total, offset, cleaned[offset:offset + SHARD_SIZE])
+            for offset in range(0, total, SHARD_SIZE)
+        ]
+        id2label: Dict[int, str] = {}
+        for future in futures:
+            try:
+                id2label.update(future.result())
+            except Exception as e:
+                logger.warning(f"Error in sentiment shard: {e}")
+
+        # Rehydrate compact results into dicts only here, at the edge
+        scores = shm.buf[:4 * total].cast("f")
+        labels = shm.buf[4 * total:5 * total]
+        timestamp = int(time.time())
+        results = []
+        try:
+            for i, tweet in enumerate(tweets):
+                label_index = labels[i]
+                if label_index == _FAILED_LABEL:
+                    continue
+                label = id2label[label_index]
+                results.append({
+                    "id": tweet.get("id"),
+                    "author_id": tweet.get("author_id"),
+                    "created_at": tweet.get("created_at"),
+                    "lang": tweet.get("lang"),
+                    "text": tweet["text"],
+                    "cleaned_text": cleaned[i],
+                    "sentiment": LABEL_MAPPING.get(label, label),
+                    "confidence": round(scores[i], 4),
+                    "timestamp": timestamp
+                })
+        finally:
+            scores.release()
+            labels.release()
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
+
+def batch_worker(
+    tweet_batches: List[List[Dict[str, Any]]],
+    mode: str = "thread",
+    num_workers: int = 4,
+    intra_op_threads: int = DEFAULT_INTRA_OP_THREADS
+) -> List[Dict[str, Any]]:
+    """
+    Runs batches of tweet groups in parallel.
+    mode="thread" shares one pipeline across threads; mode="process" shards
+    tweets across num_workers processes, each with its own model replica
+    limited to intra_op_threads torch threads.
+    """
+    if mode == "process":
+        return _process_batches_sharded(tweet_batches, num_workers, intra_op_threads)
+    if mode != "thread":
+        raise ValueError(f"Unsupported batch_worker mode: {mode}")
+
     results = []
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
         futures = [executor.submit(process_tweet_batch, batch) for batch in tweet_batches]
         for future in futures:
             try:
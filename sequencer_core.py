@@ -1,12 +1,19 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 import uvicorn
+import asyncio
 import logging
 import uuid
 import time
 
 from typing import Dict, List
 
+from settings import INFERENCE_TIMEOUT_SECONDS
+from ai_model_registry import AIModel, registry as model_registry
+from dacert_verifier import DACertVerifier
+from inference_batcher import QueueFullError
+from model_placement import PlacementPlanner
+
 app = FastAPI()
 logger = logging.getLogger("SEQUENCER")
 logging.basicConfig(level=logging.INFO)
@@ -15,6 +22,97 @@ logging.basicConfig(level=logging.INFO)
 REGISTERED_NODES: Dict[str, Dict] = {}
 PENDING_TASKS: List[Dict] = []
 COMPLETED_TASKS: Dict[str, Dict] = {}
+EXPIRED_TASKS: Dict[str, Dict] = {}
+
+# Model placement across nodes that advertise a memory budget
+PLACEMENT = PlacementPlanner.from_registry(model_registry)
+
+# Demand is multiplied by DEMAND_DECAY_FACTOR every DEMAND_DECAY_INTERVAL_SECONDS,
+# then placement is re-planned, so replicas follow recent load
+DEMAND_DECAY_INTERVAL_SECONDS = 60
+DEMAND_DECAY_FACTOR = 0.5
+# Longest per-task timeout a client may ask for
+MAX_TASK_TIMEOUT_SECONDS = 3600
+
+# Submissions between the timer's rebalances that trigger an early one
+REBALANCE_EVERY_SUBMISSIONS = 500
+_submissions_since_rebalance = 0
+
+# Submitted DACerts are verified off the event loop before a task completes
+VERIFIER = DACertVerifier()
+
+_background_tasks: List[asyncio.Task] = []
+
+@app.on_event("startup")
+async def startup_event():
+    _background_tasks.append(asyncio.get_running_loop().create_task(_demand_decay_loop()))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
+    await VERIFIER.stop()
+
+async def _demand_decay_loop():
+    while True:
+        await asyncio.sleep(DEMAND_DECAY_INTERVAL_SECONDS)
+        _decay_and_rebalance()
+
+def _decay_and_rebalance():
+    global _submissions_since_rebalance
+    PLACEMENT.decay_demand(DEMAND_DECAY_FACTOR)
+    _submissions_since_rebalance = 0
+    _apply_placement()
+
+def _record_submission(model_id: str):
+    """Counts demand; only every REBALANCE_EVERY_SUBMISSIONS-th submission re-plans."""
+    global _submissions_since_rebalance
+    PLACEMENT.record_demand(model_id)
+    _submissions_since_rebalance += 1
+    if _submissions_since_rebalance >= REBALANCE_EVERY_SUBMISSIONS:
+        _submissions_since_rebalance = 0
+        _apply_placement()
+
+def _on_registry_change(event: str, model: AIModel):
+    if event in ("removed", "unavailable") or model.status != "available":
+        PLACEMENT.remove_model(model.model_id)
+    else:
+        PLACEMENT.set_model(model.model_id, model.size_mb)
+    _apply_placement()
+
+model_registry.subscribe(_on_registry_change)
+
+def _apply_placement():
+    """Re-plans and makes each planned node's capabilities match its assignment."""
+    changes = PLACEMENT.rebalance()
+    for node_id in changes:
+        if node_id in REGISTERED_NODES:
+            REGISTERED_NODES[node_id]["capabilities"] = PLACEMENT.assignments_for(node_id)
+
+def _expire_task(task: Dict, reason: str):
+    EXPIRED_TASKS[task["task_id"]] = {
+        "model": task["model"],
+        "assigned": task.get("assigned"),
+        "reason": reason,
+        "expired_at": int(time.time())
+    }
+    logger.info(f" Task {task['task_id']} expired: {reason}")
+
+def _drop_expired_tasks() -> int:
+    """Moves every pending task past its deadline to EXPIRED_TASKS."""
+    global PENDING_TASKS
+    now = time.time()
+    live = []
+    for task in PENDING_TASKS:
+        if task.get("deadline", now + 1) <= now:
+            _expire_task(task, "deadline passed while pending")
+        else:
+            live.append(task)
+    dropped = len(PENDING_TASKS) - len(live)
+    PENDING_TASKS = live
+    return dropped
 
 @app.post("/register_node")
 async def register_node(request: Request):
@@ -27,10 +125,17 @@ async def register_node(request: Request):
     REGISTERED_NODES[data["node_id"]] = {
         "capabilities": data["capabilities"],
         "public_key": data["public_key"],
+        "memory_mb": data.get("memory_mb"),
         "registered_at": int(time.time()),
         "last_seen": int(time.time())
     }
 
+    # Nodes that report a memory budget get their models from the planner
+    if data.get("memory_mb"):
+        PLACEMENT.add_node(data["node_id"], int(data["memory_mb"]))
+        _apply_placement()
+        REGISTERED_NODES[data["node_id"]]["capabilities"] = PLACEMENT.assignments_for(data["node_id"])
+
     logger.info(f" Node registered: {data['node_id']}")
     return {"status": "ok", "message": "Node registered"}
 
@@ -41,6 +146,7 @@ async def get_task(node_id: str):
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
 
+    _drop_expired_tasks()
     for task in PENDING_TASKS:
         if task["model"] in node["capabilities"] and not task.get("assigned"):
             task["assigned"] = node_id
@@ -51,6 +157,7 @@ async def get_task(node_id: str):
 
 @app.post("/submit_result")
 async def submit_result(request: Request):
+    global PENDING_TASKS
     body = await request.json()
     required_fields = ["task_id", "result", "dacert"]
 
@@ -61,13 +168,29 @@ async def submit_result(request: Request):
     result = body["result"]
     dacert = body["dacert"]
 
-    if task_id not in [t["task_id"] for t in PENDING_TASKS]:
+    task = next((t for t in PENDING_TASKS if t["task_id"] == task_id), None)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    # Basic DACert validation placeholder
-    payload = dacert.get("cert_payload", {})
+    payload = dacert.get("cert_payload", {}) if isinstance(dacert, dict) else {}
     if payload.get("task_id") != task_id:
         raise HTTPException(status_code=400, detail="DACert task ID mismatch")
+    if payload.get("node_id") != task.get("assigned"):
+        raise HTTPException(status_code=403, detail="DACert is not from the assigned node")
+
+    # The cert must be signed by the key the assigned node registered with
+    public_key = REGISTERED_NODES.get(task["assigned"], {}).get("public_key")
+    try:
+        rejection = await VERIFIER.verify(dacert, result, public_key)
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="Verification queue full, retry later")
+    if rejection:
+        logger.warning(f" Rejected DACert for task {task_id}: {rejection}")
+        raise HTTPException(status_code=400, detail=f"DACert verification failed: {rejection}")
+
+    # The task may have expired or been completed while its cert was verifying
+    if task_id in COMPLETED_TASKS or not any(t["task_id"] == task_id for t in PENDING_TASKS):
+        raise HTTPException(status_code=409, detail="Task is no longer pending")
 
     COMPLETED_TASKS[task_id] = {
         "result": result,
@@ -76,12 +199,25 @@ async def submit_result(request: Request):
     }
 
     # Remove from pending
-    global PENDING_TASKS
     PENDING_TASKS = [t for t in PENDING_TASKS if t["task_id"] != task_id]
 
     logger.info(f"Task {task_id} result stored")
     return {"status": "ok", "message": "Result submitted"}
 
+@app.post("/expire_task")
+async def expire_task(request: Request):
+    """Called by nodes that dropped a task because its deadline passed."""
+    global PENDING_TASKS
+    body = await request.json()
+    task_id = body.get("task_id")
+    task = next((t for t in PENDING_TASKS if t["task_id"] == task_id), None)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    _expire_task(task, body.get("reason", "expired on node"))
+    PENDING_TASKS = [t for t in PENDING_TASKS if t["task_id"] != task_id]
+    return {"status": "ok", "message": "Task expired"}
+
 @app.get("/node_status/{node_id}")
 async def node_status(node_id: str):
     node = REGISTERED_NODES.get(node_id)
@@ -97,23 +233,43 @@ async def submit_task(request: Request):
     if not all(k in body for k in required):
         raise HTTPException(status_code=400, detail="Missing model or input")
 
+    created_at = time.time()
+    timeout = body.get("timeout_seconds", INFERENCE_TIMEOUT_SECONDS)
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not 0 < timeout <= MAX_TASK_TIMEOUT_SECONDS:
+        raise HTTPException(status_code=400, detail=f"timeout_seconds must be a number in (0, {MAX_TASK_TIMEOUT_SECONDS}]")
     task = {
         "task_id": str(uuid.uuid4()),
         "model": body["model"],
         "input": body["input"],
-        "created_at": int(time.time())
+        "created_at": int(created_at),
+        # Absolute wall-clock deadline so nodes on other hosts can enforce it
+        "deadline": created_at + timeout
     }
 
     PENDING_TASKS.append(task)
+    _record_submission(task["model"])
     logger.info(f" Task submitted: {task['task_id']}")
     return {"status": "queued", "task_id": task["task_id"]}
 
+@app.get("/placement/{node_id}")
+async def node_placement(node_id: str):
+    """Models the node should keep loaded under the current placement plan."""
+    if node_id not in REGISTERED_NODES:
+        raise HTTPException(status_code=404, detail="Node not registered")
+    return {"node_id": node_id, "models": PLACEMENT.assignments_for(node_id), "version": PLACEMENT.version}
+
+@app.get("/verification/stats")
+async def verification_stats():
+    """Queue depth, batching and latency of the DACert verification stage."""
+    return VERIFIER.stats()
+
 @app.get("/status")
 async def status():
     return {
         "registered_nodes": len(REGISTERED_NODES),
         "pending_tasks": len(PENDING_TASKS),
-        "completed_tasks": len(COMPLETED_TASKS)
+        "completed_tasks": len(COMPLETED_TASKS),
+        "expired_tasks": len(EXPIRED_TASKS)
     }
 
 if __name__ == "__main__":
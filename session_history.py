@@ -0,0 +1,207 @@
+import gzip
+import json
+import logging
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("SESSION_HISTORY")
+
+DEFAULT_MAX_ENTRIES_PER_SESSION = 100
+DEFAULT_MAX_TOTAL_ENTRIES = 100_000
+# Spilled sessions kept on disk; beyond this the oldest spilled ones are dropped
+DEFAULT_MAX_SPILLED_SESSIONS = 1_000_000
+# Spill segments rotate once they reach this size
+SPILL_SEGMENT_BYTES = 16 * 1024 * 1024
+# A closed segment whose live records fall below this fraction of its size is compacted
+SPILL_COMPACT_LIVE_RATIO = 0.5
+
+class SessionHistory:
+    """
+    Per-session ring buffers of query history under a global entry cap.
+
+    Each session keeps its newest max_entries_per_session entries. When the
+    total exceeds max_total_entries, the least recently used sessions are
+    evicted, or with a spill_dir, appended as gzip members to rotating
+    segment files and restored transparently on their next access.
+
+    Every entry gets a sequence number ("seq") from one counter shared by
+    all sessions, so seqs only ever grow: a cursor stays valid even if its
+    session was evicted and started over. Seqs within a session are
+    increasing but not contiguous.
+
+    Spill space is reclaimed as sessions are restored or dropped: a closed
+    segment is deleted once none of its records is live, and rewritten into
+    the current segment once less than SPILL_COMPACT_LIVE_RATIO of it is.
+    """
+
+    def __init__(
+        self,
+        max_entries_per_session: int = DEFAULT_MAX_ENTRIES_PER_SESSION,
+        max_total_entries: int = DEFAULT_MAX_TOTAL_ENTRIES,
+        spill_dir: Optional[str] = None,
+        max_spilled_sessions: int = DEFAULT_MAX_SPILLED_SESSIONS
+    ):
+        if max_entries_per_session > max_total_entries:
+            raise ValueError("max_entries_per_session cannot exceed max_total_entries")
+        self.max_entries_per_session = max_entries_per_session
+        self.max_total_entries = max_total_entries
+        self.spill_dir = spill_dir
+        self.max_spilled_sessions = max_spilled_sessions
+        self._sessions: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._next_seq = 0
+        self._total = 0
+        self._lock = threading.Lock()
+        # session_id -> (segment path, offset, length) of its spilled ring, oldest spill first
+        self._spilled: "OrderedDict[str, Tuple[str, int, int]]" = OrderedDict()
+        # segment path -> bytes of live (not yet restored or dropped) records in it
+        self._segment_live: Dict[str, int] = {}
+        self._segment_index = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions or session_id in self._spilled
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions_in_memory": len(self._sessions),
+                "sessions_spilled": len(self._spilled),
+                "entries_in_memory": self._total,
+                "max_total_entries": self.max_total_entries,
+                "spill_segments": len(self._segment_live),
+                "spill_live_bytes": sum(self._segment_live.values())
+            }
+
+    def append(self, session_id: str, entry: Dict[str, Any]) -> int:
+        """Adds an entry to a session and returns its sequence number."""
+        with self._lock:
+            ring = self._touch(session_id, create=True)
+            seq = self._next_seq
+            self._next_seq += 1
+            if len(ring) == ring.maxlen:
+                self._total -= 1
+            ring.append({"seq": seq, **entry})
+            self._total += 1
+            self._evict(keep=session_id)
+            return seq
+
+    def page(self, session_id: str, cursor: Optional[int] = None, limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Entries after cursor (oldest first), at most limit of them, plus the
+        cursor for the next page or None when the page reaches the newest entry.
+        """
+        with self._lock:
+            ring = self._touch(session_id, create=False)
+            if not ring:
+                return [], None
+            start = 0 if cursor is None else bisect_right(ring, cursor, key=lambda e: e["seq"])
+            entries = list(islice(ring, start, start + limit))
+            has_more = start + len(entries) < len(ring)
+            next_cursor = entries[-1]["seq"] if entries and has_more else None
+            return entries, next_cursor
+
+    # --- Internals (lock held) ---
+
+    def _touch(self, session_id: str, create: bool) -> Optional[Deque[Dict[str, Any]]]:
+        ring = self._sessions.get(session_id)
+        if ring is None and session_id in self._spilled:
+            ring = self._restore(session_id)
+            self._sessions.move_to_end(session_id)
+            # The restored entries count against the global cap like any others
+            self._evict(keep=session_id)
+        if ring is None:
+            if not create:
+                return None
+            ring = deque(maxlen=self.max_entries_per_session)
+            self._sessions[session_id] = ring
+        self._sessions.move_to_end(session_id)
+        return ring
+
+    def _evict(self, keep: str):
+        while self._total > self.max_total_entries:
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                self._sessions.move_to_end(session_id)
+                continue
+            ring = self._sessions.pop(session_id)
+            self._total -= len(ring)
+            if self.spill_dir:
+                self._spill(session_id, ring)
+            else:
+                logger.info(f"Evicted idle session {session_id} ({len(ring)} entries)")
+
+    def _segment_path(self) -> str:
+        return os.path.join(self.spill_dir, f"history-{self._segment_index:06d}.jsonl.gz")
+
+    def _write_blob(self, blob: bytes) -> Tuple[str, int]:
+        path = self._segment_path()
+        if os.path.exists(path) and os.path.getsize(path) >= SPILL_SEGMENT_BYTES:
+            self._segment_index += 1
+            if self._segment_live.get(path) == 0:
+                del self._segment_live[path]
+                os.remove(path)
+            path = self._segment_path()
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(blob)
+        self._segment_live[path] = self._segment_live.get(path, 0) + len(blob)
+        return path, offset
+
+    def _spill(self, session_id: str, ring: Deque[Dict[str, Any]]):
+        record = json.dumps({"session_id": session_id, "entries": list(ring)}, separators=(",", ":"))
+        blob = gzip.compress(record.encode("utf-8"))
+        path, offset = self._write_blob(blob)
+        self._spilled[session_id] = (path, offset, len(blob))
+        logger.info(f"Spilled idle session {session_id} ({len(ring)} entries) to {path}")
+
+        while len(self._spilled) > self.max_spilled_sessions:
+            dropped, location = self._spilled.popitem(last=False)
+            logger.info(f"Dropped spilled session {dropped} (spill limit {self.max_spilled_sessions})")
+            self._release(location)
+
+    def _restore(self, session_id: str) -> Deque[Dict[str, Any]]:
+        location = self._spilled.pop(session_id)
+        path, offset, length = location
+        with open(path, "rb") as f:
+            f.seek(offset)
+            record = json.loads(gzip.decompress(f.read(length)))
+        self._release(location)
+        ring = deque(record["entries"], maxlen=self.max_entries_per_session)
+        self._sessions[session_id] = ring
+        self._total += len(ring)
+        return ring
+
+    def _release(self, location: Tuple[str, int, int]):
+        """Marks a spilled record dead and reclaims its segment when worthwhile."""
+        path, _, length = location
+        self._segment_live[path] -= length
+        if path == self._segment_path():
+            return
+        if self._segment_live[path] <= 0:
+            del self._segment_live[path]
+            os.remove(path)
+        elif self._segment_live[path] < os.path.getsize(path) * SPILL_COMPACT_LIVE_RATIO:
+            self._compact(path)
+
+    def _compact(self, path: str):
+        """Copies a segment's live records into the current segment and deletes it."""
+        moved = [(session_id, location) for session_id, location in self._spilled.items() if location[0] == path]
+        with open(path, "rb") as f:
+            blobs = []
+            for session_id, (_, offset, length) in moved:
+                f.seek(offset)
+                blobs.append(f.read(length))
+        del self._segment_live[path]
+        for (session_id, _), blob in zip(moved, blobs):
+            new_path, new_offset = self._write_blob(blob)
+            self._spilled[session_id] = (new_path, new_offset, len(blob))
+        os.remove(path)
+        logger.info(f"Compacted spill segment {path} ({len(moved)} live sessions moved)")
@@ -1,21 +1,34 @@
-import json
-import hashlib
 import os
 import logging
-from typing import Dict, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
 from nacl.signing import SigningKey, VerifyKey
 from nacl.encoding import HexEncoder
 from nacl.exceptions import BadSignatureError
 
+from canonical_encoding import encode, hexdigest
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SIGNATURE_UTILS")
 
 DEFAULT_PRIVATE_KEY_PATH = "./keys/node_signing_key.hex"
 
-def hash_dict(data: Dict) -> str:
-    """Hash a dictionary deterministically using SHA256."""
-    serialized = json.dumps(data, sort_keys=True).encode()
-    return hashlib.sha256(serialized).hexdigest()
+# Threads used for batch verification; libsodium runs outside the GIL
+BATCH_VERIFY_THREADS = int(os.getenv("BATCH_VERIFY_THREADS", min(4, os.cpu_count() or 1)))
+# Batches smaller than this are verified on the calling thread
+PARALLEL_VERIFY_MIN = 64
+
+# (message, raw signature, hex public key)
+VerifyItem = Tuple[bytes, bytes, str]
+
+# Decoded verify keys kept for the node and committee keys that recur
+VERIFY_KEY_CACHE_SIZE = int(os.getenv("VERIFY_KEY_CACHE_SIZE", 1024))
+
+def hash_dict(data: Dict, encoding: Optional[str] = None) -> str:
+    """Hash a dictionary deterministically using SHA256 over its canonical encoding."""
+    return hexdigest(data, encoding)
 
 def generate_key_pair() -> (str, str):
     """Generates a new Ed25519 key pair and returns hex-encoded values."""
@@ -25,9 +38,10 @@ def generate_key_pair() -> (str, str):
     return sk_hex, pk
 
 def save_private_key(sk_hex: str, path: str = DEFAULT_PRIVATE_KEY_PATH):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
     with open(path, "w") as f:
         f.write(sk_hex)
+    os.chmod(path, 0o600)
     logger.info(f"Private key saved to {path}")
 
 def load_private_key(path: str = DEFAULT_PRIVATE_KEY_PATH) -> SigningKey:
@@ -37,16 +51,31 @@ def load_private_key(path: str = DEFAULT_PRIVATE_KEY_PATH) -> SigningKey:
         sk_hex = f.read().strip()
     return SigningKey(sk_hex, encoder=HexEncoder)
 
-def sign_payload(payload: Dict, sk: SigningKey) -> str:
-    message = json.dumps(payload, sort_keys=True).encode()
+@lru_cache(maxsize=VERIFY_KEY_CACHE_SIZE)
+def get_verify_key(public_key_hex: str) -> VerifyKey:
+    """Decoded VerifyKey for a hex public key, shared by every verification path. Bad keys raise and are not cached."""
+    return VerifyKey(public_key_hex, encoder=HexEncoder)
+
+def verify_key_cache_stats() -> Dict[str, float]:
+    info = get_verify_key.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0
+    }
+
+def sign_payload(payload: Dict, sk: SigningKey, encoding: Optional[str] = None) -> str:
+    message = encode(payload, encoding)
     signature = sk.sign(message).signature
     return signature.hex()
 
-def verify_signature(payload: Dict, signature: str, public_key_hex: str) -> bool:
+def verify_signature(payload: Dict, signature: str, public_key_hex: str, encoding: Optional[str] = None) -> bool:
     try:
-        message = json.dumps(payload, sort_keys=True).encode()
-        vk = VerifyKey(public_key_hex, encoder=HexEncoder)
-        vk.verify(message, bytes.fromhex(signature))
+        message = encode(payload, encoding)
+        get_verify_key(public_key_hex).verify(message, bytes.fromhex(signature))
         return True
     except BadSignatureError:
         logger.warning("Signature verification failed")
@@ -55,17 +84,92 @@ def verify_signature(payload: Dict, signature: str, public_key_hex: str) -> bool
         logger.error(f"Verification error: {e}")
         return False
 
+def _verify_one(item: VerifyItem) -> bool:
+    message, signature, public_key_hex = item
+    try:
+        get_verify_key(public_key_hex).verify(message, signature)
+        return True
+    except Exception:
+        return False
+
+_verify_pool: Optional[ThreadPoolExecutor] = None
+_verify_pool_lock = threading.Lock()
+
+def _get_verify_pool() -> ThreadPoolExecutor:
+    global _verify_pool
+    with _verify_pool_lock:
+        if _verify_pool is None:
+            _verify_pool = ThreadPoolExecutor(max_workers=BATCH_VERIFY_THREADS, thread_name_prefix="verify")
+        return _verify_pool
+
+def _all_valid(items: Sequence[VerifyItem]) -> bool:
+    """
+    Batch check: True only if every item verifies. Large batches are split
+    across threads, and all threads stop as soon as one finds a bad signature.
+    """
+    if len(items) < PARALLEL_VERIFY_MIN or BATCH_VERIFY_THREADS < 2:
+        return all(_verify_one(item) for item in items)
+
+    failed = threading.Event()
+    def check(chunk: Sequence[VerifyItem]) -> bool:
+        for item in chunk:
+            if failed.is_set():
+                return False
+            if not _verify_one(item):
+                failed.set()
+                return False
+        return True
+
+    size = -(-len(items) // BATCH_VERIFY_THREADS)
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    return all(list(_get_verify_pool().map(check, chunks)))
+
+def _locate_invalid(items: Sequence[VerifyItem], offset: int, known_bad: bool, invalid: List[int]):
+    """Bisects a failing batch down to the indexes of its bad signatures."""
+    if not known_bad and _all_valid(items):
+        return
+    if len(items) == 1:
+        invalid.append(offset)
+        return
+    mid = len(items) // 2
+    left_ok = _all_valid(items[:mid])
+    if not left_ok:
+        _locate_invalid(items[:mid], offset, True, invalid)
+    # If the left half passed, the failure must be on the right
+    _locate_invalid(items[mid:], offset + mid, left_ok, invalid)
+
+def verify_batch(items: Sequence[VerifyItem]) -> List[bool]:
+    """
+    Verifies many (message, signature, public key) triples. The whole batch
+    is checked at once; only if it fails is it bisected to find which
+    signatures are bad. Returns per-item validity in input order.
+    """
+    items = list(items)
+    if not items or _all_valid(items):
+        return [True] * len(items)
+    invalid: List[int] = []
+    _locate_invalid(items, 0, True, invalid)
+    results = [True] * len(items)
+    for index in invalid:
+        results[index] = False
+    logger.warning(f"{len(invalid)}/{len(items)} signatures failed batch verification")
+    return results
+
 def verify_batch_signatures(
     payload: Dict,
     signatures: List[str],
-    public_keys: List[str]
+    public_keys: List[str],
+    encoding: Optional[str] = None
 ) -> int:
     """Returns the number of valid signatures over the same payload."""
-    valid_count = 0
+    message = encode(payload, encoding)
+    items = []
     for sig, pk in zip(signatures, public_keys):
-        if verify_signature(payload, sig, pk):
-            valid_count += 1
-    return valid_count
+        try:
+            items.append((message, bytes.fromhex(sig), pk))
+        except ValueError:
+            logger.warning("Skipping malformed signature in batch")
+    return sum(verify_batch(items))
 
 if __name__ == "__main__":
     # Demo of signing/verification flow
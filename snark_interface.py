@@ -1,19 +1,36 @@
 import subprocess
+import hashlib
 import json
 import os
 import logging
+import shutil
 import tempfile
+import threading
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SNARK_INTERFACE")
 
 ZK_SYSTEM = "zokrates"  # Replace with "halo2", "risc0", etc.
-ZK_BINARY_PATH = "/usr/local/bin/zokrates"
+ZK_BINARY_PATH = os.getenv("ZK_BINARY_PATH", "/usr/local/bin/zokrates")
 PROOF_OUTPUT_PATH = "./zkml/snark_proofs"
 
-os.makedirs(PROOF_OUTPUT_PATH, exist_ok=True)
+# Compiled circuits and their proving/verifying keys, one directory per
+# sha256(tool, tool version, circuit source)
+CIRCUIT_CACHE_DIR = os.getenv("ZK_CIRCUIT_CACHE_DIR", "./zkml/circuit_cache")
+# Files compile and setup leave in their working directory
+CIRCUIT_ARTIFACTS = ("out", "abi.json", "proving.key", "verification.key")
+_MANIFEST = "manifest.json"
+
+_cache_lock = threading.Lock()
+_build_locks: Dict[str, threading.Lock] = {}
+_tool_versions: Dict[str, str] = {}
+_cache_stats = {"hits": 0, "misses": 0, "compile_seconds": 0.0, "setup_seconds": 0.0}
+
+def circuit_cache_stats() -> Dict[str, Any]:
+    with _cache_lock:
+        return dict(_cache_stats)
 
 def prepare_input_file(input_data: Dict[str, Any]) -> str:
     """Creates a temporary file with formatted input data for the ZK circuit."""
@@ -23,14 +40,86 @@ def prepare_input_file(input_data: Dict[str, Any]) -> str:
     logger.info(f"Prepared temporary input file at {path}")
     return path
 
-def run_zk_compile(circuit_path: str) -> bool:
+def zk_tool_version() -> str:
+    """Version string reported by the ZK binary, asked once per binary path."""
+    with _cache_lock:
+        version = _tool_versions.get(ZK_BINARY_PATH)
+    if version is None:
+        result = subprocess.run([ZK_BINARY_PATH, "--version"], capture_output=True, check=True)
+        version = result.stdout.decode().strip()
+        with _cache_lock:
+            _tool_versions[ZK_BINARY_PATH] = version
+    return version
+
+def circuit_cache_key(circuit_path: str) -> str:
+    with open(circuit_path, "rb") as f:
+        source = f.read()
+    fingerprint = hashlib.sha256()
+    for part in (ZK_SYSTEM.encode(), zk_tool_version().encode(), source):
+        fingerprint.update(len(part).to_bytes(8, "big"))
+        fingerprint.update(part)
+    return fingerprint.hexdigest()
+
+def prepare_circuit(circuit_path: str) -> Optional[str]:
+    """
+    Directory holding the compiled circuit and its setup keys. On a cache
+    miss, compile and setup run in a scratch directory that is renamed into
+    place once both succeed; a hit skips both. None if either step fails.
+    """
+    key = circuit_cache_key(circuit_path)
+    entry = os.path.join(CIRCUIT_CACHE_DIR, key)
+    with _cache_lock:
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        if os.path.exists(os.path.join(entry, _MANIFEST)):
+            with _cache_lock:
+                _cache_stats["hits"] += 1
+            logger.info(f"Circuit cache hit for {circuit_path} ({key[:12]})")
+            return entry
+
+        with _cache_lock:
+            _cache_stats["misses"] += 1
+        os.makedirs(CIRCUIT_CACHE_DIR, exist_ok=True)
+        scratch = tempfile.mkdtemp(dir=CIRCUIT_CACHE_DIR, prefix=".build-")
+        try:
+            start = time.perf_counter()
+            if not run_zk_compile(os.path.abspath(circuit_path), cwd=scratch):
+                return None
+            compiled = time.perf_counter()
+            if not run_zk_setup(cwd=scratch):
+                return None
+            done = time.perf_counter()
+            with _cache_lock:
+                _cache_stats["compile_seconds"] += compiled - start
+                _cache_stats["setup_seconds"] += done - compiled
+
+            with open(os.path.join(scratch, _MANIFEST), "w") as f:
+                json.dump({
+                    "circuit": circuit_path,
+                    "zk_system": ZK_SYSTEM,
+                    "tool_version": zk_tool_version(),
+                    "compile_seconds": round(compiled - start, 3),
+                    "setup_seconds": round(done - compiled, 3),
+                    "created_at": int(time.time())
+                }, f)
+            # A stale, unfinished entry (no manifest) is replaced
+            shutil.rmtree(entry, ignore_errors=True)
+            os.rename(scratch, entry)
+            logger.info(f"Cached compiled circuit {circuit_path} as {key[:12]}")
+            return entry
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+def run_zk_compile(circuit_path: str, cwd: Optional[str] = None) -> bool:
     """Compiles the ZK circuit using the specified SNARK system."""
     try:
         logger.info("Compiling ZK circuit...")
         result = subprocess.run(
             [ZK_BINARY_PATH, "compile", "-i", circuit_path],
             capture_output=True,
-            check=True
+            check=True,
+            cwd=cwd
         )
         logger.info("ZK circuit compiled successfully")
         return True
@@ -38,13 +127,14 @@ def run_zk_compile(circuit_path: str) -> bool:
         logger.error(f"Compilation failed: {e.stderr.decode()}")
         return False
 
-def run_zk_setup() -> bool:
+def run_zk_setup(cwd: Optional[str] = None) -> bool:
     """Runs setup phase to generate proving and verifying keys."""
     try:
         result = subprocess.run(
             [ZK_BINARY_PATH, "setup"],
             capture_output=True,
-            check=True
+            check=True,
+            cwd=cwd
         )
         logger.info("ZK setup phase complete")
         return True
@@ -52,39 +142,56 @@ def run_zk_setup() -> bool:
         logger.error(f"Setup failed: {e.stderr.decode()}")
         return False
 
-def run_zk_prove(input_file_path: str) -> Dict[str, Any]:
-    """Generates a SNARK proof using the external ZK tool."""
+def link_circuit_artifacts(circuit_dir: str, work_dir: str):
+    """Makes the cached circuit and keys visible under their default names in work_dir."""
+    for name in CIRCUIT_ARTIFACTS:
+        source = os.path.join(circuit_dir, name)
+        if os.path.exists(source):
+            os.symlink(os.path.abspath(source), os.path.join(work_dir, name))
+
+def run_zk_prove(input_file_path: str, cwd: Optional[str] = None) -> Dict[str, Any]:
+    """Generates a SNARK proof using the external ZK tool (proof.json in cwd)."""
     try:
         logger.info("Generating ZK proof...")
         subprocess.run(
             [ZK_BINARY_PATH, "compute-witness", "-i", "out", "-o", "witness", "-a", input_file_path],
-            check=True
+            capture_output=True,
+            check=True,
+            cwd=cwd
         )
         subprocess.run(
             [ZK_BINARY_PATH, "generate-proof"],
-            check=True
+            capture_output=True,
+            check=True,
+            cwd=cwd
         )
 
-        proof_file = os.path.join(PROOF_OUTPUT_PATH, f"proof_{int(time.time())}.json")
-        os.rename("proof.json", proof_file)
-
-        with open(proof_file, "r") as f:
+        with open(os.path.join(cwd or ".", "proof.json"), "r") as f:
             proof = json.load(f)
 
-        logger.info(f"Proof generated and saved to {proof_file}")
+        logger.info("Proof generated")
         return proof
 
     except subprocess.CalledProcessError as e:
         logger.error(f"Proof generation failed: {e.stderr.decode()}")
         return {"error": "proof_generation_failed"}
 
-def verify_zk_proof(proof_file: str) -> bool:
+def store_proof(proof_file: str) -> str:
+    os.makedirs(PROOF_OUTPUT_PATH, exist_ok=True)
+    destination = os.path.join(PROOF_OUTPUT_PATH, f"proof_{time.time_ns()}.json")
+    shutil.move(proof_file, destination)
+    logger.info(f"Proof saved to {destination}")
+    return destination
+
+def verify_zk_proof(proof_file: str, cwd: Optional[str] = None) -> bool:
     """Verifies a generated ZK proof using the backend tool."""
     try:
         logger.info(f"Verifying proof at {proof_file}")
         subprocess.run(
             [ZK_BINARY_PATH, "verify"],
-            check=True
+            capture_output=True,
+            check=True,
+            cwd=cwd
         )
         logger.info("Proof verified successfully")
         return True
@@ -93,21 +200,31 @@ def verify_zk_proof(proof_file: str) -> bool:
         return False
 
 def simulate_end_to_end(input_data: Dict[str, Any], circuit_file: str):
-    """Full pipeline: compile, setup, prove, verify."""
-    input_path = prepare_input_file(input_data)
-
-    if not run_zk_compile(circuit_file):
+    """
+    Full pipeline: compile and setup (cached per circuit source and tool
+    version), then prove and verify in a scratch directory.
+    """
+    circuit_dir = prepare_circuit(circuit_file)
+    if circuit_dir is None:
         return None
 
-    if not run_zk_setup():
-        return None
-
-    proof = run_zk_prove(input_path)
-    valid = verify_zk_proof("proof.json")
+    input_path = prepare_input_file(input_data)
+    work_dir = tempfile.mkdtemp(prefix="zk-prove-")
+    try:
+        link_circuit_artifacts(circuit_dir, work_dir)
+        proof = run_zk_prove(input_path, cwd=work_dir)
+        if "error" in proof:
+            return {"proof": proof, "valid": False}
+        valid = verify_zk_proof("proof.json", cwd=work_dir)
+        proof_file = store_proof(os.path.join(work_dir, "proof.json"))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        os.remove(input_path)
 
     return {
         "proof": proof,
-        "valid": valid
+        "valid": valid,
+        "proof_file": proof_file
     }
 
 if __name__ == "__main__":
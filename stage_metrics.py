@@ -0,0 +1,121 @@
+import bisect
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("STAGE_METRICS")
+
+# Histogram bucket upper bounds in seconds; anything slower lands in a final +Inf bucket
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+# Lifecycle stages derived from an InferenceTask timeline:
+#   queue_wait      enqueued         -> dequeued
+#   model_load      dequeued         -> model_loaded
+#   inference       model_loaded     -> inferred
+#   dacert          inferred         -> dacert_generated
+#   submit          dacert_generated -> submitted (all attempts and backoff)
+#   submit_attempt  one HTTP attempt, observed once per attempt
+#   total           enqueued         -> submitted
+STAGE_BOUNDARIES: Dict[str, Tuple[str, str]] = {
+    "queue_wait": ("enqueued", "dequeued"),
+    "model_load": ("dequeued", "model_loaded"),
+    "inference": ("model_loaded", "inferred"),
+    "dacert": ("inferred", "dacert_generated"),
+    "submit": ("dacert_generated", "submitted"),
+    "total": ("enqueued", "submitted"),
+}
+
+class LatencyHistogram:
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        seconds = max(seconds, 0.0)
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (0 < q <= 1)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        buckets = {f"le_{bound}": n for bound, n in zip(self.buckets, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+            "p50": round(self.percentile(0.50), 6),
+            "p90": round(self.percentile(0.90), 6),
+            "p99": round(self.percentile(0.99), 6),
+            "buckets": buckets
+        }
+
+_lock = threading.Lock()
+_histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+
+def record_stage(model_id: str, stage: str, seconds: float):
+    with _lock:
+        histogram = _histograms.get((model_id, stage))
+        if histogram is None:
+            histogram = _histograms[(model_id, stage)] = LatencyHistogram()
+        histogram.observe(seconds)
+
+def record_timeline(
+    model_id: str,
+    timeline: Dict[str, float],
+    submit_attempts: Optional[List[Tuple[float, float]]] = None
+):
+    """
+    Turn a task's monotonic timeline into per-stage observations.
+    Stages whose start or end mark is missing (e.g. a task that failed during
+    inference) are skipped.
+    """
+    for stage, (start, end) in STAGE_BOUNDARIES.items():
+        if start in timeline and end in timeline:
+            record_stage(model_id, stage, timeline[end] - timeline[start])
+
+    for started, finished in submit_attempts or []:
+        record_stage(model_id, "submit_attempt", finished - started)
+
+def get_stage_histograms(model_id: Optional[str] = None) -> Dict[str, Dict[str, Dict]]:
+    """Snapshot of histograms as {model_id: {stage: histogram}}."""
+    with _lock:
+        snapshot: Dict[str, Dict[str, Dict]] = {}
+        for (model, stage), histogram in _histograms.items():
+            if model_id is not None and model != model_id:
+                continue
+            snapshot.setdefault(model, {})[stage] = histogram.to_dict()
+        return snapshot
+
+def reset_stage_metrics():
+    with _lock:
+        _histograms.clear()
+
+if __name__ == "__main__":
+    import random
+
+    for _ in range(1000):
+        record_stage("parallax-llm-v1", "queue_wait", random.expovariate(20))
+        record_stage("parallax-llm-v1", "inference", random.uniform(0.05, 0.4))
+
+    for stage, hist in get_stage_histograms("parallax-llm-v1")["parallax-llm-v1"].items():
+        print(stage, {k: hist[k] for k in ("count", "p50", "p90", "p99", "max")})
@@ -8,6 +8,9 @@ from typing import Dict, Any
 
 import tweepy
 
+from sentiment_aggregator import SentimentAggregator
+from sentiment_model import process_streamed_tweet
+
 # Configure logging
 logger = logging.getLogger("STREAM_COLLECTOR")
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +26,10 @@ TWITTER_ACCESS_SECRET = os.getenv("TWITTER_ACCESS_SECRET", "your-access-secret")
 
 TRACK_TERMS = ["Solana", "Bitcoin", "crypto", "AI", "zkML", "DeFi", "trading", "onchain"]
 
+# Rolling per-keyword sentiment (last hour, one-minute buckets) for the dashboard,
+# e.g. render_sentiment_chart(sentiment_trends.chart_data(300))
+sentiment_trends = SentimentAggregator(TRACK_TERMS)
+
 class CryptoStreamListener(tweepy.StreamingClient):
     def __init__(self, bearer_token: str):
         super().__init__(bearer_token)
@@ -77,9 +84,12 @@ def tweet_consumer_loop():
             time.sleep(1)
 
 def process_tweet(tweet: Dict[str, Any]):
-    """Placeholder: Store tweet, or forward to sentiment model"""
+    """Classifies a tweet and folds it into the rolling sentiment trends."""
     logger.info(f"[{tweet['lang']}] {tweet['text'][:80]}...")
-    # Extend this to forward tweet text to model or DB
+    try:
+        process_streamed_tweet(tweet, aggregator=sentiment_trends)
+    except Exception as e:
+        logger.warning(f"Sentiment processing failed for tweet {tweet.get('id')}: {e}")
 
 if __name__ == "__main__":
     stream_thread = Thread(target=start_streaming, daemon=True)
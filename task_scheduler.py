@@ -2,12 +2,17 @@ import threading
 import time
 import uuid
 import logging
-from typing import Dict, List, Optional
+from collections import deque
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
 from queue import Queue, Empty
 
 from inference_executor import run_inference
 from dacert_generator import generate_dacert
-from retryable_tx import submit_result_retryable
+from inference_pool import INFERENCE_POOL, InferencePoolFull
+from retryable_tx import submit_result_retryable, report_task_expired
+from stage_metrics import record_timeline
+from settings import INFERENCE_TIMEOUT_SECONDS
 import aiohttp
 import asyncio
 
@@ -16,74 +21,229 @@ logger = logging.getLogger("TASK_SCHEDULER")
 
 MAX_RETRIES = 3
 RETRY_INTERVAL = 10
+# How long a worker waits before re-offering a task when every inference slot is busy
+POOL_FULL_BACKOFF_SECONDS = 0.5
+# Expired and failed tasks kept for inspection
+FINISHED_TASKS_KEPT = 1000
+
+class TaskExpired(Exception):
+    pass
 
 class InferenceTask:
-    def __init__(self, model_id: str, input_data: str, retries: int = 0):
-        self.task_id = str(uuid.uuid4())
+    def __init__(
+        self,
+        model_id: str,
+        input_data: str,
+        retries: int = 0,
+        timeout_seconds: Optional[float] = None,
+        task_id: Optional[str] = None
+    ):
+        # Tasks created with the sequencer's ID are reported back to it on expiry
+        self.sequencer_issued = task_id is not None
+        self.task_id = task_id or str(uuid.uuid4())
         self.model_id = model_id
         self.input_data = input_data
         self.retries = retries
         self.submitted = False
         self.last_attempt = 0
+        # Absolute monotonic deadline for the whole task, retries included
+        if timeout_seconds is None:
+            timeout_seconds = INFERENCE_TIMEOUT_SECONDS
+        self.deadline = time.monotonic() + timeout_seconds
+        # Monotonic lifecycle marks (see stage_metrics.STAGE_BOUNDARIES)
+        self.timeline: Dict[str, float] = {}
+        # (start, end) monotonic times of each submission attempt
+        self.submit_attempts: List[Tuple[float, float]] = []
+
+    def mark(self, event: str):
+        self.timeline[event] = time.monotonic()
+
+    def reset_timeline(self):
+        self.timeline.clear()
+        self.submit_attempts.clear()
 
     def mark_attempt(self):
         self.last_attempt = time.time()
         self.retries += 1
 
     def is_retryable(self):
-        return self.retries < MAX_RETRIES
+        return self.retries < MAX_RETRIES and not self.is_expired()
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def is_expired(self) -> bool:
+        return self.remaining() <= 0
 
 task_queue: Queue[InferenceTask] = Queue()
-failed_tasks: List[InferenceTask] = []
+failed_tasks: Deque[InferenceTask] = deque(maxlen=FINISHED_TASKS_KEPT)
+expired_tasks: Deque[InferenceTask] = deque(maxlen=FINISHED_TASKS_KEPT)
 active_tasks: Dict[str, InferenceTask] = {}
 
 SEQUENCER_URL = "http://localhost:5050"
 
-def submit_task(model_id: str, input_data: str):
-    task = InferenceTask(model_id, input_data)
+# Called as listener(task_id, status, payload) when a task finishes: status is
+# "completed" (payload has result and dacert), "expired" or "failed".
+# Listeners run on scheduler worker threads and must not block.
+CompletionListener = Callable[[str, str, Dict[str, Any]], None]
+_completion_listeners: List[CompletionListener] = []
+
+def add_completion_listener(listener: CompletionListener):
+    _completion_listeners.append(listener)
+
+def remove_completion_listener(listener: CompletionListener):
+    if listener in _completion_listeners:
+        _completion_listeners.remove(listener)
+
+def _notify_completion(task: InferenceTask, status: str, payload: Dict[str, Any]):
+    for listener in list(_completion_listeners):
+        try:
+            listener(task.task_id, status, payload)
+        except Exception as e:
+            logger.error(f"Completion listener failed for task {task.task_id}: {e}")
+
+def submit_task(model_id: str, input_data: str, timeout_seconds: Optional[float] = None, task_id: Optional[str] = None) -> str:
+    """Queues a task; pass the sequencer's task_id for tasks it issued."""
+    task = InferenceTask(model_id, input_data, timeout_seconds=timeout_seconds, task_id=task_id)
+    task.mark("enqueued")
     task_queue.put(task)
     active_tasks[task.task_id] = task
     logger.info(f"Task {task.task_id} submitted to queue")
+    return task.task_id
+
+def submit_tasks_bulk(entries: Iterable[Tuple[str, str]], timeout_seconds: Optional[float] = None) -> List[str]:
+    """
+    Enqueue many (model_id, input_data) pairs at once.
+    The queue lock is taken a single time for the whole chunk and waiting
+    workers are woken once, instead of once per task as with submit_task.
+    """
+    tasks = [
+        InferenceTask(model_id, input_data, timeout_seconds=timeout_seconds)
+        for model_id, input_data in entries
+    ]
+    if not tasks:
+        return []
+
+    for task in tasks:
+        task.mark("enqueued")
+        active_tasks[task.task_id] = task
+
+    with task_queue.mutex:
+        task_queue.queue.extend(tasks)
+        task_queue.unfinished_tasks += len(tasks)
+        task_queue.not_empty.notify(len(tasks))
+
+    logger.info(f"{len(tasks)} tasks submitted to queue in bulk")
+    return [task.task_id for task in tasks]
+
+# Expiry reports in flight; held so they are not garbage collected mid-request
+_background_reports: Set[asyncio.Task] = set()
+
+def expire_task(task: InferenceTask, reason: str, session: Optional[aiohttp.ClientSession] = None):
+    """
+    Drop a task that missed its deadline. Sequencer-issued tasks are reported
+    back in the background; nothing waits on the report.
+    """
+    active_tasks.pop(task.task_id, None)
+    expired_tasks.append(task)
+    logger.warning(f"Task {task.task_id} expired ({reason}), {-task.remaining():.2f}s past deadline")
+    _notify_completion(task, "expired", {"reason": reason})
+
+    if task.sequencer_issued and session is not None:
+        report = asyncio.get_running_loop().create_task(report_task_expired(session, task.task_id, reason))
+        _background_reports.add(report)
+        report.add_done_callback(_background_reports.discard)
+
+async def process_task(task: InferenceTask, session: aiohttp.ClientSession):
+    if task.is_expired():
+        # The time it spent queued is exactly what expired it, so it still counts as queue_wait
+        record_timeline(task.model_id, task.timeline)
+        expire_task(task, "expired_in_queue", session)
+        return
+
+    # Inference runs on the bounded pool so it can be abandoned at the deadline;
+    # an abandoned call finishes in the background, holding its slot, and its result is discarded.
+    try:
+        inference = INFERENCE_POOL.submit(partial(run_inference, task.model_id, task.input_data, timeline=task.timeline))
+    except InferencePoolFull:
+        logger.warning(f"Inference pool full, deferring task {task.task_id}")
+        await asyncio.sleep(POOL_FULL_BACKOFF_SECONDS)
+        task_queue.put(task)
+        return
 
-async def process_task(task: InferenceTask):
     logger.info(f"Processing task {task.task_id}")
     task.mark_attempt()
 
     try:
-        result = run_inference(task.model_id, task.input_data)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(inference), timeout=task.remaining())
+        except asyncio.TimeoutError:
+            raise TaskExpired("deadline passed during inference")
+
+        if task.is_expired():
+            raise TaskExpired("deadline passed before submission")
+
         dacert = generate_dacert("node-scheduler", task.task_id, result)
+        task.mark("dacert_generated")
 
-        async with aiohttp.ClientSession() as session:
-            success = await submit_result_retryable(session, task.task_id, result, dacert)
+        success = await submit_result_retryable(
+            session, task.task_id, result, dacert, attempt_log=task.submit_attempts, deadline=task.deadline
+        )
 
         if success:
+            task.mark("submitted")
+            record_timeline(task.model_id, task.timeline, task.submit_attempts)
             logger.info(f"Task {task.task_id} completed successfully")
             task.submitted = True
             del active_tasks[task.task_id]
+            _notify_completion(task, "completed", {"model_id": task.model_id, "result": result, "dacert": dacert})
         else:
             raise RuntimeError("Submission failed")
 
+    except TaskExpired as e:
+        record_timeline(task.model_id, task.timeline, task.submit_attempts)
+        expire_task(task, str(e), session)
+
     except Exception as e:
         logger.warning(f"Error processing task {task.task_id}: {e}")
-        if task.is_retryable():
+        record_timeline(task.model_id, task.timeline, task.submit_attempts)
+        if task.is_expired():
+            expire_task(task, "deadline passed before retry", session)
+        elif task.is_retryable():
+            task.reset_timeline()
+            task.mark("enqueued")
             task_queue.put(task)
         else:
+            active_tasks.pop(task.task_id, None)
             failed_tasks.append(task)
             logger.error(f"Task {task.task_id} permanently failed after {task.retries} retries")
+            _notify_completion(task, "failed", {"error": str(e)})
+
+async def _open_session() -> aiohttp.ClientSession:
+    return aiohttp.ClientSession()
 
 def task_worker():
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
+    # One connection pool per worker loop, reused for every submission and report
+    session = loop.run_until_complete(_open_session())
 
     while True:
         try:
             task: InferenceTask = task_queue.get(timeout=2)
-            if not task.submitted:
-                loop.run_until_complete(process_task(task))
         except Empty:
-            time.sleep(1)
+            # Lets background expiry reports progress while idle
+            loop.run_until_complete(asyncio.sleep(1))
+            continue
+        try:
+            task.mark("dequeued")
+            if not task.submitted:
+                loop.run_until_complete(process_task(task, session))
         except Exception as e:
             logger.error(f"Unhandled error in task worker: {e}")
+        finally:
+            # A requeued task was put back first, so task_queue.join() still waits for it
+            task_queue.task_done()
 
 def start_scheduler(num_workers: int = 2):
     logger.info(f"Starting task scheduler with {num_workers} worker(s)")
@@ -0,0 +1,60 @@
+import importlib.util
+import threading
+import time
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# api_backend pulls in the inference stack through task_scheduler
+HAS_INFERENCE_DEPS = importlib.util.find_spec("transformers") is not None
+
+@unittest.skipUnless(HAS_INFERENCE_DEPS, "transformers is not installed")
+class TestApiBackend(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import api_backend
+        import task_scheduler
+        cls.api_backend = api_backend
+        cls.task_scheduler = task_scheduler
+        app = FastAPI()
+        app.include_router(api_backend.router)
+        cls.client = TestClient(app)
+
+    def setUp(self):
+        self.api_backend.cache.flush()
+
+    def test_request_returns_scheduler_task_id_and_caps_recent(self):
+        ids = []
+        for i in range(self.api_backend.RECENT_TASKS_CAPACITY + 5):
+            res = self.client.post("/inference/request", json={"model_id": "parallax-llm-v1", "input_data": f"q{i}", "user_id": "u"})
+            ids.append(res.json()["task_id"])
+        self.assertIn(ids[-1], self.task_scheduler.active_tasks)
+        recent = self.client.get("/inference/recent").json()
+        self.assertEqual(len(recent), self.api_backend.RECENT_TASKS_CAPACITY)
+        self.assertEqual(recent[0]["task_id"], ids[-1])
+
+    def test_result_long_poll_wakes_on_publish(self):
+        timer = threading.Timer(0.2, self.api_backend.publish_result, ("task-1", "completed", {"result": {"output": "ok"}}))
+        timer.start()
+        start = time.monotonic()
+        res = self.client.post("/inference/result", json={"task_id": "task-1", "wait_seconds": 10})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["result"], {"output": "ok"})
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(self.api_backend._result_waiters, {})
+
+    def test_result_wait_times_out(self):
+        res = self.client.post("/inference/result", json={"task_id": "never", "wait_seconds": 0.1})
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(self.api_backend._result_waiters, {})
+
+    def test_agent_reports_update_single_field(self):
+        self.client.post("/agent/report", json={"node_id": "node-A", "status": "ok", "latency": 12})
+        self.client.post("/agent/report", json={"node_id": "node-B", "status": "busy", "latency": 40})
+        agents = self.client.get("/agents").json()
+        self.assertEqual(set(agents), {"node-A", "node-B"})
+        self.assertEqual(agents["node-B"]["status"], "busy")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import importlib.util
+import json
+import threading
+import unittest
+from unittest import mock
+
+# batch_dispatcher enqueues through task_scheduler, which pulls in the inference stack
+HAS_INFERENCE_DEPS = importlib.util.find_spec("transformers") is not None
+
+class StopWorker(BaseException):
+    """Escapes task_worker's exception handler so the test can end the worker thread."""
+
+def entry(text: str):
+    return {"model_id": "parallax-llm-v1", "input": text}
+
+@unittest.skipUnless(HAS_INFERENCE_DEPS, "transformers is not installed")
+class TestDispatchStream(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import batch_dispatcher
+        import task_scheduler
+        cls.dispatcher = batch_dispatcher
+        cls.scheduler = task_scheduler
+
+    def setUp(self):
+        self.scheduler.active_tasks.clear()
+        with self.scheduler.task_queue.mutex:
+            self.scheduler.task_queue.queue.clear()
+            self.scheduler.task_queue.unfinished_tasks = 0
+
+    def queued_ids(self):
+        with self.scheduler.task_queue.mutex:
+            return [task.task_id for task in self.scheduler.task_queue.queue]
+
+    def test_entries_are_enqueued_chunk_by_chunk(self):
+        progress = []
+        entries = [entry(f"gm {i}") for i in range(7)]
+        with mock.patch.object(self.dispatcher, "submit_tasks_bulk", wraps=self.scheduler.submit_tasks_bulk) as bulk:
+            summary = self.dispatcher.dispatch_stream(iter(entries), chunk_size=3, on_progress=progress.append)
+        self.assertEqual([len(call.args[0]) for call in bulk.call_args_list], [3, 3, 1])
+        self.assertEqual(summary["chunks"], 3)
+        self.assertEqual([p["processed_count"] for p in progress], [3, 6, 7])
+        self.assertEqual(self.scheduler.task_queue.unfinished_tasks, 7)
+
+    def test_accepted_ids_are_the_queued_task_ids(self):
+        summary = self.dispatcher.dispatch_stream([entry("a"), entry("b"), entry("c")], chunk_size=2)
+        self.assertEqual(summary["accepted_ids"], self.queued_ids())
+        self.assertEqual(set(summary["accepted_ids"]), set(self.scheduler.active_tasks))
+        self.assertEqual(self.scheduler.active_tasks[summary["accepted_ids"][1]].input_data, "b")
+
+    def test_rejections_reference_stream_positions(self):
+        lines = [json.dumps(entry("ok")), "", "{not json", json.dumps({"model_id": "m"}), json.dumps(entry("x" * 1001))]
+        summary = self.dispatcher.dispatch_ndjson(lines, chunk_size=2)
+        self.assertEqual(summary["accepted_count"], 1)
+        self.assertEqual([ref for ref, _ in summary["rejected_reasons"]], ["entry-1", "entry-2", "entry-3"])
+        self.assertEqual(summary["rejected_reasons"][2][1], "Input too long")
+
+    def test_failed_bulk_enqueue_rejects_its_chunk(self):
+        calls = []
+
+        def flaky(entries):
+            calls.append(entries)
+            if len(calls) == 2:
+                raise RuntimeError("queue unavailable")
+            return self.scheduler.submit_tasks_bulk(entries)
+        with mock.patch.object(self.dispatcher, "submit_tasks_bulk", flaky):
+            summary = self.dispatcher.dispatch_stream([entry(str(i)) for i in range(5)], chunk_size=2)
+        self.assertEqual(summary["accepted_count"], 3)
+        self.assertEqual(summary["rejected_reasons"], [("entry-2", "queue unavailable"), ("entry-3", "queue unavailable")])
+
+    def test_summary_ids_are_capped_but_progress_sees_them_all(self):
+        streamed_ids, streamed_rejections = [], []
+
+        def on_progress(progress):
+            streamed_ids.extend(progress["chunk_accepted_ids"])
+            streamed_rejections.extend(progress["chunk_rejected"])
+        entries = [entry(str(i)) if i % 3 else None for i in range(12)]
+        summary = self.dispatcher.dispatch_stream(entries, chunk_size=5, on_progress=on_progress, max_report_ids=2)
+        self.assertEqual(summary["accepted_count"], 8)
+        self.assertEqual(summary["rejected_count"], 4)
+        self.assertEqual(len(summary["accepted_ids"]), 2)
+        self.assertEqual(len(summary["rejected_reasons"]), 2)
+        self.assertTrue(summary["ids_truncated"])
+        self.assertEqual(streamed_ids, self.queued_ids())
+        self.assertEqual(summary["accepted_ids"], streamed_ids[:2])
+        self.assertEqual(len(streamed_rejections), 4)
+
+    def test_queue_join_returns_once_workers_drain_the_dispatch(self):
+        s = self.scheduler
+        processed, requeued = [], []
+
+        async def fake_process(task, session):
+            if task.input_data == "requeue" and not requeued:
+                requeued.append(task.task_id)
+                s.task_queue.put(task)
+                return
+            processed.append(task.task_id)
+            if len(processed) == 4:
+                # Ends this worker thread once the dispatch is drained
+                raise StopWorker
+
+        def run_worker():
+            try:
+                s.task_worker()
+            except StopWorker:
+                pass
+
+        self.dispatcher.dispatch_stream([entry("a"), entry("requeue"), entry("b"), entry("c")], chunk_size=2)
+        with mock.patch.object(s, "process_task", fake_process), \
+                mock.patch.object(s, "_open_session", mock.AsyncMock(return_value=object())):
+            worker = threading.Thread(target=run_worker, daemon=True)
+            worker.start()
+            joined = threading.Thread(target=s.task_queue.join, daemon=True)
+            joined.start()
+            joined.join(5)
+            worker.join(5)
+        self.assertFalse(joined.is_alive())
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(len(processed), 4)
+        self.assertEqual(processed[-1], requeued[0])
+        self.assertEqual(s.task_queue.unfinished_tasks, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import threading
+import unittest
+
+from cache_manager import CacheManager, LocalRedis, MemoryBackend, RedisBackend, WrongTypeError
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class CacheBehaviour:
+    """Checks shared by the in-process backend and the Redis backend over LocalRedis."""
+
+    def make_backend(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.cache = self.make_backend()
+
+    def test_get_set_delete(self):
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.set("k", {"a": [1, 2]})
+        self.assertEqual(self.cache.get("k"), {"a": [1, 2]})
+        self.assertTrue(self.cache.delete("k"))
+        self.assertEqual(self.cache.get("k", "default"), "default")
+
+    def test_incr(self):
+        self.assertEqual(self.cache.incr("n"), 1)
+        self.assertEqual(self.cache.incr("n", 5), 6)
+
+    def test_list_push_trim_range(self):
+        self.cache.lpush("l", 1, 2, 3)
+        self.assertEqual(self.cache.lrange("l", 0, -1), [3, 2, 1])
+        self.cache.ltrim("l", 0, 1)
+        self.assertEqual(self.cache.lrange("l"), [3, 2])
+        self.assertEqual(self.cache.lrange("l", -1, -1), [2])
+        self.assertEqual(self.cache.lrange("missing"), [])
+
+    def test_push_capped_keeps_newest(self):
+        for i in range(10):
+            self.cache.push_capped("recent", i, 3)
+        self.assertEqual(self.cache.lrange("recent"), [9, 8, 7])
+        self.assertEqual(self.cache.llen("recent"), 3)
+
+    def test_hash_operations(self):
+        self.assertEqual(self.cache.hset("h", "a", {"x": 1}), 1)
+        self.assertEqual(self.cache.hset("h", mapping={"a": {"x": 2}, "b": 0}), 1)
+        self.assertEqual(self.cache.hget("h", "a"), {"x": 2})
+        self.assertEqual(self.cache.hincrby("h", "count", 2), 2)
+        self.assertEqual(self.cache.hincrby("h", "count"), 3)
+        self.assertEqual(set(self.cache.hgetall("h")), {"a", "b", "count"})
+        self.assertEqual(self.cache.hdel("h", "a", "nope"), 1)
+
+    def test_compare_and_set(self):
+        self.assertTrue(self.cache.compare_and_set("leader", None, "node-A"))
+        self.assertFalse(self.cache.compare_and_set("leader", None, "node-B"))
+        self.assertTrue(self.cache.compare_and_set("leader", "node-A", "node-B"))
+        self.assertEqual(self.cache.get("leader"), "node-B")
+
+class TestMemoryBackend(CacheBehaviour, unittest.TestCase):
+    def make_backend(self):
+        self.clock = FakeClock()
+        return MemoryBackend(max_entries=100, clock=self.clock)
+
+    def test_ttl_expiry(self):
+        self.cache.set("k", 1, ttl=10)
+        self.clock.now += 9
+        self.assertEqual(self.cache.get("k"), 1)
+        self.clock.now += 2
+        self.assertIsNone(self.cache.get("k"))
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+
+    def test_lru_eviction(self):
+        cache = MemoryBackend(max_entries=3)
+        for key in "abc":
+            cache.set(key, key)
+        cache.get("a")
+        cache.set("d", "d")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual([cache.get(k) for k in "acd"], ["a", "c", "d"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expired_keys_are_dropped_before_live_ones(self):
+        cache = MemoryBackend(max_entries=2, clock=self.clock)
+        cache.set("old", 1, ttl=1)
+        cache.set("live", 2)
+        self.clock.now += 5
+        cache.set("new", 3)
+        self.assertEqual(cache.get("live"), 2)
+        self.assertEqual(cache.stats()["evictions"], 0)
+
+    def test_wrong_type(self):
+        self.cache.set("s", "text")
+        with self.assertRaises(WrongTypeError):
+            self.cache.lpush("s", 1)
+
+    def test_concurrent_updates_are_atomic(self):
+        def work():
+            for i in range(1000):
+                self.cache.incr("n")
+                self.cache.hincrby("h", "f")
+                self.cache.push_capped("l", i, 50)
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.cache.get("n"), 8000)
+        self.assertEqual(self.cache.hget("h", "f"), 8000)
+        self.assertEqual(self.cache.llen("l"), 50)
+
+class TestRedisBackend(CacheBehaviour, unittest.TestCase):
+    def make_backend(self):
+        return RedisBackend("memory://")
+
+    def test_compare_and_set_loses_to_concurrent_write(self):
+        client = self.cache.client
+        self.cache.set("k", "v1")
+        original_get = client.get
+
+        def racing_get(key):
+            value = original_get(key)
+            client.set(key, b'"v2"')
+            return value
+
+        client.get = racing_get
+        self.assertFalse(self.cache.compare_and_set("k", "v1", "mine"))
+        client.get = original_get
+        self.assertEqual(self.cache.get("k"), "v2")
+
+class TestCacheManager(unittest.TestCase):
+    def test_instances_share_default_backend(self):
+        CacheManager().set("shared-key", 42)
+        self.assertEqual(CacheManager().get("shared-key"), 42)
+
+    def test_explicit_backend(self):
+        cache = CacheManager(RedisBackend(client=LocalRedis()))
+        cache.push_capped("l", "x", 2)
+        self.assertEqual(cache.lrange("l"), ["x"])
+
+if __name__ == "__main__":
+    unittest.main()
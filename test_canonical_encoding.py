@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+
+import canonical_encoding
+from canonical_encoding import JSON_LEGACY, PCB1, CanonicalPayload, encode, hexdigest
+
+SAMPLE = {"task_id": "task-1", "model_id": "parallax-llm-v1", "output": {"label": "POSITIVE", "score": 0.98, "tags": ["a", None, True]}}
+
+class TestCanonicalEncoding(unittest.TestCase):
+    def test_key_order_does_not_matter(self):
+        reordered = {"output": {"tags": ["a", None, True], "score": 0.98, "label": "POSITIVE"}, "model_id": "parallax-llm-v1", "task_id": "task-1"}
+        for encoding in canonical_encoding.ENCODINGS:
+            self.assertEqual(encode(SAMPLE, encoding), encode(reordered, encoding))
+
+    def test_legacy_matches_sorted_json(self):
+        self.assertEqual(encode(SAMPLE, JSON_LEGACY), json.dumps(SAMPLE, sort_keys=True).encode())
+        self.assertEqual(hexdigest(SAMPLE, JSON_LEGACY), hashlib.sha256(json.dumps(SAMPLE, sort_keys=True).encode()).hexdigest())
+
+    def test_pcb1_is_compact_and_distinguishes_types(self):
+        self.assertLess(len(encode(SAMPLE, PCB1)), len(encode(SAMPLE, JSON_LEGACY)))
+        values = [1, True, 1.0, "1", [1], {"1": 1}, None, b"1", -1, 2 ** 70]
+        encodings = {encode(v, PCB1) for v in values}
+        self.assertEqual(len(encodings), len(values))
+        self.assertTrue(encode(SAMPLE, PCB1).startswith(canonical_encoding.PCB1_MAGIC))
+
+    def test_pcb1_rejects_ambiguous_values(self):
+        with self.assertRaises(ValueError):
+            encode({"x": float("nan")}, PCB1)
+        with self.assertRaises(TypeError):
+            encode({1: "int key"}, PCB1)
+
+    def test_pcb1_decode_round_trips(self):
+        value = {"ints": [0, -1, 127, 128, -2 ** 70], "f": 0.5, "b": b"\x00raw", "s": "h\u00e9", "n": None, "t": True, "d": {}}
+        self.assertEqual(canonical_encoding.decode_pcb1(encode(value, PCB1)), value)
+        with self.assertRaises(ValueError):
+            canonical_encoding.decode_pcb1(encode(value, PCB1) + b"N")
+        with self.assertRaises(ValueError):
+            canonical_encoding.decode_pcb1(encode(value, PCB1)[:-1])
+
+    def test_payload_memoizes_encoding_and_digest(self):
+        payload = CanonicalPayload(SAMPLE, PCB1)
+        self.assertIs(payload.encoded, payload.encoded)
+        self.assertIs(encode(payload, PCB1), payload.encoded)
+        self.assertEqual(payload.hexdigest(), hexdigest(SAMPLE, PCB1))
+        # A different encoding is computed from the wrapped data
+        self.assertEqual(encode(payload, JSON_LEGACY), encode(SAMPLE, JSON_LEGACY))
+
+class TestSignedDocuments(unittest.TestCase):
+    def setUp(self):
+        import dacert_generator
+        self.dacert_generator = dacert_generator
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_path = dacert_generator.NODE_KEY_PATH
+        dacert_generator.NODE_KEY_PATH = os.path.join(self.tmp.name, "node.hex")
+        dacert_generator._node_key = None
+
+    def tearDown(self):
+        self.dacert_generator.NODE_KEY_PATH = self.original_path
+        self.dacert_generator._node_key = None
+        self.tmp.cleanup()
+
+    def test_new_dacerts_are_tagged_and_verify(self):
+        cert = self.dacert_generator.generate_dacert("node-A", "task-1", SAMPLE)
+        self.assertEqual(cert["encoding"], canonical_encoding.DEFAULT_ENCODING)
+        self.assertTrue(self.dacert_generator.verify_dacert(cert))
+
+    def test_untagged_legacy_dacert_still_verifies(self):
+        signing_key, public_key = self.dacert_generator.get_node_key()
+        payload = {"node_id": "node-A", "task_id": "task-1", "model_id": "m", "output_hash": "00", "timestamp": 1}
+        legacy = {
+            "cert_payload": payload,
+            "signature": signing_key.sign(json.dumps(payload, sort_keys=True).encode()).signature.hex(),
+            "public_key": public_key
+        }
+        self.assertTrue(self.dacert_generator.verify_dacert(legacy))
+        legacy["encoding"] = PCB1
+        self.assertFalse(self.dacert_generator.verify_dacert(legacy))
+
+    def test_committee_dacert_round_trip(self):
+        import committee_signing
+        cert = committee_signing.sign_result({"task_id": "t", "model_id": "m", "output": {"label": "X"}})
+        self.assertTrue(committee_signing.verify_committee_dacert(cert))
+        cert["encoding"] = JSON_LEGACY
+        self.assertFalse(committee_signing.verify_committee_dacert(cert))
+
+if __name__ == "__main__":
+    unittest.main()
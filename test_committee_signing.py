@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+import unittest
+
+import committee_signing
+from committee_signing import (
+    COMMITTEE, CURRENT_ROSTER, CommitteeMember, CommitteeRoster, LocalSignerService, QuorumError, collect_quorum,
+    quorum_latency_stats, reset_quorum_stats, sign_result, sign_result_async, verify_committee_dacert,
+    compact_dacert, decode_compact_dacert, encode_compact_dacert, expand_compact_dacert, verify_compact_dacert
+)
+
+MESSAGE = b"batch-root"
+
+class _BadSigner(LocalSignerService):
+    async def request_signature(self, message: bytes) -> str:
+        return COMMITTEE[0].sign(message)  # valid signature, wrong member
+
+class TestCollectQuorum(unittest.TestCase):
+    def setUp(self):
+        reset_quorum_stats()
+
+    def test_returns_at_quorum_and_cancels_stragglers(self):
+        signers = [LocalSignerService(m) for m in COMMITTEE[:3]] + [LocalSignerService(m, delay=5) for m in COMMITTEE[3:]]
+        start = time.monotonic()
+        collected = asyncio.run(collect_quorum(MESSAGE, signers, quorum=3, member_timeout=10))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual({pk for pk, _ in collected}, {m.get_public_key() for m in COMMITTEE[:3]})
+
+    def test_timed_out_and_failed_members_are_skipped(self):
+        signers = [
+            LocalSignerService(COMMITTEE[0], delay=1),
+            LocalSignerService(COMMITTEE[1], fail=True),
+            LocalSignerService(COMMITTEE[2]),
+            LocalSignerService(COMMITTEE[3]),
+            LocalSignerService(COMMITTEE[4]),
+        ]
+        collected = asyncio.run(collect_quorum(MESSAGE, signers, quorum=3, member_timeout=0.05))
+        self.assertEqual({pk for pk, _ in collected}, {m.get_public_key() for m in COMMITTEE[2:]})
+        # The slow member is cancelled at quorum, before its timeout fires
+        self.assertEqual(quorum_latency_stats()["member_failures"], 1)
+
+    def test_member_timeout_bounds_a_failed_quorum(self):
+        signers = [LocalSignerService(m, delay=5) for m in COMMITTEE]
+        start = time.monotonic()
+        with self.assertRaises(QuorumError):
+            asyncio.run(collect_quorum(MESSAGE, signers, quorum=3, member_timeout=0.05))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(quorum_latency_stats()["member_failures"], len(COMMITTEE))
+
+    def test_bad_signature_is_rejected(self):
+        signers = [_BadSigner(COMMITTEE[1])] + [LocalSignerService(m) for m in COMMITTEE[2:5]]
+        collected = asyncio.run(collect_quorum(MESSAGE, signers, quorum=3))
+        self.assertNotIn(COMMITTEE[1].get_public_key(), [pk for pk, _ in collected])
+
+    def test_quorum_error_when_too_few_respond(self):
+        signers = [LocalSignerService(m, fail=i > 0) for i, m in enumerate(COMMITTEE)]
+        with self.assertRaises(QuorumError) as ctx:
+            asyncio.run(collect_quorum(MESSAGE, signers, quorum=3))
+        self.assertEqual(ctx.exception.collected, 1)
+        self.assertEqual(quorum_latency_stats()["quorum_failures"], 1)
+
+    def test_latency_percentiles_are_recorded(self):
+        signers = [LocalSignerService(m) for m in COMMITTEE]
+        for _ in range(5):
+            asyncio.run(collect_quorum(MESSAGE, signers, quorum=3))
+        stats = quorum_latency_stats()
+        self.assertEqual(stats["count"], 5)
+        self.assertIn("p99", stats)
+
+    def test_signed_dacert_verifies(self):
+        result = {"task_id": "t1", "model_id": "m", "output": {"label": "POSITIVE"}}
+        dacert = asyncio.run(sign_result_async(result))
+        self.assertEqual(len(dacert["signers"]), committee_signing.QUORUM_THRESHOLD)
+        self.assertTrue(verify_committee_dacert(dacert))
+
+class TestCompactDACert(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dacert = sign_result({"task_id": "t1", "model_id": "m", "output": {"label": "POSITIVE"}})
+
+    def test_round_trip_is_smaller_and_verifies(self):
+        wire = encode_compact_dacert(self.dacert)
+        self.assertLess(len(wire), len(json.dumps(self.dacert)) // 2)
+        self.assertTrue(verify_compact_dacert(wire))
+        expanded = expand_compact_dacert(wire)
+        self.assertEqual(set(expanded["signers"]), set(self.dacert["signers"]))
+        self.assertTrue(verify_committee_dacert(expanded))
+
+    def test_bitmap_follows_roster_order(self):
+        compact = compact_dacert(self.dacert)
+        indices = CURRENT_ROSTER.indices(compact["signers"])
+        self.assertEqual(len(indices), len(self.dacert["signers"]))
+        self.assertEqual(len(compact["signatures"]), 64 * len(indices))
+
+    def test_tampering_is_rejected(self):
+        compact = decode_compact_dacert(encode_compact_dacert(self.dacert))
+        flipped = bytearray(compact["signatures"])
+        flipped[0] ^= 1
+        self.assertFalse(verify_compact_dacert({**compact, "signatures": bytes(flipped)}))
+        self.assertFalse(verify_compact_dacert({**compact, "cert_payload": {**compact["cert_payload"], "task_id": "t2"}}))
+        # Dropping a signer leaves the bitmap and signature bytes inconsistent
+        self.assertFalse(verify_compact_dacert({**compact, "signatures": compact["signatures"][:-64]}))
+
+    def test_below_roster_quorum_is_rejected(self):
+        compact = compact_dacert(self.dacert)
+        lowest = compact["signers"] & -compact["signers"]
+        self.assertFalse(verify_compact_dacert({**compact, "signers": compact["signers"] ^ lowest, "signatures": compact["signatures"][64:]}))
+
+    def test_unknown_epoch_and_foreign_signer_are_rejected(self):
+        compact = compact_dacert(self.dacert)
+        self.assertFalse(verify_compact_dacert({**compact, "epoch": 999_999}))
+        foreign = {**self.dacert, "signers": [CommitteeMember().get_public_key()] + self.dacert["signers"][1:]}
+        with self.assertRaises(ValueError):
+            compact_dacert(foreign)
+
+    def test_epoch_cannot_be_redefined(self):
+        with self.assertRaises(ValueError):
+            committee_signing.register_roster(CommitteeRoster(CURRENT_ROSTER.epoch, [CommitteeMember().get_public_key()]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+import dacert_generator
+
+RESULT = {"model_id": "parallax-llm-v1", "input": "gm", "output": {"label": "POSITIVE", "score": 0.9}}
+
+class TestDACertGenerator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_path = dacert_generator.NODE_KEY_PATH
+        dacert_generator.NODE_KEY_PATH = os.path.join(self.tmp.name, "keys", "node.hex")
+        dacert_generator._node_key = None
+
+    def tearDown(self):
+        dacert_generator.NODE_KEY_PATH = self.original_path
+        dacert_generator._node_key = None
+        self.tmp.cleanup()
+
+    def test_node_key_persists_across_reloads(self):
+        _, first = dacert_generator.get_node_key()
+        self.assertTrue(os.path.exists(dacert_generator.NODE_KEY_PATH))
+        dacert_generator._node_key = None
+        _, second = dacert_generator.get_node_key()
+        self.assertEqual(first, second)
+
+    def test_batch_certs_verify_and_match_single(self):
+        items = [(f"task-{i}", dict(RESULT, input=f"gm {i}")) for i in range(5)]
+        certs = dacert_generator.generate_dacerts_batch("node-A", items)
+        self.assertEqual([c["cert_payload"]["task_id"] for c in certs], [t for t, _ in items])
+        self.assertTrue(all(dacert_generator.verify_dacert(c) for c in certs))
+
+        single = dacert_generator.generate_dacert("node-A", "task-0", items[0][1])
+        self.assertEqual(single["cert_payload"]["output_hash"], certs[0]["cert_payload"]["output_hash"])
+
+    def test_tampered_cert_fails(self):
+        cert = dacert_generator.generate_dacerts_batch("node-A", [("task-1", RESULT)])[0]
+        cert["cert_payload"]["task_id"] = "task-2"
+        self.assertFalse(dacert_generator.verify_dacert(cert))
+
+if __name__ == "__main__":
+    unittest.main()
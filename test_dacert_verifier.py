@@ -0,0 +1,136 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+import dacert_generator
+from dacert_verifier import DACertVerifier
+
+RESULT = {"model_id": "parallax-llm-v1", "input": "gm", "output": {"label": "POSITIVE", "score": 0.9}}
+
+class _NodeKeyCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.original_path = dacert_generator.NODE_KEY_PATH
+        dacert_generator.NODE_KEY_PATH = os.path.join(cls.tmp.name, "node.hex")
+        dacert_generator._node_key = None
+        cls.public_key = dacert_generator.get_node_key()[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        dacert_generator.NODE_KEY_PATH = cls.original_path
+        dacert_generator._node_key = None
+        cls.tmp.cleanup()
+
+class TestDACertVerifier(_NodeKeyCase):
+    def run_verifier(self, coro_fn):
+        async def run():
+            verifier = DACertVerifier(max_wait_ms=20)
+            try:
+                return await coro_fn(verifier), verifier.stats()
+            finally:
+                await verifier.stop()
+        return asyncio.run(run())
+
+    def test_valid_cert_is_accepted_then_cached(self):
+        dacert = dacert_generator.generate_dacert("node-A", "t1", RESULT)
+
+        async def twice(verifier):
+            return [await verifier.verify(dacert, RESULT, self.public_key) for _ in range(2)]
+        reasons, stats = self.run_verifier(twice)
+        self.assertEqual(reasons, [None, None])
+        self.assertEqual(stats["cache_hits"], 1)
+        self.assertEqual(stats["batches"], 1)
+        self.assertEqual(stats["latency_seconds"]["count"], 2)
+
+    def test_rejections(self):
+        dacert = dacert_generator.generate_dacert("node-A", "t1", RESULT)
+        forged = {**dacert, "cert_payload": {**dacert["cert_payload"], "task_id": "t2"}}
+
+        async def check(verifier):
+            return [
+                await verifier.verify(dacert, {**RESULT, "output": {"label": "NEGATIVE"}}, self.public_key),
+                await verifier.verify(dacert, RESULT, "00" * 32),
+                await verifier.verify(forged, RESULT, self.public_key),
+                await verifier.verify({"cert_payload": {}}, RESULT),
+            ]
+        reasons, stats = self.run_verifier(check)
+        self.assertIn("output hash", reasons[0])
+        self.assertIn("public key", reasons[1])
+        self.assertEqual(reasons[2], "invalid signature")
+        self.assertIn("malformed", reasons[3])
+        self.assertEqual(stats["rejected"], 4)
+        self.assertEqual(stats["cached_certs"], 0)
+
+    def test_cached_cert_still_checks_result_binding(self):
+        dacert = dacert_generator.generate_dacert("node-A", "t1", RESULT)
+
+        async def check(verifier):
+            await verifier.verify(dacert, RESULT)
+            return await verifier.verify(dacert, {**RESULT, "input": "other"})
+        reason, stats = self.run_verifier(check)
+        self.assertIn("output hash", reason)
+        self.assertEqual(stats["cache_hits"], 1)
+
+    def test_concurrent_submissions_are_batched(self):
+        items = [(f"t{i}", dict(RESULT, input=f"gm {i}")) for i in range(40)]
+        certs = dacert_generator.generate_dacerts_batch("node-A", items)
+
+        async def concurrently(verifier):
+            return await asyncio.gather(*(verifier.verify(cert, result) for cert, (_, result) in zip(certs, items)))
+        reasons, stats = self.run_verifier(concurrently)
+        self.assertEqual(reasons, [None] * 40)
+        self.assertLess(stats["batches"], 40)
+        self.assertEqual(stats["queue_depth"], 0)
+
+class TestSequencerSubmitResult(_NodeKeyCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import sequencer_core
+        cls.sequencer = sequencer_core
+        cls.client = TestClient(sequencer_core.app).__enter__()
+        res = cls.client.post("/register_node", json={"node_id": "node-A", "capabilities": ["parallax-llm-v1"], "public_key": cls.public_key})
+        assert res.status_code == 200
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+        cls.sequencer.REGISTERED_NODES.pop("node-A", None)
+        super().tearDownClass()
+
+    def assign_task(self) -> str:
+        task_id = self.client.post("/submit_task", json={"model": "parallax-llm-v1", "input": "gm"}).json()["task_id"]
+        while True:
+            task = self.client.get("/get_task", params={"node_id": "node-A"}).json()
+            if task["task_id"] == task_id:
+                return task_id
+
+    def test_task_completes_only_with_a_valid_cert(self):
+        task_id = self.assign_task()
+        bad = dacert_generator.generate_dacert("node-A", task_id, {**RESULT, "input": "tampered"})
+        res = self.client.post("/submit_result", json={"task_id": task_id, "result": RESULT, "dacert": bad})
+        self.assertEqual(res.status_code, 400)
+        self.assertNotIn(task_id, self.sequencer.COMPLETED_TASKS)
+
+        good = dacert_generator.generate_dacert("node-A", task_id, RESULT)
+        res = self.client.post("/submit_result", json={"task_id": task_id, "result": RESULT, "dacert": good})
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(task_id, self.sequencer.COMPLETED_TASKS)
+
+        stats = self.client.get("/verification/stats").json()
+        self.assertGreaterEqual(stats["accepted"], 1)
+        self.assertGreaterEqual(stats["rejected"], 1)
+        self.assertIn("p99", stats["latency_seconds"])
+
+    def test_cert_from_another_node_is_refused(self):
+        task_id = self.assign_task()
+        other = dacert_generator.generate_dacert("node-B", task_id, RESULT)
+        res = self.client.post("/submit_result", json={"task_id": task_id, "result": RESULT, "dacert": other})
+        self.assertEqual(res.status_code, 403)
+
+if __name__ == "__main__":
+    unittest.main()
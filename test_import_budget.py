@@ -0,0 +1,48 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import unittest
+
+# Maximum wall time, in milliseconds, to import each module in a fresh interpreter.
+# Model weights must never be loaded at import time; these budgets catch regressions.
+IMPORT_BUDGET_MS = {
+    "sentiment_model": 250,
+    "api": 2000,
+}
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def measure_import(module: str):
+    """Returns (import time in ms, whether transformers got imported) for a fresh interpreter."""
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = (time.perf_counter() - start) * 1000\n"
+        "print(elapsed, 'transformers' in sys.modules)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    elapsed, transformers_loaded = out.stdout.strip().splitlines()[-1].split()
+    return float(elapsed), transformers_loaded == "True"
+
+class TestImportBudget(unittest.TestCase):
+    def test_sentiment_model_import_is_lazy(self):
+        elapsed, transformers_loaded = measure_import("sentiment_model")
+        self.assertFalse(transformers_loaded, "sentiment_model must not import transformers at import time")
+        self.assertLess(elapsed, IMPORT_BUDGET_MS["sentiment_model"])
+
+    @unittest.skipUnless(importlib.util.find_spec("fastapi"), "fastapi not installed")
+    def test_api_import_within_budget(self):
+        elapsed, transformers_loaded = measure_import("api")
+        self.assertFalse(transformers_loaded, "api must not load the sentiment model at import time")
+        self.assertLess(elapsed, IMPORT_BUDGET_MS["api"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import unittest
+
+from inference_batcher import InferenceBatcher, QueueFullError
+
+def double(items):
+    return [item * 2 for item in items]
+
+class TestInferenceBatcher(unittest.TestCase):
+    def run_batcher(self, batcher, coro_fn):
+        async def run():
+            try:
+                return await coro_fn()
+            finally:
+                await batcher.stop()
+        return asyncio.run(run())
+
+    def test_concurrent_requests_share_batches(self):
+        batcher = InferenceBatcher(double, max_batch_size=8, max_wait_ms=20, workers=1)
+
+        async def concurrently():
+            return await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+        self.assertEqual(self.run_batcher(batcher, concurrently), [i * 2 for i in range(20)])
+        stats = batcher.stats()
+        self.assertEqual(stats["batches"], 3)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_admission_is_all_or_nothing(self):
+        batcher = InferenceBatcher(double, max_queue_depth=4)
+
+        async def overfill():
+            with self.assertRaises(QueueFullError):
+                await batcher.submit_many(list(range(5)))
+            self.assertEqual(batcher.depth, 0)
+            return await batcher.submit_many(list(range(4)))
+        self.assertEqual(self.run_batcher(batcher, overfill), [0, 2, 4, 6])
+
+    def test_batch_failure_reaches_every_caller(self):
+        batcher = InferenceBatcher(lambda items: 1 / 0, max_wait_ms=20)
+
+        async def failing():
+            return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        results = self.run_batcher(batcher, failing)
+        self.assertTrue(all(isinstance(r, ZeroDivisionError) for r in results))
+
+    def test_short_result_list_fails_the_batch(self):
+        batcher = InferenceBatcher(lambda items: items[:-1], max_wait_ms=20, workers=1)
+
+        async def short():
+            return await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), 5)
+        results = self.run_batcher(batcher, short)
+        self.assertEqual(len(results), 3)
+        for result in results:
+            self.assertIsInstance(result, RuntimeError)
+            self.assertIn("2 results for 3 inputs", str(result))
+
+    def test_stop_cancels_running_and_queued_requests(self):
+        release = threading.Event()
+
+        def blocking(items):
+            release.wait(5)
+            return items
+        batcher = InferenceBatcher(blocking, max_batch_size=1, max_wait_ms=0, workers=1)
+
+        async def stop_midway():
+            requests = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+            await asyncio.sleep(0.05)
+            await batcher.stop()
+            release.set()
+            results = await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), 5)
+            return results, batcher.depth
+        results, depth = asyncio.run(stop_midway())
+        self.assertTrue(all(isinstance(r, asyncio.CancelledError) for r in results))
+        self.assertEqual(depth, 0)
+
+    def test_restarts_after_stop(self):
+        batcher = InferenceBatcher(double, max_wait_ms=0)
+        self.assertEqual(self.run_batcher(batcher, lambda: batcher.submit(1)), 2)
+        self.assertEqual(self.run_batcher(batcher, lambda: batcher.submit(2)), 4)
+
+if __name__ == "__main__":
+    unittest.main()
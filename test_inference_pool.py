@@ -0,0 +1,42 @@
+import threading
+import unittest
+
+from inference_pool import BoundedInferencePool, InferencePoolFull
+
+class TestBoundedInferencePool(unittest.TestCase):
+    def test_full_pool_refuses_until_a_slot_frees(self):
+        pool = BoundedInferencePool(size=2)
+        release = threading.Event()
+        running = [pool.submit(release.wait, 5) for _ in range(2)]
+        self.assertEqual(pool.available, 0)
+        with self.assertRaises(InferencePoolFull):
+            pool.submit(lambda: None)
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+        release.set()
+        for future in running:
+            future.result(5)
+        self.assertEqual(pool.submit(lambda: 42).result(5), 42)
+        pool.shutdown()
+
+    def test_abandoned_call_keeps_its_slot(self):
+        pool = BoundedInferencePool(size=1)
+        release = threading.Event()
+        future = pool.submit(release.wait, 5)
+        # Cancelling a running call does not stop it, so the slot stays taken
+        self.assertFalse(future.cancel())
+        self.assertEqual(pool.stats()["in_flight"], 1)
+        release.set()
+        future.result(5)
+        self.assertEqual(pool.available, 1)
+        pool.shutdown()
+
+    def test_failed_call_releases_its_slot(self):
+        pool = BoundedInferencePool(size=1)
+        with self.assertRaises(ZeroDivisionError):
+            pool.submit(lambda: 1 / 0).result(5)
+        self.assertEqual(pool.available, 1)
+        pool.shutdown()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import merkle_utils
+from merkle_utils import build_levels, build_proof, hash_leaf, hash_node, merkle_root, verify_proof
+
+def leaves(n: int):
+    return [hash_leaf(f"leaf-{i}".encode()) for i in range(n)]
+
+class TestMerkleUtils(unittest.TestCase):
+    def test_every_proof_verifies_for_odd_and_even_sizes(self):
+        for n in range(1, 18):
+            hashes = leaves(n)
+            levels = build_levels(hashes)
+            root = levels[-1][0]
+            for index in range(n):
+                siblings, bits = build_proof(levels, index)
+                self.assertTrue(verify_proof(hashes[index], siblings, bits, root), (n, index))
+
+    def test_odd_node_is_promoted(self):
+        a, b, c = leaves(3)
+        self.assertEqual(merkle_root([a, b, c]), hash_node(hash_node(a, b), c))
+        self.assertEqual(merkle_root([a]), a)
+
+    def test_wrong_leaf_or_path_fails(self):
+        hashes = leaves(9)
+        levels = build_levels(hashes)
+        root = levels[-1][0]
+        siblings, bits = build_proof(levels, 4)
+        self.assertFalse(verify_proof(hashes[5], siblings, bits, root))
+        self.assertFalse(verify_proof(hashes[4], siblings, bits ^ 1, root))
+
+    def test_leaf_and_node_hashes_are_domain_separated(self):
+        a, b = leaves(2)
+        self.assertNotEqual(hash_leaf(a + b), hash_node(a, b))
+
+    def test_empty_tree_rejected(self):
+        with self.assertRaises(ValueError):
+            merkle_root([])
+
+class TestMerkleDACerts(unittest.TestCase):
+    def setUp(self):
+        import dacert_generator
+        self.dg = dacert_generator
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_path = dacert_generator.NODE_KEY_PATH
+        dacert_generator.NODE_KEY_PATH = os.path.join(self.tmp.name, "node.hex")
+        dacert_generator._node_key = None
+        self.items = [(f"task-{i}", {"model_id": "parallax-llm-v1", "output": i}) for i in range(7)]
+
+    def tearDown(self):
+        self.dg.NODE_KEY_PATH = self.original_path
+        self.dg._node_key = None
+        self.tmp.cleanup()
+
+    def test_batch_cert_and_proofs_verify(self):
+        cert, proofs = self.dg.generate_merkle_dacert("node-A", self.items)
+        self.assertEqual(self.dg.verify_merkle_batch(cert, proofs), [True] * len(self.items))
+        self.assertTrue(self.dg.verify_inclusion(cert, proofs[3], self.items[3][1]))
+        self.assertFalse(self.dg.verify_inclusion(cert, proofs[3], self.items[4][1]))
+
+    def test_forged_proof_or_root_fails(self):
+        cert, proofs = self.dg.generate_merkle_dacert("node-A", self.items)
+        forged = dict(proofs[2], task_id="task-999")
+        self.assertFalse(self.dg.verify_inclusion(cert, forged))
+        cert["cert_payload"]["batch_root"] = "00" * 32
+        self.assertEqual(self.dg.verify_merkle_batch(cert, proofs), [False] * len(proofs))
+
+    def test_committee_signed_root(self):
+        import committee_signing
+        cert, proofs = committee_signing.sign_merkle_batch(self.items)
+        self.assertTrue(committee_signing.verify_committee_dacert(cert))
+        self.assertTrue(all(self.dg.verify_inclusion(cert, proof) for proof in proofs))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from model_placement import PlacementPlanner
+
+SIZES = {"llm": 400, "quant": 300, "vision": 700}
+
+class TestPlacementPlanner(unittest.TestCase):
+    def setUp(self):
+        self.planner = PlacementPlanner(dict(SIZES))
+        for node_id, memory in (("a", 1000), ("b", 1000), ("c", 800), ("d", 1200)):
+            self.planner.add_node(node_id, memory)
+
+    def assert_within_memory(self):
+        for node_id in self.planner.node_memory:
+            self.assertGreaterEqual(self.planner.free_mb(node_id), 0, node_id)
+
+    def test_every_model_placed_once_without_demand(self):
+        plan = self.planner.compute()
+        placed = sorted(m for models in plan.values() for m in models)
+        self.assertEqual(placed, sorted(SIZES))
+        self.assert_within_memory()
+
+    def test_hot_model_gets_replicas_on_distinct_nodes(self):
+        self.planner.compute()
+        self.planner.set_demand("llm", 80)
+        self.planner.set_demand("quant", 20)
+        self.planner.rebalance()
+        # 80% of demand on 4 nodes wants 4 replicas; the node holding vision has no room
+        self.assertEqual(len(self.planner.placement["llm"]), 3)
+        self.assertEqual(self.planner.unplaced, {"llm": 1})
+        self.assertNotIn("llm", self.planner.assignments_for(next(iter(self.planner.placement["vision"]))))
+        self.assert_within_memory()
+
+    def test_rebalance_only_moves_changed_replicas(self):
+        self.planner.compute()
+        vision_host = set(self.planner.placement["vision"])
+        self.planner.set_demand("llm", 50)
+        self.planner.set_demand("quant", 50)
+        changes = self.planner.rebalance()
+        self.assertEqual(self.planner.placement["vision"], vision_host)
+        self.assertTrue(all(not change["unload"] for change in changes.values()))
+
+        self.planner.set_demand("llm", 0)
+        changes = self.planner.rebalance()
+        self.assertEqual(len(self.planner.placement["llm"]), 1)
+        self.assertTrue(any(change["unload"] == ["llm"] for change in changes.values()))
+
+    def test_node_removal_replaces_lost_replicas(self):
+        self.planner.compute()
+        host = next(iter(self.planner.placement["vision"]))
+        self.planner.remove_node(host)
+        self.planner.rebalance()
+        self.assertEqual(len(self.planner.placement["vision"]), 1)
+        self.assertNotIn(host, self.planner.placement["vision"])
+
+    def test_unplaceable_model_reported(self):
+        self.planner.set_model("giant", 5000)
+        self.planner.rebalance()
+        self.assertEqual(self.planner.unplaced, {"giant": 1})
+        self.assertEqual(self.planner.assignments_for("a").count("giant"), 0)
+
+class TestSequencerDemand(unittest.TestCase):
+    def setUp(self):
+        import sequencer_core
+        self.sequencer = sequencer_core
+        self.sequencer._submissions_since_rebalance = 0
+
+    def test_submissions_rebalance_on_threshold_only(self):
+        with mock.patch.object(self.sequencer, "REBALANCE_EVERY_SUBMISSIONS", 10), \
+                mock.patch.object(self.sequencer.PLACEMENT, "rebalance", return_value={}) as rebalance:
+            client = TestClient(self.sequencer.app)
+            for i in range(25):
+                res = client.post("/submit_task", json={"model": "parallax-llm-v1", "input": f"q{i}"})
+                self.assertEqual(res.status_code, 200)
+        self.assertEqual(rebalance.call_count, 2)
+        self.sequencer.PENDING_TASKS.clear()
+
+    def test_decay_tick_ages_demand_and_rebalances(self):
+        with mock.patch.object(self.sequencer.PLACEMENT, "rebalance", return_value={}) as rebalance, \
+                mock.patch.dict(self.sequencer.PLACEMENT.demand, {"parallax-llm-v1": 8.0}):
+            self.sequencer._submissions_since_rebalance = 7
+            self.sequencer._decay_and_rebalance()
+            self.assertEqual(self.sequencer.PLACEMENT.demand["parallax-llm-v1"], 8.0 * self.sequencer.DEMAND_DECAY_FACTOR)
+        rebalance.assert_called_once()
+        self.assertEqual(self.sequencer._submissions_since_rebalance, 0)
+
+if __name__ == "__main__":
+    unittest.main()
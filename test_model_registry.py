@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+import ai_model_registry
+from ai_model_registry import DEFAULT_MODELS, AIModel, ModelRegistry, build_model_map, load_default_models
+
+def make_model(model_id: str, task: str = "text-classification", license: str = "MIT", **kwargs) -> AIModel:
+    return AIModel(
+        model_id=model_id,
+        name=model_id.title(),
+        description="test model",
+        task=task,
+        source=f"hf/{model_id}",
+        size_mb=100,
+        license=license,
+        **kwargs
+    )
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ModelRegistry()
+        self.registry.register_model(make_model("a"))
+        self.registry.register_model(make_model("b", task="image-captioning"))
+        self.registry.register_model(make_model("c", license="Apache-2.0"))
+
+    def test_index_queries(self):
+        self.assertEqual(self.registry.find_model_ids(task="text-classification"), {"a", "c"})
+        self.assertEqual(self.registry.find_model_ids(task="text-classification", license="MIT"), {"a"})
+        self.assertEqual(self.registry.find_model_ids(license="GPL"), set())
+        self.assertEqual([m["model_id"] for m in self.registry.list_models()], ["a", "b", "c"])
+
+    def test_update_reindexes(self):
+        self.registry.update_model("a", license="Apache-2.0")
+        self.registry.mark_unavailable("c")
+        self.assertEqual(self.registry.find_model_ids(license="Apache-2.0"), {"a", "c"})
+        self.assertEqual(self.registry.find_model_ids(status="available"), {"a", "b"})
+        self.assertEqual(set(build_model_map(self.registry)), {"a", "b"})
+
+    def test_remove_unindexes(self):
+        self.registry.remove_model("b")
+        self.assertEqual(self.registry.find_model_ids(task="image-captioning"), set())
+        self.assertNotIn("b", self.registry)
+
+    def test_subscriptions(self):
+        events = []
+        token = self.registry.subscribe(lambda event, model: events.append((event, model.model_id)))
+        self.registry.register_model(make_model("d"))
+        self.registry.mark_unavailable("d")
+        self.registry.update_model("a", size_mb=5)
+        self.registry.remove_model("d")
+        self.registry.unsubscribe(token)
+        self.registry.remove_model("a")
+        self.assertEqual(events, [("added", "d"), ("unavailable", "d"), ("updated", "a"), ("removed", "d")])
+
+    def test_failing_listener_does_not_break_registry(self):
+        self.registry.subscribe(lambda event, model: 1 / 0)
+        self.registry.register_model(make_model("e"))
+        self.assertIn("e", self.registry)
+
+    def test_persistence_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "registry.db")
+            first = ModelRegistry(path)
+            first.register_model(make_model("x"))
+            first.register_model(make_model("y", task="image-captioning"))
+            first.mark_unavailable("y")
+            first.remove_model("x")
+            first.close()
+
+            second = ModelRegistry(path)
+            self.assertEqual(second.find_model_ids(), {"y"})
+            self.assertEqual(second.get_model("y").status, "unavailable")
+            self.assertEqual(second.find_model_ids(task="image-captioning"), {"y"})
+            second.close()
+
+    def test_shared_registry_is_in_memory_by_default(self):
+        if not os.getenv("MODEL_REGISTRY_DB"):
+            self.assertIsNone(ai_model_registry.registry._db)
+
+    def test_stored_defaults_are_reconciled(self):
+        shipped = DEFAULT_MODELS[0]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "registry.db")
+            first = ModelRegistry(path)
+            stale = AIModel(**dict(shipped.to_dict(), source="old/repo", size_mb=1))
+            first.register_model(stale)
+            first.mark_unavailable(shipped.model_id)
+            first.close()
+
+            second = ModelRegistry(path)
+            load_default_models(second)
+            model = second.get_model(shipped.model_id)
+            self.assertEqual((model.source, model.size_mb), (shipped.source, shipped.size_mb))
+            # Operator-set status survives reconciliation
+            self.assertEqual(model.status, "unavailable")
+            self.assertEqual(len(second), len(DEFAULT_MODELS))
+            second.close()
+
+            third = ModelRegistry(path)
+            self.assertEqual(third.get_model(shipped.model_id).source, shipped.source)
+            third.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from proof_log import ProofLog
+
+def record(i: int) -> dict:
+    return {"task_id": f"task-{i}", "combined_hash": f"{i:064x}"}
+
+class TestProofLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_is_readable_before_and_after_commit(self):
+        log = ProofLog(self.dir, group_commit_ms=50)
+        future = log.append("task-1", record(1))
+        self.assertEqual(log.get("task-1"), record(1))
+        future.result(5)
+        self.assertEqual(log.get("task-1"), record(1))
+        self.assertEqual(log.stats()["pending"], 0)
+        log.close()
+
+    def test_concurrent_appends_share_group_commits(self):
+        log = ProofLog(self.dir, group_commit_ms=20)
+        threads = [threading.Thread(target=lambda k=k: [log.append(f"task-{k}-{i}", record(i)) for i in range(50)]) for k in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        log.flush(5)
+        stats = log.stats()
+        self.assertEqual(stats["records"], 200)
+        self.assertLess(stats["group_commits"], 200)
+        log.close()
+
+    def test_segments_rotate_and_index_is_rebuilt(self):
+        log = ProofLog(self.dir, segment_bytes=512, group_commit_ms=0)
+        for i in range(40):
+            log.append(f"task-{i}", record(i)).result(5)
+        log.append("task-3", {**record(3), "version": 2}).result(5)
+        log.close()
+        self.assertGreater(len(os.listdir(self.dir)), 1)
+
+        reopened = ProofLog(self.dir)
+        self.assertEqual(len(reopened), 40)
+        self.assertEqual(reopened.get("task-17"), record(17))
+        self.assertEqual(reopened.get("task-3")["version"], 2)
+        self.assertIsNone(reopened.get("missing"))
+        reopened.close()
+
+    def test_torn_tail_is_truncated_on_open(self):
+        log = ProofLog(self.dir)
+        log.append_many([(f"task-{i}", record(i)) for i in range(3)])
+        log.close()
+        segment = os.path.join(self.dir, sorted(os.listdir(self.dir))[-1])
+        with open(segment, "ab") as f:
+            f.write(b'{"task_id":"task-torn","comb')
+
+        reopened = ProofLog(self.dir)
+        self.assertEqual(len(reopened), 3)
+        reopened.append("task-3", record(3)).result(5)
+        reopened.close()
+        again = ProofLog(self.dir)
+        self.assertEqual(again.get("task-3"), record(3))
+        again.close()
+
+    def test_closed_log_refuses_appends(self):
+        log = ProofLog(self.dir)
+        log.close()
+        with self.assertRaises(RuntimeError):
+            log.append("task-1", record(1))
+
+class TestProverUsesProofLog(unittest.TestCase):
+    def test_batch_proofs_are_stored_and_verify(self):
+        import zk_prover_engine
+        with tempfile.TemporaryDirectory() as tmp:
+            original_dir, original_log = zk_prover_engine.PROOF_OUTPUT_DIR, zk_prover_engine._proof_log
+            zk_prover_engine.PROOF_OUTPUT_DIR, zk_prover_engine._proof_log = tmp, None
+            try:
+                items = [(f"task-{i}", "parallax-llm-v1", f"input {i}", {"label": "POSITIVE"}) for i in range(10)]
+                proofs = zk_prover_engine.generate_simulated_proofs_batch(items)
+                zk_prover_engine.get_proof_log().flush(5)
+                self.assertEqual(zk_prover_engine.load_proof("task-4"), proofs[4])
+                self.assertTrue(zk_prover_engine.verify_simulated_proof(proofs[4], "input 4", {"label": "POSITIVE"}))
+                single = zk_prover_engine.generate_simulated_proof("task-x", "parallax-llm-v1", "input 4", {"label": "POSITIVE"})
+                self.assertEqual(single["input_hash"], zk_prover_engine.hash_payload({"task_id": "task-x", "model_id": "parallax-llm-v1", "input": "input 4"}))
+            finally:
+                zk_prover_engine.get_proof_log().close()
+                zk_prover_engine.PROOF_OUTPUT_DIR, zk_prover_engine._proof_log = original_dir, original_log
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import faulthandler
+import json
+import unittest
+
+from fastapi.testclient import TestClient
+
+import api
+
+TEST_TIMEOUT_SECONDS = 60
+
+def fake_sentiment(texts):
+    return [{"sentiment": "Positive" if "good" in t else "Negative", "confidence": 0.9} for t in texts]
+
+class TestQueryEndpoints(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Abort with tracebacks instead of hanging the suite if a stream stalls
+        faulthandler.dump_traceback_later(TEST_TIMEOUT_SECONDS, exit=True)
+        cls.original_batch_fn = api.sentiment_batcher.batch_fn
+        cls.original_warmup = api.warmup
+        api.sentiment_batcher.batch_fn = fake_sentiment
+        api.warmup = lambda: None
+        # One client (and event loop) for the class, since the batcher binds to its loop
+        cls.client = TestClient(api.app).__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+        api.sentiment_batcher.batch_fn = cls.original_batch_fn
+        api.warmup = cls.original_warmup
+        faulthandler.cancel_dump_traceback_later()
+
+    def test_batch_keeps_input_order(self):
+        res = self.client.post("/query/batch", json={"session_id": "batch", "queries": ["good", "bad", "good day"]})
+        self.assertEqual(res.status_code, 200)
+        outputs = [r["result"]["output"] for r in res.json()["results"]]
+        self.assertEqual(outputs, ["Positive", "Negative", "Positive"])
+
+    def test_batch_rejects_oversized_and_empty(self):
+        too_many = ["x"] * (api.QUERY_BATCH_MAX_ITEMS + 1)
+        self.assertEqual(self.client.post("/query/batch", json={"session_id": "s", "queries": too_many}).status_code, 413)
+        self.assertEqual(self.client.post("/query/batch", json={"session_id": "s", "queries": []}).status_code, 400)
+
+    def test_stream_ndjson(self):
+        lines = [json.dumps({"query": f"good {i}", "id": i}) for i in range(150)]
+        lines[3] = "not json"
+        body = "\n".join(lines) + "\n"
+        res = self.client.post("/query/stream", content=body)
+        self.assertEqual(res.status_code, 200)
+        records = [json.loads(line) for line in res.text.splitlines()]
+        self.assertEqual(records[-1], {"done": True, "processed": 150, "errors": 1})
+        self.assertEqual([r["line"] for r in records[:-1]], list(range(1, 151)))
+        self.assertIn("error", records[3])
+        self.assertEqual(records[10]["id"], 10)
+        self.assertEqual(records[10]["result"]["output"], "Positive")
+
+    def test_stream_lines_split_across_chunks(self):
+        chunks = [b'"go', b'od"\n"b', b'ad"', b'\n\n"good again"']
+        res = self.client.post("/query/stream", content=iter(chunks))
+        records = [json.loads(line) for line in res.text.splitlines()]
+        self.assertEqual([r["result"]["output"] for r in records[:-1]], ["Positive", "Negative", "Positive"])
+        self.assertEqual([r["line"] for r in records[:-1]], [1, 2, 4])
+
+    def test_stream_sse(self):
+        res = self.client.post("/query/stream?format=sse", content='"good"\n"bad"')
+        self.assertTrue(res.headers["content-type"].startswith("text/event-stream"))
+        events = [e for e in res.text.split("\n\n") if e]
+        self.assertEqual(len(events), 3)
+        self.assertTrue(events[-1].startswith("event: done"))
+        self.assertEqual(json.loads(events[1][len("data: "):])["result"]["output"], "Negative")
+
+if __name__ == "__main__":
+    unittest.main()
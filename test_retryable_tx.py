@@ -0,0 +1,62 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import retryable_tx
+
+class _Response:
+    def __init__(self, status: int):
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return "unavailable"
+
+class _Session:
+    """Answers every POST with the given status and records the call."""
+
+    def __init__(self, status: int):
+        self.status = status
+        self.calls = []
+
+    def post(self, url, json=None, timeout=None):
+        self.calls.append(timeout)
+        return _Response(self.status)
+
+class TestSubmitResultRetryable(unittest.TestCase):
+    def submit(self, session, **kwargs):
+        return asyncio.run(retryable_tx.submit_result_retryable(session, "t1", {}, {}, **kwargs))
+
+    def test_success_on_first_attempt(self):
+        session = _Session(200)
+        self.assertTrue(self.submit(session))
+        self.assertEqual(len(session.calls), 1)
+
+    def test_no_retry_scheduled_past_the_deadline(self):
+        session = _Session(503)
+        start = time.monotonic()
+        self.assertFalse(self.submit(session, deadline=start + 0.5))
+        # INITIAL_DELAY (2s) would overshoot, so it gives up after one attempt
+        self.assertEqual(len(session.calls), 1)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertLessEqual(session.calls[0].total, 0.5)
+
+    def test_expired_deadline_makes_no_attempt(self):
+        session = _Session(200)
+        self.assertFalse(self.submit(session, deadline=time.monotonic() - 1))
+        self.assertEqual(session.calls, [])
+
+    def test_retries_within_the_deadline(self):
+        session = _Session(503)
+        with mock.patch.object(retryable_tx, "INITIAL_DELAY", 0.01):
+            self.assertFalse(self.submit(session, deadline=time.monotonic() + 5))
+        self.assertEqual(len(session.calls), retryable_tx.MAX_RETRIES)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from sentiment_aggregator import SentimentAggregator
+
+NOW = 1_750_000_000  # aligned to a one-minute bucket boundary
+
+class TestSentimentAggregator(unittest.TestCase):
+    def setUp(self):
+        self.agg = SentimentAggregator(["Solana", "Bitcoin", "AI"], bucket_seconds=60, num_buckets=60)
+
+    def test_keyword_matching_is_case_insensitive_and_word_bounded(self):
+        self.assertEqual(sorted(self.agg.match_keywords("solana and BITCOIN")), ["Bitcoin", "Solana"])
+        self.assertEqual(self.agg.match_keywords("She said nothing"), [])
+
+    def test_window_counts_and_score(self):
+        self.agg.add("Solana rocks", "Positive", 0.9, NOW)
+        self.agg.add("Solana rocks", "Positive", 0.7, NOW)
+        self.agg.add("Solana is down", "Negative", 0.8, NOW)
+        stats = self.agg.window("Solana", 300, now=NOW)
+        self.assertEqual(stats["count"], 3)
+        self.assertEqual(stats["counts"]["Positive"], 2)
+        self.assertAlmostEqual(stats["avg_confidence"]["Positive"], 0.8)
+        self.assertAlmostEqual(stats["score"], round(1 / 3, 4))
+
+    def test_window_excludes_old_buckets(self):
+        self.agg.add("Bitcoin up", "Positive", 0.9, NOW - 1800)
+        self.agg.add("Bitcoin down", "Negative", 0.9, NOW)
+        self.assertEqual(self.agg.window("Bitcoin", 300, now=NOW)["count"], 1)
+        self.assertEqual(self.agg.window("Bitcoin", 3600, now=NOW)["count"], 2)
+
+    def test_ring_overwrites_expired_buckets(self):
+        self.agg.add("AI hype", "Neutral", 0.5, NOW - 3600)
+        self.agg.add("AI hype", "Neutral", 0.5, NOW)
+        self.assertEqual(self.agg.window("AI", 3600, now=NOW)["count"], 1)
+        # Late event older than the bucket now occupying its slot is dropped
+        self.agg.add("AI hype", "Neutral", 0.5, NOW - 3600)
+        self.assertEqual(self.agg.window("AI", 3600, now=NOW)["count"], 1)
+
+    def test_chart_data_shape(self):
+        self.agg.add("Solana", "Positive", 0.9, NOW)
+        data = self.agg.chart_data(300, now=NOW)
+        self.assertEqual([d["label"] for d in data], ["Solana", "Bitcoin", "AI"])
+        self.assertEqual(data[0]["value"], 1.0)
+        self.assertEqual(data[1]["value"], 0.0)
+
+    def test_unknown_label_ignored(self):
+        self.assertEqual(self.agg.add("Solana", "LABEL_7", 0.5, NOW), [])
+
+if __name__ == "__main__":
+    unittest.main()
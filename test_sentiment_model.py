@@ -1,5 +1,10 @@
+import multiprocessing
 import unittest
+from types import SimpleNamespace
 from typing import Dict
+from unittest import mock
+
+import sentiment_model
 
 # Mocked interface (replace with actual sentiment model wrapper in integration)
 class MockSentimentModel:
@@ -57,5 +62,43 @@ class TestSentimentModel(unittest.TestCase):
         self.assertIsInstance(result["sentiment"], str)
         self.assertIsInstance(result["confidence"], str)
 
+class FakeSentimentPipeline:
+    """Keyword classifier shaped like a transformers pipeline, with non-LABEL_n label names."""
+
+    def __init__(self):
+        self.model = SimpleNamespace(config=SimpleNamespace(id2label={0: "negative", 1: "neutral", 2: "positive"}))
+
+    def __call__(self, texts):
+        if any("boom" in t for t in texts):
+            raise RuntimeError("shard exploded")
+        return [
+            {"label": "positive" if "good" in t else "negative" if "bad" in t else "neutral", "score": 0.75}
+            for t in texts
+        ]
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork to share the fake pipeline")
+class TestShardedBatchWorker(unittest.TestCase):
+    def setUp(self):
+        sentiment_model.shutdown_shard_pool()
+        # Forked shard processes inherit the fake instead of loading a model
+        for name, value in [("_sentiment_pipeline", FakeSentimentPipeline()), ("SHARD_START_METHOD", "fork"), ("SHARD_SIZE", 2)]:
+            patcher = mock.patch.object(sentiment_model, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(sentiment_model.shutdown_shard_pool)
+
+    def test_results_come_back_through_shared_memory(self):
+        tweets = [{"id": i, "text": text} for i, text in enumerate(["good @a", "bad news", "meh", "so good", "bad"])]
+        results = sentiment_model.batch_worker([tweets[:2], tweets[2:]], mode="process", num_workers=2)
+        self.assertEqual([r["id"] for r in results], [0, 1, 2, 3, 4])
+        self.assertEqual([r["sentiment"] for r in results], ["positive", "negative", "neutral", "positive", "negative"])
+        self.assertEqual(results[0]["cleaned_text"], "good")
+        self.assertEqual(results[0]["confidence"], 0.75)
+
+    def test_failed_shard_drops_only_its_tweets(self):
+        tweets = [{"id": i, "text": text} for i, text in enumerate(["good", "bad", "boom", "good"])]
+        results = sentiment_model.batch_worker([tweets], mode="process", num_workers=2)
+        self.assertEqual([r["id"] for r in results], [0, 1])
+
 if __name__ == "__main__":
     unittest.main()
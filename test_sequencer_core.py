@@ -0,0 +1,31 @@
+import unittest
+
+from fastapi.testclient import TestClient
+
+import sequencer_core
+
+class TestSubmitTask(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(sequencer_core.app)
+
+    def tearDown(self):
+        sequencer_core.PENDING_TASKS.clear()
+
+    def submit(self, **extra):
+        return self.client.post("/submit_task", json={"model": "parallax-llm-v1", "input": "gm", **extra})
+
+    def test_invalid_timeouts_are_rejected(self):
+        for timeout in (0, -5, "10", True, None, sequencer_core.MAX_TASK_TIMEOUT_SECONDS + 1):
+            res = self.submit(timeout_seconds=timeout)
+            self.assertEqual(res.status_code, 400, timeout)
+        self.assertEqual(sequencer_core.PENDING_TASKS, [])
+
+    def test_valid_timeout_sets_deadline(self):
+        res = self.submit(timeout_seconds=2.5)
+        self.assertEqual(res.status_code, 200)
+        task = sequencer_core.PENDING_TASKS[-1]
+        self.assertAlmostEqual(task["deadline"] - task["created_at"], 2.5, delta=1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import session_history
+from session_history import SessionHistory
+
+class TestSessionHistory(unittest.TestCase):
+    def test_ring_keeps_newest_entries(self):
+        history = SessionHistory(max_entries_per_session=3, max_total_entries=10)
+        for i in range(5):
+            history.append("s1", {"query": f"q{i}"})
+        entries, next_cursor = history.page("s1")
+        self.assertEqual([e["seq"] for e in entries], [2, 3, 4])
+        self.assertIsNone(next_cursor)
+        self.assertEqual(len(history), 3)
+
+    def test_cursor_pagination(self):
+        history = SessionHistory(max_entries_per_session=10, max_total_entries=10)
+        for i in range(7):
+            history.append("s1", {"query": f"q{i}"})
+        pages, cursor = [], None
+        while True:
+            entries, cursor = history.page("s1", cursor=cursor, limit=3)
+            pages.append([e["query"] for e in entries])
+            if cursor is None:
+                break
+        self.assertEqual(pages, [["q0", "q1", "q2"], ["q3", "q4", "q5"], ["q6"]])
+
+    def test_cursor_older_than_ring_starts_at_oldest(self):
+        history = SessionHistory(max_entries_per_session=2, max_total_entries=10)
+        for i in range(5):
+            history.append("s1", {"query": f"q{i}"})
+        entries, _ = history.page("s1", cursor=0)
+        self.assertEqual([e["seq"] for e in entries], [3, 4])
+
+    def test_unknown_session_is_empty(self):
+        self.assertEqual(SessionHistory().page("nobody"), ([], None))
+
+    def test_global_cap_evicts_least_recently_used(self):
+        history = SessionHistory(max_entries_per_session=2, max_total_entries=4)
+        history.append("a", {"query": "a0"})
+        history.append("b", {"query": "b0"})
+        history.page("a")  # a is now more recent than b
+        history.append("c", {"query": "c0"})
+        history.append("c", {"query": "c1"})
+        history.append("a", {"query": "a1"})
+        self.assertNotIn("b", history)
+        self.assertIn("a", history)
+        self.assertEqual(len(history), 4)
+
+    def test_spilled_sessions_are_restored(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            history = SessionHistory(max_entries_per_session=2, max_total_entries=2, spill_dir=spill_dir)
+            history.append("a", {"query": "a0"})
+            history.append("a", {"query": "a1"})
+            history.append("b", {"query": "b0"})
+            self.assertEqual(history.stats()["sessions_spilled"], 1)
+            self.assertTrue(os.listdir(spill_dir))
+
+            entries, _ = history.page("a")
+            self.assertEqual([e["query"] for e in entries], ["a0", "a1"])
+            # Sequence numbers keep increasing after a restore
+            self.assertEqual(history.append("a", {"query": "a2"}), 3)
+            self.assertLessEqual(len(history), 2)
+
+    def test_restore_on_read_respects_global_cap(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            history = SessionHistory(max_entries_per_session=2, max_total_entries=2, spill_dir=spill_dir)
+            history.append("a", {"query": "a0"})
+            history.append("b", {"query": "b0"})
+            history.append("b", {"query": "b1"})
+            self.assertNotIn("a", history._sessions)
+            history.page("a")
+            self.assertLessEqual(len(history), 2)
+            self.assertIn("b", history)
+
+    def test_cursor_survives_eviction_without_spill(self):
+        history = SessionHistory(max_entries_per_session=5, max_total_entries=5)
+        for i in range(3):
+            history.append("a", {"query": f"old{i}"})
+        old_cursor = history.page("a", limit=2)[1]
+        for i in range(5):
+            history.append("b", {"query": f"b{i}"})  # evicts a entirely
+        self.assertNotIn("a", history)
+        history.append("a", {"query": "new0"})
+        entries, _ = history.page("a", cursor=old_cursor)
+        self.assertEqual([e["query"] for e in entries], ["new0"])
+
+    def test_spill_space_is_reclaimed(self):
+        with tempfile.TemporaryDirectory() as spill_dir, \
+                mock.patch.object(session_history, "SPILL_SEGMENT_BYTES", 1):
+            # Every spill lands in its own segment
+            history = SessionHistory(max_entries_per_session=1, max_total_entries=1, spill_dir=spill_dir)
+            for i in range(5):
+                history.append(f"s{i}", {"query": f"q{i}"})
+            self.assertEqual(len(os.listdir(spill_dir)), 4)
+            for _ in range(3):
+                for i in range(5):
+                    history.page(f"s{i}")
+            # Each restore deletes the segment it emptied, so only live records remain on disk
+            self.assertEqual(len(os.listdir(spill_dir)), history.stats()["sessions_spilled"])
+            for i in range(5):
+                entries, _ = history.page(f"s{i}")
+                self.assertEqual([e["query"] for e in entries], [f"q{i}"])
+
+    def test_partially_dead_segment_is_compacted(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            history = SessionHistory(max_entries_per_session=1, max_total_entries=1, spill_dir=spill_dir)
+            for i in range(5):
+                history.append(f"s{i}", {"query": f"q{i}"})
+            first = sorted(os.listdir(spill_dir))[0]
+            history._segment_index += 1  # close the segment holding s0..s3
+            for i in range(3):
+                history.page(f"s{i}")
+            self.assertNotIn(first, os.listdir(spill_dir))
+            entries, _ = history.page("s3")
+            self.assertEqual([e["query"] for e in entries], ["q3"])
+
+    def test_spilled_sessions_are_bounded(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            history = SessionHistory(max_entries_per_session=1, max_total_entries=1, spill_dir=spill_dir, max_spilled_sessions=2)
+            for i in range(5):
+                history.append(f"s{i}", {"query": f"q{i}"})
+            self.assertEqual(history.stats()["sessions_spilled"], 2)
+            self.assertNotIn("s0", history)
+            self.assertIn("s3", history)
+
+if __name__ == "__main__":
+    unittest.main()
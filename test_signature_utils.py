@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+
+import signature_utils
+from nacl.encoding import HexEncoder
+from nacl.signing import SigningKey
+
+KEYS = [SigningKey.generate() for _ in range(4)]
+
+def make_items(n: int, bad=()):
+    items = []
+    for i in range(n):
+        sk = KEYS[i % len(KEYS)]
+        message = f"payload-{i}".encode()
+        signature = sk.sign(message).signature
+        if i in bad:
+            signature = bytes([signature[0] ^ 1]) + signature[1:]
+        items.append((message, signature, sk.verify_key.encode(encoder=HexEncoder).decode()))
+    return items
+
+class TestBatchVerification(unittest.TestCase):
+    def test_all_valid(self):
+        self.assertEqual(signature_utils.verify_batch(make_items(10)), [True] * 10)
+        self.assertEqual(signature_utils.verify_batch([]), [])
+
+    def test_bisection_finds_every_bad_signature(self):
+        bad = {0, 7, 8, 31}
+        results = signature_utils.verify_batch(make_items(32, bad))
+        self.assertEqual({i for i, ok in enumerate(results) if not ok}, bad)
+
+    def test_parallel_path_finds_bad_signatures(self):
+        bad = {3, 150, 299}
+        with mock.patch.object(signature_utils, "BATCH_VERIFY_THREADS", 4):
+            results = signature_utils.verify_batch(make_items(300, bad))
+        self.assertEqual({i for i, ok in enumerate(results) if not ok}, bad)
+
+    def test_malformed_key_is_invalid(self):
+        items = make_items(3)
+        items[1] = (items[1][0], items[1][1], "zz")
+        self.assertEqual(signature_utils.verify_batch(items), [True, False, True])
+
+    def test_verify_batch_signatures_counts_valid(self):
+        sk_hex, pk_hex = signature_utils.generate_key_pair()
+        sk = SigningKey(sk_hex, encoder=HexEncoder)
+        payload = {"task_id": "abc", "output_hash": "00"}
+        sig = signature_utils.sign_payload(payload, sk)
+        self.assertEqual(signature_utils.verify_batch_signatures(payload, [sig, sig, "bad123", "zz"], [pk_hex] * 4), 2)
+
+class TestVerifyKeyCache(unittest.TestCase):
+    def test_repeated_keys_hit_the_cache(self):
+        signature_utils.get_verify_key.cache_clear()
+        signature_utils.verify_batch(make_items(12))
+        stats = signature_utils.verify_key_cache_stats()
+        self.assertEqual(stats["misses"], len(KEYS))
+        self.assertEqual(stats["hits"], 12 - len(KEYS))
+        self.assertEqual(stats["size"], len(KEYS))
+
+    def test_bad_keys_are_not_cached(self):
+        signature_utils.get_verify_key.cache_clear()
+        with self.assertRaises(Exception):
+            signature_utils.get_verify_key("zz")
+        self.assertEqual(signature_utils.verify_key_cache_stats()["size"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import stat
+import tempfile
+import textwrap
+import time
+import unittest
+
+import snark_interface
+
+# Stands in for zokrates: logs each subcommand, sleeps through the expensive
+# ones and writes the files the real tool would leave in its working directory
+FAKE_ZOKRATES = textwrap.dedent("""\
+    #!/bin/sh
+    echo "$1" >> "$FAKE_ZK_LOG"
+    case "$1" in
+      --version) echo "${FAKE_ZK_VERSION:-ZoKrates 0.8.8}" ;;
+      compile) grep -q "syntax error" "$3" && { echo "parse error" >&2; exit 1; }; sleep 0.3; cat "$3" > out; echo '{}' > abi.json ;;
+      setup) test -f out || exit 1; sleep 0.3; echo pk > proving.key; echo vk > verification.key ;;
+      compute-witness) test -f out && test -f abi.json || exit 1; echo w > witness ;;
+      generate-proof) test -f proving.key && test -f witness || exit 1; echo '{"proof": {"a": 1}, "inputs": []}' > proof.json ;;
+      verify) test -f verification.key && test -f proof.json || exit 1 ;;
+      *) exit 2 ;;
+    esac
+""")
+
+class TestCircuitCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        binary = os.path.join(root, "zokrates")
+        with open(binary, "w") as f:
+            f.write(FAKE_ZOKRATES)
+        os.chmod(binary, os.stat(binary).st_mode | stat.S_IXUSR)
+        self.circuit = os.path.join(root, "threshold_check.zok")
+        with open(self.circuit, "w") as f:
+            f.write("def main(field x) -> field { return x; }\n")
+        self.log = os.path.join(root, "calls.log")
+        os.environ["FAKE_ZK_LOG"] = self.log
+
+        self.originals = (snark_interface.ZK_BINARY_PATH, snark_interface.CIRCUIT_CACHE_DIR, snark_interface.PROOF_OUTPUT_PATH)
+        snark_interface.ZK_BINARY_PATH = binary
+        snark_interface.CIRCUIT_CACHE_DIR = os.path.join(root, "cache")
+        snark_interface.PROOF_OUTPUT_PATH = os.path.join(root, "proofs")
+
+    def tearDown(self):
+        snark_interface.ZK_BINARY_PATH, snark_interface.CIRCUIT_CACHE_DIR, snark_interface.PROOF_OUTPUT_PATH = self.originals
+        snark_interface._tool_versions.clear()
+        os.environ.pop("FAKE_ZK_LOG", None)
+        os.environ.pop("FAKE_ZK_VERSION", None)
+        self.tmp.cleanup()
+
+    def calls(self, command: str) -> int:
+        with open(self.log) as f:
+            return sum(1 for line in f if line.strip() == command)
+
+    def test_cache_hit_skips_compile_and_setup(self):
+        start = time.perf_counter()
+        first = snark_interface.simulate_end_to_end({"x": 1}, self.circuit)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        second = snark_interface.simulate_end_to_end({"x": 2}, self.circuit)
+        warm = time.perf_counter() - start
+
+        self.assertTrue(first["valid"] and second["valid"])
+        self.assertEqual((self.calls("compile"), self.calls("setup")), (1, 1))
+        self.assertEqual(self.calls("generate-proof"), 2)
+        self.assertLess(warm, cold / 2)
+        self.assertTrue(os.path.exists(second["proof_file"]))
+        stats = snark_interface.circuit_cache_stats()
+        self.assertGreaterEqual(stats["hits"], 1)
+
+    def test_changed_source_or_tool_version_recompiles(self):
+        snark_interface.prepare_circuit(self.circuit)
+        with open(self.circuit, "a") as f:
+            f.write("// tweak\n")
+        snark_interface.prepare_circuit(self.circuit)
+        self.assertEqual(self.calls("compile"), 2)
+
+        os.environ["FAKE_ZK_VERSION"] = "ZoKrates 0.9.0"
+        snark_interface._tool_versions.clear()
+        entry = snark_interface.prepare_circuit(self.circuit)
+        self.assertEqual(self.calls("compile"), 3)
+        self.assertEqual(len(os.listdir(snark_interface.CIRCUIT_CACHE_DIR)), 3)
+        self.assertTrue(all(os.path.exists(os.path.join(entry, name)) for name in snark_interface.CIRCUIT_ARTIFACTS))
+
+    def test_failed_build_is_not_cached(self):
+        with open(self.circuit, "w") as f:
+            f.write("syntax error\n")
+        self.assertIsNone(snark_interface.simulate_end_to_end({"x": 1}, self.circuit))
+        self.assertEqual(os.listdir(snark_interface.CIRCUIT_CACHE_DIR), [])
+        self.assertIsNone(snark_interface.prepare_circuit(self.circuit))
+        self.assertEqual(self.calls("compile"), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import stage_metrics
+from stage_metrics import LatencyHistogram, get_stage_histograms, record_timeline
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_empty_histogram(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.percentile(0.99), 0.0)
+        self.assertEqual(histogram.to_dict()["count"], 0)
+
+    def test_percentiles_are_bucket_upper_bounds(self):
+        histogram = LatencyHistogram(buckets=(0.1, 1.0, 10.0))
+        for seconds in [0.05] * 90 + [0.5] * 9 + [5.0]:
+            histogram.observe(seconds)
+        self.assertEqual(histogram.percentile(0.5), 0.1)
+        self.assertEqual(histogram.percentile(0.9), 0.1)
+        self.assertEqual(histogram.percentile(0.99), 1.0)
+        # The top quantile is capped at the largest observation, not the bucket bound
+        self.assertEqual(histogram.percentile(1.0), 5.0)
+
+    def test_overflow_bucket_and_negative_clamp(self):
+        histogram = LatencyHistogram(buckets=(1.0,))
+        histogram.observe(-1)
+        histogram.observe(30)
+        summary = histogram.to_dict()
+        self.assertEqual(summary["buckets"], {"le_1.0": 1, "le_inf": 1})
+        self.assertEqual(summary["max"], 30)
+        self.assertEqual(summary["sum"], 30)
+        self.assertEqual(histogram.percentile(0.99), 30)
+
+class TestRecordTimeline(unittest.TestCase):
+    def setUp(self):
+        stage_metrics.reset_stage_metrics()
+
+    def tearDown(self):
+        stage_metrics.reset_stage_metrics()
+
+    def test_full_timeline_records_every_stage(self):
+        timeline = {"enqueued": 0.0, "dequeued": 0.5, "model_loaded": 0.6, "inferred": 0.9, "dacert_generated": 1.0, "submitted": 1.4}
+        record_timeline("m", timeline, submit_attempts=[(1.0, 1.1), (1.3, 1.4)])
+        stages = get_stage_histograms("m")["m"]
+        self.assertEqual(set(stages), set(stage_metrics.STAGE_BOUNDARIES) | {"submit_attempt"})
+        self.assertAlmostEqual(stages["queue_wait"]["sum"], 0.5)
+        self.assertAlmostEqual(stages["total"]["sum"], 1.4)
+        self.assertEqual(stages["submit_attempt"]["count"], 2)
+
+    def test_partial_timeline_skips_missing_stages(self):
+        record_timeline("m", {"enqueued": 0.0, "dequeued": 2.0, "model_loaded": 2.5})
+        stages = get_stage_histograms("m")["m"]
+        self.assertEqual(set(stages), {"queue_wait", "model_load"})
+
+    def test_histograms_are_kept_per_model(self):
+        record_timeline("a", {"enqueued": 0.0, "dequeued": 1.0})
+        record_timeline("b", {"enqueued": 0.0, "dequeued": 1.0})
+        self.assertEqual(set(get_stage_histograms()), {"a", "b"})
+        self.assertEqual(set(get_stage_histograms("a")), {"a"})
+
+if __name__ == "__main__":
+    unittest.main()
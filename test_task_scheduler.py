@@ -0,0 +1,130 @@
+import asyncio
+import importlib.util
+import threading
+import time
+import unittest
+from unittest import mock
+
+import stage_metrics
+
+# task_scheduler pulls in the inference stack through inference_executor
+HAS_INFERENCE_DEPS = importlib.util.find_spec("transformers") is not None
+
+RESULT = {"model_id": "parallax-llm-v1", "input": "gm", "output": {"label": "POSITIVE", "score": 0.9}}
+
+def fake_inference(model_id, input_data, timeline=None):
+    return dict(RESULT, input=input_data)
+
+@unittest.skipUnless(HAS_INFERENCE_DEPS, "transformers is not installed")
+class TestDeadlines(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import task_scheduler
+        cls.scheduler = task_scheduler
+
+    def setUp(self):
+        s = self.scheduler
+        s.expired_tasks.clear()
+        s.failed_tasks.clear()
+        s.active_tasks.clear()
+        with s.task_queue.mutex:
+            s.task_queue.queue.clear()
+        self.submit = mock.AsyncMock(return_value=True)
+        self.report = mock.AsyncMock(return_value=True)
+        self.patches = [
+            mock.patch.object(s, "submit_result_retryable", self.submit),
+            mock.patch.object(s, "report_task_expired", self.report),
+            mock.patch.object(s, "generate_dacert", return_value={"signature": "sig"}),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def process(self, task):
+        async def run():
+            await self.scheduler.process_task(task, session=object())
+            # Let fire-and-forget expiry reports run
+            await asyncio.gather(*self.scheduler._background_reports)
+        asyncio.run(run())
+
+    def task(self, timeout: float, **kwargs):
+        task = self.scheduler.InferenceTask("parallax-llm-v1", "gm", timeout_seconds=timeout, **kwargs)
+        self.scheduler.active_tasks[task.task_id] = task
+        return task
+
+    def test_expired_in_queue_never_runs_inference(self):
+        task = self.task(0.01)
+        task.mark("enqueued")
+        time.sleep(0.02)
+        task.mark("dequeued")
+        inference = mock.Mock(side_effect=fake_inference)
+        stage_metrics.reset_stage_metrics()
+        with mock.patch.object(self.scheduler, "run_inference", inference):
+            self.process(task)
+        inference.assert_not_called()
+        queue_wait = stage_metrics.get_stage_histograms("parallax-llm-v1")["parallax-llm-v1"]["queue_wait"]
+        self.assertEqual(queue_wait["count"], 1)
+        self.assertGreaterEqual(queue_wait["max"], 0.02)
+        self.assertIn(task, self.scheduler.expired_tasks)
+        # Locally generated IDs are unknown to the sequencer, so nothing is reported
+        self.report.assert_not_called()
+
+    def test_sequencer_issued_expiry_is_reported(self):
+        task = self.task(0.01, task_id="seq-123")
+        time.sleep(0.02)
+        with mock.patch.object(self.scheduler, "run_inference", fake_inference):
+            self.process(task)
+        self.report.assert_awaited_once()
+        self.assertEqual(self.report.await_args.args[1], "seq-123")
+
+    def test_inference_past_deadline_is_abandoned(self):
+        release = threading.Event()
+
+        def slow_inference(model_id, input_data, timeline=None):
+            release.wait(5)
+            return fake_inference(model_id, input_data)
+
+        task = self.task(0.1)
+        pool = self.scheduler.INFERENCE_POOL
+        with mock.patch.object(self.scheduler, "run_inference", slow_inference):
+            start = time.monotonic()
+            self.process(task)
+            self.assertLess(time.monotonic() - start, 2)
+            self.assertIn(task, self.scheduler.expired_tasks)
+            self.submit.assert_not_called()
+            # The abandoned call still holds its slot until it returns
+            self.assertEqual(pool.stats()["in_flight"], 1)
+            release.set()
+            for _ in range(100):
+                if pool.stats()["in_flight"] == 0:
+                    break
+                time.sleep(0.01)
+        self.assertEqual(pool.stats()["in_flight"], 0)
+
+    def test_no_retry_after_expiry(self):
+        task = self.task(0.2)
+
+        async def fail_slowly(*args, **kwargs):
+            await asyncio.sleep(0.3)
+            return False
+        self.submit.side_effect = fail_slowly
+        with mock.patch.object(self.scheduler, "run_inference", fake_inference):
+            self.process(task)
+        self.assertEqual(self.submit.await_args.kwargs["deadline"], task.deadline)
+        self.assertIn(task, self.scheduler.expired_tasks)
+        self.assertTrue(self.scheduler.task_queue.empty())
+        self.assertEqual(task.retries, 1)
+
+    def test_full_pool_defers_the_task(self):
+        task = self.task(5)
+        with mock.patch.object(self.scheduler, "POOL_FULL_BACKOFF_SECONDS", 0), \
+                mock.patch.object(self.scheduler.INFERENCE_POOL, "submit", side_effect=self.scheduler.InferencePoolFull):
+            self.process(task)
+        self.assertEqual(task.retries, 0)
+        self.assertIs(self.scheduler.task_queue.get_nowait(), task)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import re
+import unicodedata
+import unittest
+
+from text_normalizer import clean_text, normalize_text, clean_texts, normalize_texts
+
+# Reference implementations the shared normalizer replaced
+def legacy_clean_text(text: str) -> str:
+    text = re.sub(r"http\S+", "", text)
+    text = re.sub(r"@\w+", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+def legacy_normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = text.encode("ascii", "ignore").decode("utf-8")
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    return text
+
+SAMPLES = [
+    "",
+    "   ",
+    "Solana is the future of finance!",
+    "  @alice check https://t.co/abc   now\t\tplease\n",
+    "@http://example.com",
+    "mail me at bob@example.com or @@handle",
+    "Café déjà vu — naïve coöperation",
+    "non breaking spaces and\x1cseparators",
+    "emoji 🚀🔥 only @x",
+    "ＦＵＬＬＷＩＤＴＨ ｔｅｘｔ",
+    "httpnospace and http:/partial",
+]
+
+class TestTextNormalizer(unittest.TestCase):
+    def test_clean_text_matches_legacy(self):
+        for sample in SAMPLES:
+            self.assertEqual(clean_text(sample), legacy_clean_text(sample), repr(sample))
+
+    def test_normalize_text_matches_legacy(self):
+        for sample in SAMPLES:
+            self.assertEqual(normalize_text(sample), legacy_normalize_text(sample), repr(sample))
+
+    def test_batch_apis(self):
+        self.assertEqual(clean_texts(SAMPLES), [legacy_clean_text(s) for s in SAMPLES])
+        self.assertEqual(normalize_texts(SAMPLES), [legacy_normalize_text(s) for s in SAMPLES])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import tokenizer_utils
+
+class FakeTokenizer:
+    """Whitespace tokenizer with the slice of the fast-tokenizer API tokenizer_utils uses."""
+
+    def __init__(self):
+        self.calls = []
+
+    def _ids(self, text):
+        return [101] + [len(word) for word in text.split()] + [102]
+
+    def encode(self, text, add_special_tokens=True):
+        return self._ids(text)
+
+    def __call__(self, texts, add_special_tokens=True, padding=False, return_tensors=None,
+                 return_length=False, return_attention_mask=True, return_token_type_ids=True):
+        self.calls.append(list(texts))
+        ids = [self._ids(t) for t in texts]
+        encoded = {"input_ids": ids}
+        if return_length:
+            encoded["length"] = [len(i) for i in ids]
+        if return_tensors == "np":
+            width = max(len(i) for i in ids)
+            encoded["input_ids"] = np.array([i + [0] * (width - len(i)) for i in ids])
+            encoded["attention_mask"] = np.array([[1] * len(i) + [0] * (width - len(i)) for i in ids])
+        return encoded
+
+class FakeAutoTokenizer:
+    loaded = []
+
+    @classmethod
+    def from_pretrained(cls, model_id, use_fast=True):
+        if model_id.startswith("missing"):
+            raise OSError(f"{model_id} not found")
+        cls.loaded.append(model_id)
+        return FakeTokenizer()
+
+class _TokenizerCase(unittest.TestCase):
+    def setUp(self):
+        tokenizer_utils.TOKENIZER_CACHE.clear()
+        tokenizer_utils.clear_token_count_cache()
+        self.tokenizer = FakeTokenizer()
+        tokenizer_utils.TOKENIZER_CACHE["fake"] = self.tokenizer
+
+    def tearDown(self):
+        tokenizer_utils.TOKENIZER_CACHE.clear()
+        tokenizer_utils.clear_token_count_cache()
+
+class TestCountTokens(_TokenizerCase):
+    def test_counts_only_tokenize_unseen_texts(self):
+        self.assertEqual(tokenizer_utils.count_tokens_batch("fake", ["a b", "c", "a b"]), [4, 3, 4])
+        self.assertEqual(self.tokenizer.calls, [["a b", "c"]])
+        self.assertEqual(tokenizer_utils.count_tokens("fake", "c"), 3)
+        self.assertEqual(len(self.tokenizer.calls), 1)
+
+    def test_hits_and_misses_count_every_text_looked_up(self):
+        tokenizer_utils.count_tokens_batch("fake", ["a", "a", "b"])
+        tokenizer_utils.count_tokens_batch("fake", ["a", "b", "c", "c"])
+        stats = tokenizer_utils.token_count_cache_stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 5)
+        self.assertEqual(stats["size"], 3)
+
+    def test_count_cache_evicts_least_recently_used(self):
+        with mock.patch.object(tokenizer_utils, "TOKEN_COUNT_CACHE_SIZE", 2):
+            tokenizer_utils.count_tokens_batch("fake", ["a", "b"])
+            tokenizer_utils.count_tokens("fake", "a")
+            tokenizer_utils.count_tokens("fake", "c")
+            self.tokenizer.calls.clear()
+            tokenizer_utils.count_tokens_batch("fake", ["a", "b", "c"])
+        self.assertEqual(self.tokenizer.calls, [["b"]])
+
+    def test_counts_are_kept_per_model(self):
+        other = FakeTokenizer()
+        tokenizer_utils.TOKENIZER_CACHE["other"] = other
+        tokenizer_utils.count_tokens("fake", "a")
+        tokenizer_utils.count_tokens("other", "a")
+        self.assertEqual(other.calls, [["a"]])
+
+class TestTokenizeBatch(_TokenizerCase):
+    def test_lists(self):
+        self.assertEqual(tokenizer_utils.tokenize_batch("fake", ["ab c", "d"]), [[101, 2, 1, 102], [101, 1, 102]])
+
+    def test_numpy_arrays_are_padded(self):
+        encoded = tokenizer_utils.tokenize_batch("fake", ["ab c", "d"], as_numpy=True)
+        self.assertEqual(set(encoded), {"input_ids", "attention_mask"})
+        self.assertEqual(encoded["input_ids"].shape, (2, 4))
+        np.testing.assert_array_equal(encoded["attention_mask"][1], [1, 1, 1, 0])
+
+class TestTokenizerCache(_TokenizerCase):
+    def setUp(self):
+        super().setUp()
+        FakeAutoTokenizer.loaded = []
+        patcher = mock.patch.object(tokenizer_utils, "AutoTokenizer", FakeAutoTokenizer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_tokenizers_are_loaded_once_and_evicted_lru(self):
+        with mock.patch.object(tokenizer_utils, "MAX_CACHED_TOKENIZERS", 2):
+            self.assertIs(tokenizer_utils.get_tokenizer("fake"), self.tokenizer)
+            tokenizer_utils.get_tokenizer("m1")
+            tokenizer_utils.get_tokenizer("fake")
+            tokenizer_utils.get_tokenizer("m2")
+        self.assertEqual(list(tokenizer_utils.TOKENIZER_CACHE), ["fake", "m2"])
+        self.assertEqual(FakeAutoTokenizer.loaded, ["m1", "m2"])
+
+    def test_preload_reports_what_loaded(self):
+        self.assertEqual(tokenizer_utils.preload_tokenizers(["m1", "missing-model", "fake"]), ["m1", "fake"])
+        self.assertEqual(FakeAutoTokenizer.loaded, ["m1"])
+        self.assertNotIn("missing-model", tokenizer_utils.TOKENIZER_CACHE)
+
+if __name__ == "__main__":
+    unittest.main()
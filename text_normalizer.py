@@ -0,0 +1,44 @@
+import re
+import unicodedata
+from typing import List
+
+# Precompiled once; applied in this order so results match the original per-call regexes
+_URL_PATTERN = re.compile(r"http\S+")
+_MENTION_PATTERN = re.compile(r"@\w+")
+
+def clean_text(text: str) -> str:
+    """
+    Clean tweet text by removing URLs, mentions, and extra spaces.
+    Each pattern only runs when its trigger character sequence is present,
+    and whitespace is collapsed with split/join instead of a regex.
+    """
+    if "http" in text:
+        text = _URL_PATTERN.sub("", text)
+    if "@" in text:
+        text = _MENTION_PATTERN.sub("", text)
+    return " ".join(text.split())
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form for tokenization: accents stripped (NFKD + ASCII),
+    whitespace collapsed, lowercased. Pure-ASCII input is already in NFKD
+    form, so it skips unicodedata entirely.
+    """
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return " ".join(text.split()).lower()
+
+def clean_texts(texts: List[str]) -> List[str]:
+    """Batch form of clean_text."""
+    clean = clean_text
+    return [clean(t) for t in texts]
+
+def normalize_texts(texts: List[str]) -> List[str]:
+    """Batch form of normalize_text."""
+    normalize = normalize_text
+    return [normalize(t) for t in texts]
+
+if __name__ == "__main__":
+    sample = "  Café  @alice says   Solana  is 🔥 https://t.co/xyz  "
+    print(repr(clean_text(sample)))
+    print(repr(normalize_text(sample)))
@@ -1,8 +1,12 @@
-import re
-from typing import List, Dict, Optional
-import unicodedata
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, List, Dict, Optional, Iterable, Tuple
 import logging
 
+import text_normalizer
+
 try:
     from transformers import AutoTokenizer
 except ImportError:
@@ -10,8 +14,16 @@ except ImportError:
 
 logger = logging.getLogger("TOKENIZER_UTILS")
 
-# Global registry of model tokenizers (optional lazy loading)
-TOKENIZER_CACHE: Dict[str, any] = {}
+# Loaded tokenizers, least recently used first; bounded to MAX_CACHED_TOKENIZERS
+MAX_CACHED_TOKENIZERS = int(os.getenv("MAX_CACHED_TOKENIZERS", 8))
+TOKENIZER_CACHE: "OrderedDict[str, Any]" = OrderedDict()
+_tokenizer_lock = threading.Lock()
+
+# Token counts keyed by (model_id, text digest), least recently used first
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", 100_000))
+_token_count_cache: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+_token_count_lock = threading.Lock()
+_token_count_stats = {"hits": 0, "misses": 0}
 
 def normalize_text(text: str) -> str:
     """
@@ -20,30 +32,54 @@ def normalize_text(text: str) -> str:
     - Strip accents
     - Remove extra whitespace
     """
-    text = unicodedata.normalize("NFKD", text)
-    text = text.encode("ascii", "ignore").decode("utf-8")
-    text = re.sub(r"\s+", " ", text).strip().lower()
-    return text
+    return text_normalizer.normalize_text(text)
+
+def normalize_batch(texts: List[str]) -> List[str]:
+    """Normalizes a list of texts in one call."""
+    return text_normalizer.normalize_texts(texts)
 
 def get_tokenizer(model_id: str):
     """
     Loads a tokenizer (Hugging Face or custom) for a given model ID.
-    Caches the tokenizer to avoid reloading.
+    Caches the tokenizer to avoid reloading, evicting the least recently
+    used one beyond MAX_CACHED_TOKENIZERS.
     """
-    if model_id in TOKENIZER_CACHE:
-        return TOKENIZER_CACHE[model_id]
+    with _tokenizer_lock:
+        if model_id in TOKENIZER_CACHE:
+            TOKENIZER_CACHE.move_to_end(model_id)
+            return TOKENIZER_CACHE[model_id]
 
     if not AutoTokenizer:
         raise ImportError("Transformers not installed. Cannot use Hugging Face tokenizers.")
 
     try:
-        tokenizer = AutoTokenizer.from_pretrained(model_id)
-        TOKENIZER_CACHE[model_id] = tokenizer
-        return tokenizer
+        tokenizer = AutoTokenizer.from_pretrained(model_id, use_fast=True)
     except Exception as e:
         logger.error(f"Failed to load tokenizer for {model_id}: {e}")
         raise RuntimeError("Tokenizer loading failed")
 
+    with _tokenizer_lock:
+        TOKENIZER_CACHE[model_id] = tokenizer
+        TOKENIZER_CACHE.move_to_end(model_id)
+        while len(TOKENIZER_CACHE) > MAX_CACHED_TOKENIZERS:
+            evicted, _ = TOKENIZER_CACHE.popitem(last=False)
+            logger.info(f"Evicted tokenizer for {evicted}")
+    return tokenizer
+
+def preload_tokenizers(model_ids: Iterable[str]) -> List[str]:
+    """
+    Loads tokenizers ahead of the first request, e.g. at node startup.
+    Returns the model IDs that loaded successfully.
+    """
+    loaded = []
+    for model_id in model_ids:
+        try:
+            get_tokenizer(model_id)
+            loaded.append(model_id)
+        except (ImportError, RuntimeError) as e:
+            logger.warning(f"Could not preload tokenizer for {model_id}: {e}")
+    return loaded
+
 def tokenize_input(model_id: str, input_text: str) -> List[int]:
     """
     Tokenizes a string input for a specific model.
@@ -60,11 +96,76 @@ def decode_tokens(model_id: str, token_ids: List[int]) -> str:
     tokenizer = get_tokenizer(model_id)
     return tokenizer.decode(token_ids, skip_special_tokens=True)
 
+def tokenize_batch(model_id: str, texts: List[str], as_numpy: bool = False):
+    """
+    Tokenizes many strings in one call on the tokenizer's batch path.
+    Returns a list of token ID lists, or with as_numpy=True a dict of padded
+    numpy arrays ("input_ids", "attention_mask").
+    """
+    tokenizer = get_tokenizer(model_id)
+    if as_numpy:
+        encoded = tokenizer(texts, add_special_tokens=True, padding=True, return_tensors="np",
+                            return_token_type_ids=False)
+        return {"input_ids": encoded["input_ids"], "attention_mask": encoded["attention_mask"]}
+    encoded = tokenizer(texts, add_special_tokens=True, return_attention_mask=False,
+                        return_token_type_ids=False)
+    return encoded["input_ids"]
+
+def _text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+def count_tokens_batch(model_id: str, texts: List[str]) -> List[int]:
+    """
+    Token counts for many inputs. Counts are served from an LRU keyed by
+    (model_id, text digest); only unseen texts are tokenized, in one batch call.
+    """
+    keys = [(model_id, _text_digest(t)) for t in texts]
+    counts: List[Optional[int]] = [None] * len(texts)
+    missing: Dict[Tuple[str, bytes], List[int]] = {}
+
+    with _token_count_lock:
+        for i, key in enumerate(keys):
+            cached = _token_count_cache.get(key)
+            if cached is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                _token_count_cache.move_to_end(key)
+                counts[i] = cached
+        # Counted per text looked up, so hits + misses always equals the texts requested
+        misses = sum(len(positions) for positions in missing.values())
+        _token_count_stats["hits"] += len(texts) - misses
+        _token_count_stats["misses"] += misses
+
+    if missing:
+        tokenizer = get_tokenizer(model_id)
+        miss_keys = list(missing)
+        encoded = tokenizer([texts[missing[k][0]] for k in miss_keys], add_special_tokens=True,
+                            return_length=True, return_attention_mask=False, return_token_type_ids=False)
+        with _token_count_lock:
+            for key, length in zip(miss_keys, encoded["length"]):
+                length = int(length)
+                for i in missing[key]:
+                    counts[i] = length
+                _token_count_cache[key] = length
+            while len(_token_count_cache) > TOKEN_COUNT_CACHE_SIZE:
+                _token_count_cache.popitem(last=False)
+
+    return counts
+
 def count_tokens(model_id: str, input_text: str) -> int:
     """
     Utility to count the number of tokens a model would generate for a given input.
     """
-    return len(tokenize_input(model_id, input_text))
+    return count_tokens_batch(model_id, [input_text])[0]
+
+def token_count_cache_stats() -> Dict[str, int]:
+    with _token_count_lock:
+        return {**_token_count_stats, "size": len(_token_count_cache), "capacity": TOKEN_COUNT_CACHE_SIZE}
+
+def clear_token_count_cache():
+    with _token_count_lock:
+        _token_count_cache.clear()
+        _token_count_stats.update(hits=0, misses=0)
 
 # Optional testing
 if __name__ == "__main__":
@@ -78,5 +179,7 @@ if __name__ == "__main__":
         print("Tokens:", tokens)
         print("Decoded:", decode_tokens(demo_model, tokens))
         print("Token count:", count_tokens(demo_model, demo_text))
+        print("Batch counts:", count_tokens_batch(demo_model, [demo_text, "gm", demo_text]))
+        print("Cache:", token_count_cache_stats())
     except Exception as e:
         print("Tokenizer test failed:", e)
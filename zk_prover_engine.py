@@ -1,62 +1,90 @@
 import hashlib
-import json
 import logging
+import threading
 import time
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from canonical_encoding import DEFAULT_ENCODING, encode, encoding_of
+from proof_log import ProofLog
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ZK_PROVER")
 
-PROOF_OUTPUT_DIR = "./zkml/proofs"
-os.makedirs(PROOF_OUTPUT_DIR, exist_ok=True)
+# Proofs are appended to rotating segments here (see proof_log.ProofLog)
+PROOF_OUTPUT_DIR = os.getenv("ZK_PROOF_LOG_DIR", "./zkml/proofs")
+
+_proof_log: Optional[ProofLog] = None
+_proof_log_lock = threading.Lock()
+
+def get_proof_log() -> ProofLog:
+    """The process-wide proof log, opened on first use."""
+    global _proof_log
+    with _proof_log_lock:
+        if _proof_log is None:
+            _proof_log = ProofLog(PROOF_OUTPUT_DIR)
+        return _proof_log
 
 # Constants used for hashing
 HASH_ALGO = "sha256"
 PROOF_VERSION = "v0.1-simulated"
 
-def hash_payload(payload: Dict[str, Any]) -> str:
+def hash_payload(payload: Dict[str, Any], encoding: Optional[str] = None) -> str:
     """Hashes the input/output payload to create a fingerprint."""
-    serialized = json.dumps(payload, sort_keys=True).encode()
-    return hashlib.new(HASH_ALGO, serialized).hexdigest()
+    return hashlib.new(HASH_ALGO, encode(payload, encoding)).hexdigest()
 
 def generate_simulated_proof(task_id: str, model_id: str, input_text: str, output: Any) -> Dict[str, Any]:
     """
     Simulates zkML proof generation for an inference result.
     In real-world scenarios, this would interface with ZK proof engines.
     """
-    timestamp = int(time.time())
-    input_hash = hash_payload({"task_id": task_id, "model_id": model_id, "input": input_text})
-    output_hash = hash_payload({"output": output})
-    combined_hash = hash_payload({"input": input_hash, "output": output_hash})
-
-    logger.info(f"Generating proof for task {task_id}")
-
-    proof = {
-        "task_id": task_id,
-        "model_id": model_id,
-        "input_hash": input_hash,
-        "output_hash": output_hash,
-        "combined_hash": combined_hash,
-        "timestamp": timestamp,
-        "version": PROOF_VERSION,
-        "proof_data": f"zk-proof-sim-{combined_hash[:16]}"
-    }
-
-    output_path = os.path.join(PROOF_OUTPUT_DIR, f"{task_id}_proof.json")
-    with open(output_path, "w") as f:
-        json.dump(proof, f, indent=2)
-
-    logger.info(f"Proof stored at {output_path}")
+    proof = generate_simulated_proofs_batch([(task_id, model_id, input_text, output)])[0]
+    logger.info(f"Proof generated for task {task_id}")
     return proof
 
+def generate_simulated_proofs_batch(items: Sequence[Tuple[str, str, str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Proofs for many (task_id, model_id, input_text, output) tuples in one
+    pass, sharing a timestamp and handed to the proof log as one append.
+    Returns without waiting for the write; the log's background writer
+    group-commits and fsyncs them.
+    """
+    timestamp = int(time.time())
+    encoding = DEFAULT_ENCODING
+    new_hash = hashlib.new
+
+    proofs = []
+    for task_id, model_id, input_text, output in items:
+        input_hash = new_hash(HASH_ALGO, encode({"task_id": task_id, "model_id": model_id, "input": input_text}, encoding)).hexdigest()
+        output_hash = new_hash(HASH_ALGO, encode({"output": output}, encoding)).hexdigest()
+        combined_hash = new_hash(HASH_ALGO, encode({"input": input_hash, "output": output_hash}, encoding)).hexdigest()
+        proofs.append({
+            "task_id": task_id,
+            "model_id": model_id,
+            "input_hash": input_hash,
+            "output_hash": output_hash,
+            "combined_hash": combined_hash,
+            "timestamp": timestamp,
+            "version": PROOF_VERSION,
+            "encoding": encoding,
+            "proof_data": f"zk-proof-sim-{combined_hash[:16]}"
+        })
+
+    get_proof_log().append_many([(proof["task_id"], proof) for proof in proofs])
+    return proofs
+
+def load_proof(task_id: str) -> Optional[Dict[str, Any]]:
+    """A stored proof by task ID, via the proof log's offset index."""
+    return get_proof_log().get(task_id)
+
 def verify_simulated_proof(proof: Dict[str, Any], input_text: str, output: Any) -> bool:
     """
     Simulates verification of a zkML proof by recomputing hashes and comparing.
     """
-    input_hash_check = hash_payload({"task_id": proof["task_id"], "model_id": proof["model_id"], "input": input_text})
-    output_hash_check = hash_payload({"output": output})
-    combined_check = hash_payload({"input": input_hash_check, "output": output_hash_check})
+    encoding = encoding_of(proof)
+    input_hash_check = hash_payload({"task_id": proof["task_id"], "model_id": proof["model_id"], "input": input_text}, encoding)
+    output_hash_check = hash_payload({"output": output}, encoding)
+    combined_check = hash_payload({"input": input_hash_check, "output": output_hash_check}, encoding)
 
     return (
         input_hash_check == proof["input_hash"]
@@ -71,6 +99,8 @@ def simulate_demo():
     output = {"sentiment": "Positive", "confidence": 0.91}
 
     proof = generate_simulated_proof(task_id, model_id, input_text, output)
+    get_proof_log().flush()
+    logger.info(f"Proof stored in {PROOF_OUTPUT_DIR}: {load_proof(task_id) == proof}")
 
     is_valid = verify_simulated_proof(proof, input_text, output)
     logger.info(f"Proof verification result: {is_valid}")